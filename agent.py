@@ -0,0 +1,128 @@
+"""Lightweight metrics agent pushing batched samples to a central backend
+
+    python agent.py --server http://localhost:5000 --interval 1 --batch 5
+
+Every --interval seconds the agent takes a get_system_metrics() sample and
+every --batch samples POSTs them to /api/ingest over a persistent
+(keep-alive) HTTP connection. Use --agents N to simulate N hosts from one
+machine when testing the fleet view locally.
+"""
+import argparse
+import http.client
+import json
+import logging
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+from system_metrics import METRIC_FIELDS, CpuMeter, get_system_metrics
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("agent")
+
+
+class ConnectionPool:
+    """Small pool of keep-alive HTTP connections to one server"""
+
+    def __init__(self, server, size=2, timeout=5.0):
+        parts = urlsplit(server)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.conn_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.timeout = timeout
+        self._idle = []
+        self._size = size
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self.conn_class(self.host, self.port, timeout=self.timeout)
+
+    def _release(self, conn):
+        with self._lock:
+            if len(self._idle) < self._size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def post_json(self, path, payload):
+        """POST a JSON payload, retrying once on a dropped keep-alive connection"""
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        for attempt in (1, 2):
+            conn = self._acquire()
+            try:
+                conn.request("POST", path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                self._release(conn)
+                return response.status, data
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if attempt == 2:
+                    raise
+
+
+def run_agent(host_id, pool, interval, batch_size, max_buffer, stop):
+    """Sample metrics and push them in batches until stop is set"""
+    buffer = []
+    # Own CPU baseline: agents sharing psutil's global one would reset each other's window
+    cpu_meter = CpuMeter()
+    next_tick = time.monotonic()
+
+    while not stop.is_set():
+        metrics = get_system_metrics(cpu_meter=cpu_meter)
+        if metrics is not None:
+            buffer.append([round(time.time(), 3)] + [metrics[f] for f in METRIC_FIELDS])
+
+        if len(buffer) >= batch_size:
+            try:
+                status, data = pool.post_json("/api/ingest", {"host": host_id, "fields": METRIC_FIELDS, "samples": buffer})
+                if status == 200:
+                    buffer = []
+                else:
+                    logger.warning(f"[{host_id}] ingest rejected ({status}): {data[:200]!r}")
+            except (http.client.HTTPException, OSError) as e:
+                logger.warning(f"[{host_id}] backend unreachable: {e}")
+            # Keep only the newest samples while the backend is down
+            del buffer[:-max_buffer]
+
+        next_tick += interval
+        stop.wait(max(0.0, next_tick - time.monotonic()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Push system metrics to a central deadlock predictor")
+    parser.add_argument("--server", default="http://localhost:5000")
+    parser.add_argument("--host-id", default=socket.gethostname())
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between samples")
+    parser.add_argument("--batch", type=int, default=5, help="samples per push")
+    parser.add_argument("--max-buffer", type=int, default=600, help="samples kept while the backend is unreachable")
+    parser.add_argument("--agents", type=int, default=1, help="simulate several hosts from this machine")
+    args = parser.parse_args()
+
+    pool = ConnectionPool(args.server, size=args.agents)
+    stop = threading.Event()
+    host_ids = [args.host_id] if args.agents == 1 else [f"{args.host_id}-{i}" for i in range(args.agents)]
+
+    threads = [
+        threading.Thread(target=run_agent, args=(host_id, pool, args.interval, args.batch, args.max_buffer, stop),
+                         name=host_id, daemon=True)
+        for host_id in host_ids
+    ]
+    for thread in threads:
+        thread.start()
+    logger.info(f"Pushing metrics for {len(host_ids)} host(s) to {args.server}")
+
+    try:
+        while any(thread.is_alive() for thread in threads):
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        stop.set()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""Debounced threshold alerts over live metrics and model probabilities
+
+Rules are small boolean expressions over the metric fields and the
+prediction probabilities (p_deadlock, p_safe, p_unsafe, risk_score), e.g.
+
+    {"name": "high_cpu", "when": "cpu_percent > 80", "clear": "cpu_percent < 70",
+     "for": 3, "severity": "warning"}
+
+Each expression is compiled once into a numpy predicate, so a tick
+evaluates every rule against every host's newest sample in one pass. A rule
+fires after `for` consecutive matching samples and resolves only after
+`clear_for` consecutive samples match its clear expression (default: the
+negated condition), which gives hysteresis. Fired and resolved
+transitions are posted to an optional webhook by a rate-limited sender.
+"""
+import ast
+import json
+import logging
+import queue
+import threading
+import time
+import urllib.request
+from collections import deque
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PROBABILITY_FIELDS = ("p_deadlock", "p_safe", "p_unsafe", "risk_score")
+
+DEFAULT_RULES = [
+    {"name": "high_cpu", "when": "cpu_percent > 80", "clear": "cpu_percent < 70", "for": 3, "severity": "warning"},
+    {"name": "high_memory", "when": "memory_percent > 85", "clear": "memory_percent < 75", "for": 3, "severity": "warning"},
+    {"name": "unsafe_risk", "when": "risk_score > 0.6", "clear": "risk_score < 0.4", "for": 2, "severity": "high"},
+    {"name": "deadlock_risk", "when": "p_deadlock > 0.5", "clear": "p_deadlock < 0.3", "for": 1, "severity": "critical"},
+]
+
+_COMPARE = {
+    ast.Gt: np.greater, ast.GtE: np.greater_equal,
+    ast.Lt: np.less, ast.LtE: np.less_equal,
+    ast.Eq: np.equal, ast.NotEq: np.not_equal,
+}
+_ARITH = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.divide}
+
+
+def compile_expression(expression, fields):
+    """Compile a rule expression into fn(columns) -> bool array"""
+
+    def build(node):
+        if isinstance(node, ast.Expression):
+            return build(node.body)
+        if isinstance(node, ast.BoolOp):
+            parts = [build(v) for v in node.values]
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return lambda cols: combine.reduce([part(cols) for part in parts])
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            inner = build(node.operand)
+            return lambda cols: np.logical_not(inner(cols))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            inner = build(node.operand)
+            return lambda cols: np.negative(inner(cols))
+        if isinstance(node, ast.Compare):
+            operands = [build(node.left)] + [build(c) for c in node.comparators]
+            ops = []
+            for op in node.ops:
+                if type(op) not in _COMPARE:
+                    raise ValueError(f"Unsupported comparison in {expression!r}")
+                ops.append(_COMPARE[type(op)])
+            # a < b < c  ->  (a < b) & (b < c)
+            return lambda cols: np.logical_and.reduce([
+                op(operands[i](cols), operands[i + 1](cols)) for i, op in enumerate(ops)
+            ])
+        if isinstance(node, ast.BinOp) and type(node.op) in _ARITH:
+            left, right, op = build(node.left), build(node.right), _ARITH[type(node.op)]
+            return lambda cols: op(left(cols), right(cols))
+        if isinstance(node, ast.Name):
+            if node.id not in fields:
+                raise ValueError(f"Unknown field {node.id!r} in {expression!r}")
+            name = node.id
+            return lambda cols: cols[name]
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            value = float(node.value)
+            return lambda cols: value
+        raise ValueError(f"Unsupported syntax in {expression!r}")
+
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid rule expression {expression!r}: {e.msg}")
+    return build(tree)
+
+
+class Rule:
+    """One compiled alert rule"""
+
+    def __init__(self, config, fields):
+        self.name = config["name"]
+        self.when = config["when"]
+        self.clear = config.get("clear") or f"not ({self.when})"
+        self.fire_after = int(config.get("for", 1))
+        self.clear_after = int(config.get("clear_for", 1))
+        self.severity = config.get("severity", "warning")
+        self.match = compile_expression(self.when, fields)
+        self.cleared = compile_expression(self.clear, fields)
+        self.inputs = sorted({node.id for node in ast.walk(ast.parse(self.when, mode="eval"))
+                              if isinstance(node, ast.Name)})
+
+    def to_dict(self):
+        return {"name": self.name, "when": self.when, "clear": self.clear, "for": self.fire_after,
+                "clear_for": self.clear_after, "severity": self.severity}
+
+
+class WebhookSink:
+    """Background JSON POSTs to a local webhook with a token-bucket rate limit"""
+
+    def __init__(self, url, per_minute=30, burst=10, timeout=2.0, max_queue=1000):
+        self.url = url
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.timeout = timeout
+        self.tokens = float(burst)
+        self.refilled = time.monotonic()
+        self.sent = 0
+        self.dropped = 0
+        self._lock = threading.Lock()  # send() runs on request threads
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="alert-webhook", daemon=True)
+        self._thread.start()
+
+    def _allow(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.refilled) * self.rate)
+            self.refilled = now
+            if self.tokens < 1:
+                self.dropped += 1
+                return False
+            self.tokens -= 1
+            return True
+
+    def send(self, notification):
+        """Queue a notification; dropped when rate limited or the queue is full"""
+        if not self._allow():
+            return False
+        try:
+            self._queue.put_nowait(notification)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _run(self):
+        while True:
+            notification = self._queue.get()
+            body = json.dumps(notification).encode()
+            req = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+            try:
+                with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                    response.read()
+                self.sent += 1
+            except Exception as e:
+                logger.warning(f"Alert webhook error: {e}")
+
+
+class AlertEngine:
+    """Per-host rule state, evaluated for a whole tick of samples at once"""
+
+    def __init__(self, features, rules=None, sink=None, history=200, capacity=1024):
+        self.features = list(features)
+        self.fields = set(self.features) | set(PROBABILITY_FIELDS)
+        self.rules = [Rule(config, self.fields) for config in (rules if rules is not None else DEFAULT_RULES)]
+        self.sink = sink
+        self.slots = {}
+        self.hosts = []
+        n_rules = len(self.rules)
+        self.match_run = np.zeros((n_rules, capacity), dtype=np.int32)
+        self.clear_run = np.zeros((n_rules, capacity), dtype=np.int32)
+        self.active = np.zeros((n_rules, capacity), dtype=bool)
+        self.since = np.zeros((n_rules, capacity))
+        self.notifications = deque(maxlen=history)
+        self.last_eval_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _slot(self, host):
+        slot = self.slots.get(host)
+        if slot is None:
+            slot = self.slots[host] = len(self.hosts)
+            self.hosts.append(host)
+            if slot >= self.active.shape[1]:
+                self.match_run = np.hstack([self.match_run, np.zeros_like(self.match_run)])
+                self.clear_run = np.hstack([self.clear_run, np.zeros_like(self.clear_run)])
+                self.active = np.hstack([self.active, np.zeros_like(self.active)])
+                self.since = np.hstack([self.since, np.zeros_like(self.since)])
+        return slot
+
+    def columns(self, X, probabilities):
+        """Named column views over a (hosts x features) matrix and its probabilities"""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        proba = np.atleast_2d(np.asarray(probabilities, dtype=np.float64))
+        cols = {name: X[:, i] for i, name in enumerate(self.features)}
+        cols.update({
+            "p_deadlock": proba[:, 0],
+            "p_safe": proba[:, 1],
+            "p_unsafe": proba[:, 2],
+            "risk_score": proba[:, 0] + proba[:, 2],
+        })
+        return cols
+
+    def evaluate(self, hosts, timestamps, X, probabilities):
+        """Advance every rule for one sample per host; returns new notifications"""
+        started = time.perf_counter()
+        cols = self.columns(X, probabilities)
+        n = len(hosts)
+        matched = np.empty((len(self.rules), n), dtype=bool)
+        cleared = np.empty((len(self.rules), n), dtype=bool)
+        for i, rule in enumerate(self.rules):
+            matched[i] = np.broadcast_to(rule.match(cols), n)
+            cleared[i] = np.broadcast_to(rule.cleared(cols), n)
+
+        with self._lock:
+            idx = np.fromiter((self._slot(h) for h in hosts), dtype=np.int64, count=n)
+            match_run = np.where(matched, self.match_run[:, idx] + 1, 0)
+            clear_run = np.where(cleared, self.clear_run[:, idx] + 1, 0)
+            was_active = self.active[:, idx]
+
+            fire_after = np.array([[rule.fire_after] for rule in self.rules])
+            clear_after = np.array([[rule.clear_after] for rule in self.rules])
+            fired = ~was_active & (match_run >= fire_after)
+            resolved = was_active & (clear_run >= clear_after)
+
+            self.match_run[:, idx] = match_run
+            self.clear_run[:, idx] = clear_run
+            self.active[:, idx] = (was_active | fired) & ~resolved
+
+            notifications = []
+            for status, mask in (("firing", fired), ("resolved", resolved)):
+                for rule_index, host_index in zip(*np.nonzero(mask)):
+                    rule, slot, ts = self.rules[rule_index], idx[host_index], float(timestamps[host_index])
+                    if status == "firing":
+                        self.since[rule_index, slot] = ts
+                    notifications.append({
+                        "rule": rule.name,
+                        "severity": rule.severity,
+                        "status": status,
+                        "host": hosts[host_index],
+                        "timestamp": ts,
+                        "since": float(self.since[rule_index, slot]),
+                        "values": {name: round(float(cols[name][host_index]), 4) for name in rule.inputs},
+                    })
+            self.notifications.extend(notifications)
+            self.last_eval_seconds = time.perf_counter() - started
+
+        if self.sink is not None:
+            for notification in notifications:
+                self.sink.send(notification)
+        return notifications
+
+    def snapshot(self):
+        """Active alerts, recent transitions and configured rules"""
+        with self._lock:
+            active = [
+                {"rule": self.rules[r].name, "severity": self.rules[r].severity,
+                 "host": self.hosts[slot], "since": float(self.since[r, slot])}
+                for r, slot in zip(*np.nonzero(self.active[:, :len(self.hosts)]))
+            ]
+            recent = list(self.notifications)
+        result = {
+            "active": active,
+            "recent": recent[::-1],
+            "rules": [rule.to_dict() for rule in self.rules],
+            "last_eval_seconds": round(self.last_eval_seconds, 6),
+        }
+        if self.sink is not None:
+            result["webhook"] = {"url": self.sink.url, "sent": self.sink.sent, "dropped": self.sink.dropped}
+        return result
+
+
+def load_rules(path):
+    """Rules from a JSON file (a list of rule objects), or the defaults if missing"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return DEFAULT_RULES
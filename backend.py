@@ -1,13 +1,34 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, abort
 from flask_cors import CORS
-import joblib
 import pandas as pd
 import numpy as np
 import psutil
 import os
+import math
+import time
+import heapq
+import threading
 from datetime import datetime
 import logging
 
+import wire_format
+from system_metrics import METRIC_FIELDS, get_system_metrics
+from fleet import FleetMonitor
+from forecast import RiskForecaster
+from alerts import AlertEngine, WebhookSink, load_rules
+import waitgraph
+from rag_render import render_rag_svg
+from timeline import StateTimeline, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from model_registry import ModelRegistry
+from model_info import load_or_build_snapshot
+from static_assets import StaticAssets
+from early_exit import ProgressiveForest
+from drift import DriftMonitor, load_or_build_reference
+from shared_snapshot import SnapshotReader, sample_processes
+from process_feed import ProcessFeed
+from online_update import LabeledSampleStore, OnlineUpdater
+from manual_sessions import ManualSession, SessionStore
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,15 +36,32 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend communication
 
-# Load the trained models
-try:
-    model_full = joblib.load("rf_model.joblib")
-    model_live = joblib.load("rf_model_live.joblib")
+# Load the trained models; the registry hot-swaps them when the artifacts change.
+# Request handlers fetch the model once via models.get() and use that object throughout.
+# LIVE_MODEL_VARIANT=compact serves the distilled model from phase3_model_distillation.py.
+LIVE_MODEL_PATHS = {"full": "rf_model_live.joblib", "compact": "rf_model_live_compact.joblib"}
+# LIVE_MODEL_EARLY_EXIT=1 serves the live forest with early-exit inference (early_exit.py)
+EARLY_EXIT = os.environ.get("LIVE_MODEL_EARLY_EXIT", "0") == "1"
+LIVE_MODEL_VARIANT = os.environ.get("LIVE_MODEL_VARIANT", "full")
+if LIVE_MODEL_VARIANT not in LIVE_MODEL_PATHS:
+    raise ValueError(f"Unknown LIVE_MODEL_VARIANT '{LIVE_MODEL_VARIANT}', expected one of {sorted(LIVE_MODEL_PATHS)}")
+models = ModelRegistry(
+    {"full": "rf_model.joblib", "live": LIVE_MODEL_PATHS[LIVE_MODEL_VARIANT]},
+    poll_interval=float(os.environ.get("MODEL_POLL_SECONDS", 5)),
+    describe=lambda model, path, sha256, size: load_or_build_snapshot(model, path, sha256, METRIC_FIELDS, size),
+    prepare=lambda name, model: (ProgressiveForest(model)
+                                 if EARLY_EXIT and name == "live" and hasattr(model, "estimators_") else model)
+)
+models.load_all()
+models.start()
+if models.get("full") is not None and models.get("live") is not None:
     logger.info("Models loaded successfully")
-except Exception as e:
-    logger.error(f"Error loading models: {e}")
-    model_full = None
-    model_live = None
+
+# Serialized /api/model-info body for the active live model version
+model_info_responses = {}
+
+# Dashboard files, compressed once at startup
+static_assets = StaticAssets('.')
 
 # Label mapping
 label_map = {"DEADLOCK": 0, "SAFE": 1, "UNSAFE": 2}
@@ -31,62 +69,105 @@ labels = {0: "HIGH-RISK(DEADLOCK-PRONE)", 1: "SAFE", 2: "UNSAFE"}
 
 # Feature columns from training
 feature_columns = None
-live_features = [
-    "num_processes",
-    "cpu_percent",
-    "memory_percent",
-    "disk_percent",
-    "total_allocated",
-    "total_need"
-]
-
-
-def get_system_metrics():
-    """Collect current system metrics"""
-    try:
-        cpu = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory().percent
-        disk = psutil.disk_usage("/").percent if os.name != 'nt' else psutil.disk_usage("C:").percent
-        pids = psutil.pids()
-        
-        # Get detailed process information
-        processes_info = []
-        for pid in pids[:50]:  # Limit to first 50 processes to avoid huge responses
-            try:
-                proc = psutil.Process(pid)
-                proc_info = {
-                    'pid': pid,
-                    'name': proc.name(),
-                    'status': proc.status(),
-                    'cpu_percent': proc.cpu_percent(),
-                    'memory_percent': proc.memory_percent(),
-                }
-                processes_info.append(proc_info)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-        
-        total_allocated = cpu + memory
-        total_need = max(0, 200 - total_allocated)
-        
-        
-        return {
-            "num_processes": len(pids),
-            "cpu_percent": cpu,
-            "memory_percent": memory,
-            "disk_percent": disk,
-            "total_allocated": total_allocated,
-            "total_need": total_need
-            # Removed "processes" field to avoid feature name conflicts
-        }
-    except Exception as e:
-        logger.error(f"Error collecting system metrics: {e}")
-        return None
+live_features = list(METRIC_FIELDS)
+
+# Resource types used by the manual allocation UI
+RESOURCE_NAMES = ['R1', 'R2', 'R3']
+
+# Recorded state history for the Gantt/timeline views
+system_timeline = StateTimeline(key_field="component")
+process_timeline = StateTimeline(key_field="pid")
+
+# Per-host state for metrics pushed by agent.py, scored in batches every tick
+fleet_monitor = FleetMonitor(live_features, lambda: models.get("live"))
+
+# Per-host risk trend, fed by every fleet tick and by /api/live-predict
+LOCAL_HOST = "local"
+risk_forecaster = RiskForecaster()
+fleet_monitor.add_listener(lambda hosts, timestamps, X, probabilities:
+                           risk_forecaster.update_many(hosts, timestamps, probabilities))
+
+# Debounced alert rules over every scored sample (ALERT_WEBHOOK_URL enables notifications)
+alert_webhook = os.environ.get("ALERT_WEBHOOK_URL")
+alert_engine = AlertEngine(
+    live_features,
+    load_rules(os.environ.get("ALERT_RULES", "alert_rules.json")),
+    sink=WebhookSink(alert_webhook) if alert_webhook else None
+)
+fleet_monitor.add_listener(alert_engine.evaluate)
+
+# Host snapshot published by shared_snapshot.py so every worker serves the same sample
+SHARED_SNAPSHOT = os.environ.get("SHARED_SNAPSHOT")
+SHARED_SNAPSHOT_MAX_AGE = float(os.environ.get("SHARED_SNAPSHOT_MAX_AGE", 5))
+SHARED_SNAPSHOT_ATTACH_SECONDS = float(os.environ.get("SHARED_SNAPSHOT_ATTACH_SECONDS", 2))
+shared_snapshot = None
+shared_snapshot_attached_at = 0.0
+shared_snapshot_lock = threading.Lock()
+
+# Live inputs vs the training distribution (reference cached in drift_reference.json)
+try:
+    drift_monitor = DriftMonitor(
+        load_or_build_reference("drift_reference.json", "master_dataset.csv", live_features), live_features
+    )
+    fleet_monitor.add_listener(lambda hosts, timestamps, X, probabilities: drift_monitor.update_many(X))
+except Exception as e:
+    drift_monitor = None
+    logger.error(f"Drift monitor disabled, no training reference: {e}")
+
+# Delta feed of the process table for polling dashboards (/api/processes?since=<seq>)
+process_feed = ProcessFeed(tolerance=float(os.environ.get("PROCESS_FEED_TOLERANCE", 0.5)))
+PROCESS_FEED_SECONDS = float(os.environ.get("PROCESS_FEED_SECONDS", 1))
+PROCESS_FEED_LIMIT = int(os.environ.get("PROCESS_FEED_LIMIT", 30))
+process_feed_lock = threading.Lock()
+process_handles = {}
+last_feed_snapshot_seq = None
+
+# Operator-labelled samples grow the live forest in the background (online_update.py);
+# ONLINE_UPDATE_SECONDS=0 keeps the schedule off, e.g. when online_update.py runs separately
+labeled_samples = LabeledSampleStore(os.environ.get("LABELED_SAMPLES", "labeled_samples.csv"), live_features)
+online_updater = OnlineUpdater(models, "live", labeled_samples, "master_dataset.csv",
+                               interval=float(os.environ.get("ONLINE_UPDATE_SECONDS", 0)))
+online_updater.start()
+
+# Manual-analysis sessions edited with deltas (/api/manual-sessions)
+manual_sessions = SessionStore(ttl=float(os.environ.get("MANUAL_SESSION_TTL", 3600)))
+
+# Latest thread x lock graph per service exported by lockwatch.py
+lock_graphs = {}
+MAX_LOCK_GRAPH_SERVICES = 1000
+
+# Kernel file-lock wait-for graph, scanned every WAIT_GRAPH_SECONDS once requested
+wait_graph = waitgraph.WaitGraphCollector(
+    lambda pids, allocation, request: detect_deadlock_cycle_arrays(pids, allocation, request),
+    interval=float(os.environ.get("WAIT_GRAPH_SECONDS", 1)),
+    on_scan=lambda scan: system_timeline.record("Kernel locks", scan["state"], value=len(scan["cycle"]))
+)
+
 
 # Add new endpoint to get detailed process information
 @app.route('/api/processes', methods=['GET'])
 def get_processes():
     """Get detailed process information"""
     try:
+        if 'since' in request.args:
+            return process_table_delta()
+        
+        snapshot = read_shared_snapshot()
+        if snapshot is not None:
+            processes_info = [
+                dict(info, create_time=datetime.fromtimestamp(info['create_time']).isoformat() if info['create_time'] else None)
+                for info in snapshot['processes']
+            ]
+            process_timeline.record_many(
+                ((info['pid'], info['status'], info['cpu_percent']) for info in processes_info),
+                timestamp=snapshot['timestamp']
+            )
+            return jsonify({
+                "total_processes": snapshot['total_processes'],
+                "processes": processes_info,
+                "timestamp": datetime.fromtimestamp(snapshot['timestamp']).isoformat()
+            })
+        
         # Get all PIDs first
         pids = psutil.pids()[:30]  # Limit to first 30 processes
         
@@ -100,7 +181,6 @@ def get_processes():
                 continue
         
         # Wait a moment to get accurate CPU measurements
-        import time
         time.sleep(0.1)
         
         # Collect process information
@@ -122,6 +202,10 @@ def get_processes():
             except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
                 continue
         
+        process_timeline.record_many(
+            (info['pid'], info['status'], info['cpu_percent']) for info in processes_info
+        )
+        
         result = {
             "total_processes": len(pids),
             "processes": processes_info,
@@ -135,24 +219,59 @@ def get_processes():
         logger.error(f"Error retrieving processes: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/timeline', methods=['GET'])
+def get_timeline():
+    """Get a paginated time window of recorded state segments"""
+    try:
+        source = request.args.get('source', 'system')
+        timeline = {"system": system_timeline, "processes": process_timeline}.get(source)
+        if timeline is None:
+            return jsonify({"error": f"Unknown timeline source: {source}"}), 400
+        
+        keys = request.args.getlist('key') or None
+        if keys and source == "processes":
+            keys = [int(k) for k in keys if k.isdigit()]
+        
+        offset = request.args.get('offset', 0, type=int)
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        if not is_page_offset(offset):
+            return jsonify({"error": "offset must be a non-negative integer"}), 400
+        if not is_page_offset(limit) or limit == 0:
+            return jsonify({"error": "limit must be a positive integer"}), 400
+        
+        page = timeline.window(
+            start=request.args.get('start', type=float),
+            end=request.args.get('end', type=float),
+            keys=keys,
+            offset=offset,
+            limit=limit
+        )
+        page["source"] = source
+        page["timestamp"] = datetime.now().isoformat()
+        return jsonify(page)
+        
+    except Exception as e:
+        logger.error(f"Timeline error: {e}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/')
 def serve_frontend():
     """Serve the frontend HTML file"""
-    return send_from_directory('.', 'index.html')
+    return static_assets.response(app, request, 'index.html')
 
 @app.route('/<path:path>')
 def serve_static(path):
-    """Serve static files"""
+    """Serve static files (precompressed, ETag-validated)"""
     if path.endswith(('.css', '.js', '.html')):
-        return send_from_directory('.', path)
-    return send_from_directory('.', 'index.html')
+        return static_assets.response(app, request, path) or abort(404)
+    return static_assets.response(app, request, 'index.html')
 
 @app.route('/api/health')
 def health_check():
     """Health check endpoint"""
     return jsonify({
         "status": "healthy",
-        "models_loaded": model_full is not None and model_live is not None,
+        "models_loaded": models.get("full") is not None and models.get("live") is not None,
         "timestamp": datetime.now().isoformat()
     })
 
@@ -160,6 +279,10 @@ def health_check():
 def predict_deadlock():
     """Predict deadlock based on provided features"""
     try:
+        model_live = models.get("live")
+        if request.mimetype == wire_format.CONTENT_TYPE:
+            return predict_batch_binary()
+        
         data = request.get_json()
         
         if not data:
@@ -180,8 +303,14 @@ def predict_deadlock():
             return jsonify({"error": "Model not loaded"}), 500
             
         # Make prediction
-        prediction = model_live.predict(X)[0]
-        probabilities = model_live.predict_proba(X)[0]
+        trees_used = None
+        if hasattr(model_live, "predict_proba_with_trees"):
+            probabilities, trees_used = model_live.predict_proba_with_trees(X)
+            probabilities = probabilities[0]
+            prediction = model_live.classes_[probabilities.argmax()]
+        else:
+            prediction = model_live.predict(X)[0]
+            probabilities = model_live.predict_proba(X)[0]
         
         # Get confidence (max probability)
         confidence = max(probabilities) * 100
@@ -198,6 +327,8 @@ def predict_deadlock():
             "risk_level": "HIGH" if prediction == 0 else "MEDIUM" if prediction == 2 else "LOW",
             "timestamp": datetime.now().isoformat()
         }
+        if trees_used is not None:
+            result["trees_used"] = int(trees_used[0])
         
         logger.info(f"Prediction made: {result}")
         return jsonify(result)
@@ -206,27 +337,71 @@ def predict_deadlock():
         logger.error(f"Prediction error: {e}")
         return jsonify({"error": str(e)}), 500
 
+def predict_batch_binary():
+    """Predict a whole KIND_FEATURES frame (see wire_format.py) in one model call"""
+    model_live = models.get("live")
+    try:
+        X = wire_format.decode_features(request.get_data(cache=False), n_features=len(live_features))
+    except wire_format.WireFormatError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if model_live is None:
+        return jsonify({"error": "Model not loaded"}), 500
+    
+    trees_used = None
+    if hasattr(model_live, "predict_proba_with_trees"):
+        probabilities, trees_used = model_live.predict_proba_with_trees(pd.DataFrame(X, columns=live_features))
+    else:
+        probabilities = model_live.predict_proba(pd.DataFrame(X, columns=live_features))
+    predictions = model_live.classes_[probabilities.argmax(axis=1)]
+    
+    result = {
+        "count": len(predictions),
+        "classes": list(label_map),
+        "predictions": predictions.tolist(),
+        "probabilities": np.round(probabilities * 100, 2).tolist(),
+        "timestamp": datetime.now().isoformat()
+    }
+    if trees_used is not None:
+        result["trees_used"] = trees_used.tolist()
+    
+    logger.info(f"Batch prediction made for {len(predictions)} samples")
+    return jsonify(result)
+
 @app.route('/api/live-predict', methods=['GET'])
 def live_prediction():
     """Get live system prediction"""
     try:
-        metrics = get_system_metrics()
+        model_live = models.get("live")
+        snapshot = read_shared_snapshot()
+        metrics = snapshot['metrics'] if snapshot is not None else get_system_metrics()
         
         if metrics is None:
             return jsonify({"error": "Failed to collect system metrics"}), 500
             
-        if model_live is None:
-            return jsonify({"error": "Model not loaded"}), 500
-            
         # Create feature vector
         X = pd.DataFrame([metrics])
         
-        # Make prediction
-        prediction = model_live.predict(X)[0]
-        probabilities = model_live.predict_proba(X)[0]
+        if snapshot is not None and snapshot['prediction'] is not None:
+            # Prediction already made by the sampler for this snapshot
+            prediction = snapshot['prediction']
+            probabilities = snapshot['probabilities']
+        elif model_live is None:
+            return jsonify({"error": "Model not loaded"}), 500
+        else:
+            # Make prediction
+            prediction = model_live.predict(X)[0]
+            probabilities = model_live.predict_proba(X)[0]
         
         # Get confidence
         confidence = max(probabilities) * 100
+        risk_level = "HIGH" if prediction == 0 else "MEDIUM" if prediction == 2 else "LOW"
+        system_timeline.record("Risk", risk_level)
+        now = time.time()
+        risk_forecaster.update(LOCAL_HOST, now, probabilities)
+        alert_engine.evaluate([LOCAL_HOST], [now], X[live_features].to_numpy(), [probabilities])
+        if drift_monitor is not None:
+            drift_monitor.update(X[live_features].to_numpy()[0])
         
         result = {
             "system_metrics": metrics,
@@ -238,7 +413,7 @@ def live_prediction():
                 "SAFE": round(probabilities[1] * 100, 2),
                 "UNSAFE": round(probabilities[2] * 100, 2)
             },
-            "risk_level": "HIGH" if prediction == 0 else "MEDIUM" if prediction == 2 else "LOW",
+            "risk_level": risk_level,
             "processes": [],  # Empty for real-time (could be populated with psutil data)
             "timeline": generate_realtime_timeline(metrics),  # Real-time system timeline
             "events": generate_realtime_events(metrics),  # Real-time system events
@@ -256,7 +431,8 @@ def live_prediction():
 def get_metrics():
     """Get current system metrics"""
     try:
-        metrics = get_system_metrics()
+        snapshot = read_shared_snapshot()
+        metrics = snapshot['metrics'] if snapshot is not None else get_system_metrics()
         
         if metrics is None:
             return jsonify({"error": "Failed to collect system metrics"}), 500
@@ -270,34 +446,272 @@ def get_metrics():
         logger.error(f"Metrics error: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/ingest', methods=['POST'])
+def ingest_metrics():
+    """Receive a batch of metric samples from a remote agent"""
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({"error": "No data provided"}), 400
+        
+        for field in ("host", "fields", "samples"):
+            if field not in data:
+                return jsonify({"error": f"Missing required field: {field}"}), 400
+        
+        try:
+            accepted = fleet_monitor.ingest(str(data['host']), data['fields'], data['samples'])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        return jsonify({"accepted": accepted})
+        
+    except Exception as e:
+        logger.error(f"Ingest error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/labels', methods=['POST'])
+def add_labels():
+    """Store operator-confirmed labels for the next online model update"""
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({"error": "No data provided"}), 400
+        
+        try:
+            if 'samples' in data:
+                # Explicit feature vectors: [{num_processes: ..., ..., label: "UNSAFE"}, ...]
+                samples = data['samples']
+                missing = [f for f in live_features + ['label'] if any(f not in s for s in samples)]
+                if missing:
+                    return jsonify({"error": f"Samples missing fields: {missing}"}), 400
+                X = [[s[f] for f in live_features] for s in samples]
+                sample_labels = [s['label'] for s in samples]
+                source = "api"
+            elif 'host' in data and 'label' in data:
+                # Everything a fleet host reported in [start, end]
+                _, X = fleet_monitor.samples_between(str(data['host']), data.get('start'), data.get('end'))
+                if len(X) == 0:
+                    return jsonify({"error": f"No retained samples for host {data['host']} in that range"}), 404
+                sample_labels = [data['label']] * len(X)
+                source = f"fleet:{data['host']}"
+            else:
+                return jsonify({"error": "Provide samples, or host and label (with optional start/end)"}), 400
+            
+            accepted = labeled_samples.add(X, sample_labels, source)
+        except (ValueError, TypeError) as e:
+            return jsonify({"error": str(e)}), 400
+        
+        return jsonify({"accepted": accepted, "pending_samples": online_updater.status()["pending_samples"]})
+        
+    except Exception as e:
+        logger.error(f"Label ingest error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/online-update', methods=['GET', 'POST'])
+def online_update():
+    """Get the online updater status, or run one update now (POST)"""
+    try:
+        if request.method == 'POST':
+            result = online_updater.run_once()
+            return jsonify({"result": result, "status": online_updater.status(),
+                            "timestamp": datetime.now().isoformat()})
+        
+        result = online_updater.status()
+        result["timestamp"] = datetime.now().isoformat()
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"Online update error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/fleet', methods=['GET'])
+def get_fleet():
+    """Get latest metrics and prediction for every agent host"""
+    try:
+        result = fleet_monitor.snapshot()
+        result["timestamp"] = datetime.now().isoformat()
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"Fleet error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/forecast', methods=['GET'])
+def get_forecast():
+    """Get risk trend and time to UNSAFE/DEADLOCK threshold per host"""
+    try:
+        horizon = request.args.get('horizon', 300, type=float)
+        limit = min(request.args.get('limit', 100, type=int), 1000)
+        host = request.args.get('host')
+        
+        if not math.isfinite(horizon) or horizon <= 0:
+            return jsonify({"error": "horizon must be a finite positive number of seconds"}), 400
+        
+        if host is not None:
+            result = risk_forecaster.forecast(host, horizon)
+            if result is None:
+                return jsonify({"error": f"No samples for host {host}"}), 404
+        else:
+            result = risk_forecaster.forecast_all(horizon, limit)
+        
+        result["timestamp"] = datetime.now().isoformat()
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"Forecast error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/alerts', methods=['GET'])
+def get_alerts():
+    """Get active alerts, recent transitions and the configured rules"""
+    try:
+        result = alert_engine.snapshot()
+        result["timestamp"] = datetime.now().isoformat()
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"Alerts error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/wait-graph', methods=['GET'])
+def get_wait_graph():
+    """Get the kernel file-lock wait-for graph and any deadlock cycle in it"""
+    try:
+        if not waitgraph.available():
+            return jsonify({"error": "Wait-for graph requires Linux /proc/locks"}), 501
+        
+        wait_graph.start()
+        scan = wait_graph.latest or wait_graph.scan()
+        
+        result = {
+            "state": scan["state"],
+            "deadlock_detected": bool(scan["cycle"]),
+            "cycle": scan["cycle"],
+            "cycle_locks": scan["cycle_locks"],
+            "processes": scan["pids"],
+            "locks": scan["locks"],
+            # Sparse [process index, lock index, count] edges; the dense matrices are mostly zeros
+            "holds": waitgraph.sparse_edges(scan["allocation"]),
+            "waits": waitgraph.sparse_edges(scan["request"]),
+            "waiters": scan["waiters"],
+            "blocked_processes": scan["blocked_processes"],
+            "scan_ms": round(scan["scan_seconds"] * 1000, 3),
+            "scanned_at": datetime.fromtimestamp(scan["scanned_at"]).isoformat(),
+        }
+        if request.args.get('svg') in ('1', 'true'):
+            result["rag_svg"] = render_rag_svg(scan["pids"], scan["allocation"], scan["request"], scan["cycle"])
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"Wait-graph error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/lock-graph', methods=['GET', 'POST'])
+def lock_graph():
+    """Receive a service's lock holder/waiter edges (POST) or list the latest graphs (GET)"""
+    try:
+        if request.method == 'GET':
+            return jsonify({"services": list(lock_graphs.values()), "timestamp": datetime.now().isoformat()})
+        
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({"error": "No data provided"}), 400
+        
+        for field in ("service", "threads", "locks", "holds", "waits"):
+            if field not in data:
+                return jsonify({"error": f"Missing required field: {field}"}), 400
+        
+        service = str(data['service'])
+        threads = [str(t.get('name', t.get('id'))) if isinstance(t, dict) else str(t) for t in data['threads']]
+        lock_names = [str(name) for name in data['locks']]
+        
+        allocation = np.zeros((len(threads), len(lock_names)), dtype=np.int32)
+        request_matrix = np.zeros_like(allocation)
+        for matrix, field in ((allocation, 'holds'), (request_matrix, 'waits')):
+            try:
+                edges = np.asarray(data[field], dtype=np.int64).reshape(-1, 2)
+            except (ValueError, TypeError):
+                return jsonify({"error": f"{field} must be [thread index, lock index] pairs"}), 400
+            # Negative indices would wrap around to other threads/locks instead of failing
+            in_range = (edges >= 0).all() and (edges[:, 0] < len(threads)).all() and (edges[:, 1] < len(lock_names)).all()
+            if not in_range:
+                return jsonify({"error": f"{field} indices must be within 0..{len(threads) - 1} (threads) "
+                                         f"and 0..{len(lock_names) - 1} (locks)"}), 400
+            matrix[edges[:, 0], edges[:, 1]] = 1
+        
+        cycle = detect_deadlock_cycle_arrays(list(range(len(threads))), allocation, request_matrix)
+        # P<i>/R<j> nodes back to thread and lock names
+        cycle_path = [threads[int(node[1:])] if node.startswith("P") else lock_names[int(node[1:]) - 1]
+                      for node in cycle]
+        state = "DEADLOCK" if cycle else "WAITING" if request_matrix.any() else "CLEAR"
+        
+        result = {
+            "service": service,
+            "state": state,
+            "deadlock_detected": bool(cycle),
+            "cycle_path": cycle_path,
+            "threads": threads,
+            "locks": lock_names,
+            "holds": int(allocation.sum()),
+            "waits": int(request_matrix.sum()),
+            "contended_acquires": data.get('contended_acquires', {}),
+            "received_at": datetime.now().isoformat()
+        }
+        if service in lock_graphs or len(lock_graphs) < MAX_LOCK_GRAPH_SERVICES:
+            lock_graphs[service] = result
+        system_timeline.record(f"Locks {service}", state, value=len(cycle_path))
+        
+        if cycle:
+            logger.warning(f"Lock deadlock in {service}: {' -> '.join(cycle_path)}")
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"Lock graph error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/drift', methods=['GET'])
+def get_drift():
+    """Get per-feature drift of live inputs against the training data"""
+    try:
+        if drift_monitor is None:
+            return jsonify({"error": "Drift reference not available"}), 500
+        
+        result = drift_monitor.scores()
+        result["timestamp"] = datetime.now().isoformat()
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"Drift error: {e}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/model-info', methods=['GET'])
 def get_model_info():
-    """Get model information"""
+    """Get model information (precomputed per model version, ETag-validated)"""
     try:
-        if model_live is None:
+        active = models.active("live")
+        if active is None:
             return jsonify({"error": "Model not loaded"}), 500
-            
-        # Get feature importance if available
-        feature_importance = {}
-        if hasattr(model_live, 'feature_importances_'):
-            importances = model_live.feature_importances_
-            feature_names = live_features
-            feature_importance = dict(zip(feature_names, importances))
-            # Sort by importance
-            feature_importance = dict(sorted(feature_importance.items(), 
-                                           key=lambda x: x[1], reverse=True))
-        
-        info = {
-            "model_type": type(model_live).__name__,
-            "n_estimators": getattr(model_live, 'n_estimators', 'N/A'),
-            "max_depth": getattr(model_live, 'max_depth', 'N/A'),
-            "features": live_features,
-            "feature_importance": feature_importance,
-            "labels": labels,
-            "timestamp": datetime.now().isoformat()
-        }
         
-        return jsonify(info)
+        body = model_info_responses.get(active.version)
+        if body is None:
+            info = dict(active.info or {})
+            info.update({
+                "version": models.info("live"),
+                "labels": labels,
+                "timestamp": datetime.fromtimestamp(active.loaded_at).isoformat()
+            })
+            body = app.json.dumps(info).encode()
+            model_info_responses.clear()
+            model_info_responses[active.version] = body
+        
+        response = app.response_class(body, mimetype='application/json')
+        response.set_etag(active.version)
+        response.cache_control.no_cache = True  # always revalidate, usually a 304
+        return response.make_conditional(request)
         
     except Exception as e:
         logger.error(f"Model info error: {e}")
@@ -309,6 +723,9 @@ import networkx as nx
 def manual_predict():
     """Handle manual resource allocation input with Banker's algorithm"""
     try:
+        if request.mimetype == wire_format.CONTENT_TYPE:
+            return manual_predict_binary()
+        
         data = request.get_json()
         
         if not data:
@@ -320,6 +737,9 @@ def manual_predict():
         
         available = data['available_resources']
         processes = data['processes']
+        timeline_offset = data.get('timeline_offset', 0)
+        if not is_page_offset(timeline_offset):
+            return jsonify({"error": "timeline_offset must be a non-negative integer"}), 400
         
         # Validate resource format
         required_resources = ['R1', 'R2', 'R3']
@@ -340,37 +760,23 @@ def manual_predict():
                     if res not in res_dict:
                         return jsonify({"error": f"Process {proc['pid']} missing resource {res}"}), 400
         
+        # Dense matrices shared by Banker's algorithm and the RAG renderer
+        avail, pids, allocation, max_need, requested = state_to_arrays(available, processes)
+        
         # Run Banker's algorithm
-        banker_result = bankers_algorithm(available, processes)
+        banker_result = bankers_algorithm_arrays(avail, pids, allocation, max_need, requested)
         
         # Create ML feature vector
         ml_features = create_ml_features(processes, available)
         
         # Run ML prediction
-        if model_live is not None:
-            X = pd.DataFrame([ml_features])
-            prediction = model_live.predict(X)[0]
-            probabilities = model_live.predict_proba(X)[0]
-            
-            # Map predictions to states
-            state_mapping = {0: "DEADLOCK", 1: "SAFE", 2: "UNSAFE"}
-            ml_state = state_mapping.get(prediction, "UNSAFE")
-            
-            ml_probabilities = {
-                "SAFE": float(probabilities[1] * 100),
-                "UNSAFE": float(probabilities[2] * 100),
-                "DEADLOCK": float(probabilities[0] * 100)
-            }
-        else:
-            # Fallback if model not available
-            ml_state = banker_result['state']
-            ml_probabilities = {"SAFE": 0.5, "UNSAFE": 0.3, "DEADLOCK": 0.2}
+        ml_state, ml_probabilities = predict_manual_state(pd.DataFrame([ml_features]), banker_result)
         
-        # Generate RAG visualization
-        rag_viz = "<svg>Temporary RAG visualization</svg>"  # Simplified for now
+        # Generate RAG visualization (cached by graph structure)
+        rag_viz = render_rag_svg(pids, allocation, requested, banker_result.get('cycle', []))
         
-        # Generate timeline simulation data
-        timeline_data = []  # Simplified for now
+        # Generate timeline from the Banker's execution order (request timeline_offset for later pages)
+        timeline_page = generate_manual_timeline(pids, banker_result, offset=timeline_offset)
         
         result = {
             "state": banker_result['state'],
@@ -380,92 +786,327 @@ def manual_predict():
             "rag_visualization": rag_viz,
             "ml_prediction": ml_state,
             "processes": processes,  # Include processes data for Gantt chart
-            "timeline": timeline_data,  # Timeline simulation data
+            **timeline_fields(timeline_page),  # Timeline simulation data
             "events": [],  # System events
             "timestamp": datetime.now().isoformat()
         }
         
-        logger.info(f"Manual prediction completed: {result}")
+        logger.info(f"Manual prediction completed: {result['state']} for {len(processes)} processes")
         return jsonify(result)
         
     except Exception as e:
         logger.error(f"Manual prediction error: {e}")
         return jsonify({"error": str(e)}), 500
 
-def bankers_algorithm(available, processes):
-    """Implement Banker's safety algorithm"""
+def analyze_manual_session(session, render=True, timeline_offset=0):
+    """Banker's check of a session resuming from its previous order, plus ML and optional views"""
+    avail, pids, allocation = session.available, session.pids, session.allocation
+    need = session.max_need - allocation
+    
+    # Keep the still-valid part of the last order; search only the rest
+    prefix, work = session.valid_prefix(need)
+    rest = np.setdiff1d(np.arange(len(pids)), prefix, assume_unique=True)
+    order = np.concatenate([prefix, rest[safe_order(work, allocation[rest], need[rest])]]).astype(np.int64)
+    session.sequence = order
+    
+    if len(order) < len(pids):
+        banker_result = {
+            "state": "DEADLOCK",
+            "safe_sequence": [],
+            "cycle": detect_deadlock_cycle_arrays(pids, allocation, session.request)
+        }
+    else:
+        request_safe = bool((session.request <= need).all() and (session.request <= avail).all())
+        banker_result = {
+            "state": "SAFE" if request_safe else "UNSAFE",
+            "safe_sequence": [f"P{pids[i]}" for i in order.tolist()],
+            "cycle": []
+        }
+    
+    X = create_ml_features_batch(allocation[np.newaxis], session.max_need[np.newaxis], avail[np.newaxis],
+                                 as_frame=True)
+    # Request and priority edits leave the features alone; skip the forest then
+    ml_key = (tuple(X.iloc[0].tolist()), banker_result['state'], id(models.get("live")))
+    if session.ml_cache is None or session.ml_cache[0] != ml_key:
+        session.ml_cache = (ml_key, *predict_manual_state(X, banker_result))
+    _, ml_state, ml_probabilities = session.ml_cache
+    
+    result = {
+        "session": session.session_id,
+        "version": session.version,
+        "state": banker_result['state'],
+        "probabilities": ml_probabilities,
+        "safe_sequence": banker_result['safe_sequence'],
+        "rag_cycle": banker_result['cycle'],
+        "ml_prediction": ml_state,
+        "num_processes": len(pids),
+        "reused_sequence": len(prefix),
+        "timestamp": datetime.now().isoformat()
+    }
+    if render:
+        result["rag_visualization"] = render_rag_svg(pids, allocation, session.request, banker_result['cycle'])
+        result.update(timeline_fields(generate_manual_timeline(pids, banker_result, offset=timeline_offset)))
+    return result
+
+@app.route('/api/manual-sessions', methods=['POST'])
+def create_manual_session():
+    """Start a manual-analysis session from a full /api/manual_predict state"""
     try:
-        # Convert to format suitable for algorithm
-        num_processes = len(processes)
-        num_resources = 3  # R1, R2, R3
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({"error": "No data provided"}), 400
+        if 'available_resources' not in data or 'processes' not in data:
+            return jsonify({"error": "Missing required fields: available_resources, processes"}), 400
+        if not is_page_offset(data.get('timeline_offset', 0)):
+            return jsonify({"error": "timeline_offset must be a non-negative integer"}), 400
         
-        # Initialize arrays
-        allocation = []
-        max_need = []
-        request = []
-        pids = []
+        try:
+            session = ManualSession(data['available_resources'], data['processes'])
+        except (ValueError, TypeError) as e:
+            return jsonify({"error": str(e)}), 400
         
-        for proc in processes:
-            allocation.append([proc['allocated']['R1'], proc['allocated']['R2'], proc['allocated']['R3']])
-            max_need.append([proc['max_need']['R1'], proc['max_need']['R2'], proc['max_need']['R3']])
-            request.append([proc['request']['R1'], proc['request']['R2'], proc['request']['R3']])
-            pids.append(proc['pid'])
+        manual_sessions.add(session)
+        with session.lock:
+            result = analyze_manual_session(session, render=data.get('render', True),
+                                            timeline_offset=data.get('timeline_offset', 0))
+        logger.info(f"Manual session {session.session_id} started with {len(session.pids)} processes")
+        return jsonify(result), 201
+        
+    except Exception as e:
+        logger.error(f"Manual session error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/manual-sessions/<session_id>', methods=['GET', 'PATCH', 'DELETE'])
+def manual_session(session_id):
+    """Get the full state (GET), apply edits and recheck (PATCH), or end a session (DELETE)"""
+    try:
+        if request.method == 'DELETE':
+            if not manual_sessions.remove(session_id):
+                return jsonify({"error": f"Unknown session {session_id}"}), 404
+            return jsonify({"deleted": session_id})
+        
+        session = manual_sessions.get(session_id)
+        if session is None:
+            return jsonify({"error": f"Unknown or expired session {session_id}"}), 404
+        
+        if request.method == 'GET':
+            with session.lock:
+                result = session.to_json()
+                result.update(session=session_id, version=session.version)
+            return jsonify(result)
         
-        avail = [available['R1'], available['R2'], available['R3']]
+        data = request.get_json()
+        if not data or 'edits' not in data:
+            return jsonify({"error": "Missing required field: edits"}), 400
+        if not is_page_offset(data.get('timeline_offset', 0)):
+            return jsonify({"error": "timeline_offset must be a non-negative integer"}), 400
+        
+        with session.lock:
+            if 'version' in data and data['version'] != session.version:
+                return jsonify({"error": "Session changed since that version; GET it and retry",
+                                "version": session.version}), 409
+            try:
+                touched = session.apply(data['edits'])
+            except (ValueError, TypeError) as e:
+                return jsonify({"error": str(e)}), 400
+            # Views are opt-in per edit: they are the costly part for large states
+            result = analyze_manual_session(session, render=data.get('render', False),
+                                            timeline_offset=data.get('timeline_offset', 0))
+        result["changed"] = touched
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"Manual session error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+def read_shared_snapshot():
+    """Latest sampler snapshot, or None to sample in this worker"""
+    global shared_snapshot, shared_snapshot_attached_at
+    if not SHARED_SNAPSHOT:
+        return None
+    with shared_snapshot_lock:
+        if shared_snapshot is None:
+            # The sampler may start after the workers, or restart with a new
+            # segment; retry attaching at most every SHARED_SNAPSHOT_ATTACH_SECONDS
+            now = time.time()
+            if now - shared_snapshot_attached_at < SHARED_SNAPSHOT_ATTACH_SECONDS:
+                return None
+            shared_snapshot_attached_at = now
+            shared_snapshot = SnapshotReader.attach(SHARED_SNAPSHOT)
+            if shared_snapshot is None:
+                return None
+        snapshot = shared_snapshot.read(max_age=SHARED_SNAPSHOT_MAX_AGE)
+        if snapshot is None:
+            # Stale or missing: the mapping may be an unlinked segment, re-attach next time
+            shared_snapshot.close()
+            shared_snapshot = None
+        return snapshot
+
+def refresh_process_feed():
+    """Publish a new process sample to the feed when the current one is stale"""
+    global last_feed_snapshot_seq
+    with process_feed_lock:
+        snapshot = read_shared_snapshot()
+        if snapshot is not None:
+            if snapshot['seq'] == last_feed_snapshot_seq:
+                return
+            last_feed_snapshot_seq = snapshot['seq']
+            processes, total = snapshot['processes'], snapshot['total_processes']
+            metrics, timestamp = snapshot['metrics'], snapshot['timestamp']
+        elif process_feed.age() >= PROCESS_FEED_SECONDS:
+            # Cached psutil handles: cpu_percent is measured since the previous refresh, no sleep
+            processes, total = sample_processes(process_handles, PROCESS_FEED_LIMIT)
+            metrics, timestamp = get_system_metrics(interval=None), time.time()
+        else:
+            return
+        process_feed.publish(processes, metrics, total, timestamp)
+        process_timeline.record_many(
+            ((info['pid'], info['status'], info['cpu_percent']) for info in processes), timestamp=timestamp
+        )
+
+def process_table_delta():
+    """Rows added, changed or removed since the client's seq (full table on resync)"""
+    since = request.args.get('since', '')
+    if since and not since.isdigit():
+        return jsonify({"error": "since must be a non-negative integer sequence number"}), 400
+    refresh_process_feed()
+    return jsonify(process_feed.since(int(since) if since else None, request.args.get('feed')))
+
+def state_to_arrays(available, processes):
+    """Convert a JSON allocation state into dense allocation/max/request matrices"""
+    pids = np.array([proc['pid'] for proc in processes])
+    allocation = np.array([[proc['allocated'][res] for res in RESOURCE_NAMES] for proc in processes]).reshape(-1, 3)
+    max_need = np.array([[proc['max_need'][res] for res in RESOURCE_NAMES] for proc in processes]).reshape(-1, 3)
+    request = np.array([[proc['request'][res] for res in RESOURCE_NAMES] for proc in processes]).reshape(-1, 3)
+    avail = np.array([available[res] for res in RESOURCE_NAMES])
+    return avail, pids, allocation, max_need, request
+
+def manual_predict_binary():
+    """Handle a binary KIND_STATE frame (see wire_format.py) for manual prediction"""
+    try:
+        state = wire_format.decode_state(request.get_data(cache=False))
+    except wire_format.WireFormatError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    banker_result = bankers_algorithm_arrays(
+        state['available'], state['pids'], state['allocated'], state['max_need'], state['request']
+    )
+    
+    X = create_ml_features_batch(
+        state['allocated'][np.newaxis], state['max_need'][np.newaxis], state['available'][np.newaxis],
+        as_frame=True
+    )
+    ml_state, ml_probabilities = predict_manual_state(X, banker_result)
+    
+    result = {
+        "state": banker_result['state'],
+        "probabilities": ml_probabilities,
+        "safe_sequence": banker_result.get('safe_sequence', []),
+        "rag_cycle": banker_result.get('cycle', []),
+        "rag_visualization": render_rag_svg(
+            state['pids'], state['allocated'], state['request'], banker_result.get('cycle', [])
+        ),
+        "ml_prediction": ml_state,
+        "num_processes": len(state['pids']),
+        "num_resources": len(state['available']),
+        "timestamp": datetime.now().isoformat()
+    }
+    
+    logger.info(f"Binary manual prediction completed: {result['state']} for {len(state['pids'])} processes")
+    return jsonify(result)
+
+def predict_manual_state(X, banker_result):
+    """Run the live model on a manual-analysis feature row"""
+    model_live = models.get("live")
+    if model_live is None:
+        # Fallback if model not available
+        return banker_result['state'], {"SAFE": 0.5, "UNSAFE": 0.3, "DEADLOCK": 0.2}
+    
+    probabilities = model_live.predict_proba(X)[0]
+    prediction = model_live.classes_[probabilities.argmax()]
+    
+    # Map predictions to states
+    state_mapping = {0: "DEADLOCK", 1: "SAFE", 2: "UNSAFE"}
+    ml_state = state_mapping.get(prediction, "UNSAFE")
+    
+    ml_probabilities = {
+        "SAFE": float(probabilities[1] * 100),
+        "UNSAFE": float(probabilities[2] * 100),
+        "DEADLOCK": float(probabilities[0] * 100)
+    }
+    return ml_state, ml_probabilities
+
+def bankers_algorithm(available, processes):
+    """Implement Banker's safety algorithm"""
+    try:
+        return bankers_algorithm_arrays(*state_to_arrays(available, processes))
+    except Exception as e:
+        logger.error(f"Banker's algorithm error: {e}")
+        return {
+            "state": "UNSAFE",
+            "safe_sequence": [],
+            "cycle": []
+        }
+
+def safe_order(avail, allocation, need):
+    """Banker's completion order as row indices; shorter than allocation if some rows can never finish"""
+    num_processes = len(allocation)
+    
+    # Work vector
+    work = np.array(avail, dtype=np.result_type(avail, allocation, np.int64))
+    
+    # Per resource, processes sorted by need: as work only grows, a pointer
+    # per column tracks which processes are satisfied on that resource.
+    # A process becomes runnable once all its columns are satisfied.
+    order = np.argsort(need, axis=0, kind='stable')
+    sorted_need = np.take_along_axis(need, order, axis=0)
+    pointers = [0] * need.shape[1]
+    satisfied = np.zeros(num_processes, dtype=np.int64)
+    runnable = []
+    
+    def release_runnable():
+        for j in range(need.shape[1]):
+            end = int(np.searchsorted(sorted_need[:, j], work[j], side='right'))
+            if end > pointers[j]:
+                newly = order[pointers[j]:end, j]
+                satisfied[newly] += 1
+                for i in newly[satisfied[newly] == need.shape[1]]:
+                    heapq.heappush(runnable, int(i))
+                pointers[j] = end
+    
+    # Safety algorithm: always pick the lowest-index process that can finish
+    completed = []
+    release_runnable()
+    while runnable:
+        i = heapq.heappop(runnable)
+        work += allocation[i]
+        completed.append(i)
+        release_runnable()
+    return completed
+
+def bankers_algorithm_arrays(avail, pids, allocation, max_need, request):
+    """Banker's safety algorithm over dense (processes, resources) matrices"""
+    try:
+        num_processes = len(pids)
         
         # Calculate need matrix
-        need = []
-        for i in range(num_processes):
-            need_row = []
-            for j in range(num_resources):
-                need_row.append(max_need[i][j] - allocation[i][j])
-            need.append(need_row)
-        
-        # Work vectors
-        work = avail.copy()
-        finish = [False] * num_processes
-        
-        # Safety algorithm
-        safe_sequence = []
-        while len(safe_sequence) < num_processes:
-            found = False
-            for i in range(num_processes):
-                if not finish[i]:
-                    # Check if need <= work
-                    if all(need[i][j] <= work[j] for j in range(num_resources)):
-                        # Process can finish
-                        for j in range(num_resources):
-                            work[j] += allocation[i][j]
-                        finish[i] = True
-                        safe_sequence.append(f"P{pids[i]}")
-                        found = True
-                        break
-            
-            if not found:
-                # Deadlock detected
-                # Find cycle in resource allocation graph
-                cycle = detect_deadlock_cycle(processes, available)
-                return {
-                    "state": "DEADLOCK",
-                    "safe_sequence": [],
-                    "cycle": cycle
-                }
+        need = max_need - allocation
+        
+        safe_sequence = [f"P{pids[i]}" for i in safe_order(avail, allocation, need)]
+        
+        if len(safe_sequence) < num_processes:
+            # Deadlock detected
+            # Find cycle in resource allocation graph
+            cycle = detect_deadlock_cycle_arrays(pids, allocation, request)
+            return {
+                "state": "DEADLOCK",
+                "safe_sequence": [],
+                "cycle": cycle
+            }
         
-        # Check if request can be granted safely
-        request_safe = True
-        for proc in processes:
-            req = [proc['request']['R1'], proc['request']['R2'], proc['request']['R3']]
-            alloc = [proc['allocated']['R1'], proc['allocated']['R2'], proc['allocated']['R3']]
-            
-            # Check if request <= need
-            if not all(req[i] <= (proc['max_need'][f'R{i+1}'] - alloc[i]) for i in range(3)):
-                request_safe = False
-                break
-            
-            # Check if request <= available
-            if not all(req[i] <= available[f'R{i+1}'] for i in range(3)):
-                request_safe = False
-                break
+        # Check if every request can be granted safely (request <= need and request <= available)
+        request_safe = bool((request <= need).all() and (request <= avail).all())
         
         state = "SAFE" if request_safe else "UNSAFE"
         
@@ -485,28 +1126,30 @@ def bankers_algorithm(available, processes):
 
 def detect_deadlock_cycle(processes, available):
     """Detect cycles in resource allocation graph"""
+    try:
+        _, pids, allocation, _, request = state_to_arrays(available, processes)
+        return detect_deadlock_cycle_arrays(pids, allocation, request)
+    except Exception as e:
+        logger.error(f"Cycle detection error: {e}")
+        return []
+
+def detect_deadlock_cycle_arrays(pids, allocation, request):
+    """Detect cycles in the resource allocation graph built from dense matrices"""
     try:
         G = nx.DiGraph()
+        resources = [f"R{j + 1}" for j in range(allocation.shape[1])]
         
-        # Add process nodes
-        for proc in processes:
-            G.add_node(f"P{proc['pid']}", type='process')
-        
-        # Add resource nodes
-        for res in ['R1', 'R2', 'R3']:
-            G.add_node(res, type='resource')
+        # Add process and resource nodes
+        G.add_nodes_from((f"P{pid}" for pid in pids), type='process')
+        G.add_nodes_from(resources, type='resource')
         
         # Add allocation edges (process -> resource)
-        for proc in processes:
-            for res in ['R1', 'R2', 'R3']:
-                if proc['allocated'][res] > 0:
-                    G.add_edge(f"P{proc['pid']}", res)
+        rows, cols = np.nonzero(allocation > 0)
+        G.add_edges_from((f"P{pids[i]}", resources[j]) for i, j in zip(rows, cols))
         
         # Add request edges (resource -> process)
-        for proc in processes:
-            for res in ['R1', 'R2', 'R3']:
-                if proc['request'][res] > 0:
-                    G.add_edge(res, f"P{proc['pid']}")
+        rows, cols = np.nonzero(request > 0)
+        G.add_edges_from((resources[j], f"P{pids[i]}") for i, j in zip(rows, cols))
         
         # Detect cycles
         try:
@@ -594,80 +1237,121 @@ def create_ml_features(processes, available):
             "total_need": 0
         }
 
-def generate_realtime_timeline(metrics):
-    """Generate timeline data for real-time system monitoring"""
+# Knots of the piecewise-linear pressure -> utilisation mapping used by
+# create_ml_features(). The last knot is where the overcommitted branch
+# saturates (cpu/memory cap +5 at pressure 1.5, disk cap +10 at pressure 2.0).
+PRESSURE_KNOTS = {
+    "cpu_percent": ([0.0, 0.3, 0.6, 1.0, 1.5], [20, 40, 70, 95, 100]),
+    "memory_percent": ([0.0, 0.3, 0.6, 1.0, 1.5], [30, 50, 70, 95, 100]),
+    "disk_percent": ([0.0, 0.3, 0.6, 1.0, 2.0], [10, 30, 50, 70, 80]),
+}
+
+def create_ml_features_batch(allocated, max_need, available, num_processes=None, as_frame=False):
+    """Create ML feature matrix for many resource states at once
+
+    allocated, max_need: (scenarios, processes, resources) arrays
+    available: (scenarios, resources) array
+    num_processes: optional per-scenario process count when rows are zero-padded
+    """
+    allocated = np.asarray(allocated, dtype=np.float64)
+    max_need = np.asarray(max_need, dtype=np.float64)
+    available = np.asarray(available, dtype=np.float64)
+
+    if allocated.ndim != 3 or allocated.shape != max_need.shape:
+        raise ValueError("allocated and max_need must share a (scenarios, processes, resources) shape")
+    if available.shape != (allocated.shape[0], allocated.shape[2]):
+        raise ValueError("available must have shape (scenarios, resources)")
+
+    n_scenarios, n_procs, _ = allocated.shape
+    if num_processes is None:
+        num_processes = np.full(n_scenarios, n_procs, dtype=np.float64)
+
+    total_allocated = allocated.sum(axis=(1, 2))
+    # Need is clipped per process, exactly like the scalar version
+    total_need = np.clip((max_need - allocated).sum(axis=2), 0, None).sum(axis=1)
+    resource_pressure = total_allocated / (available.sum(axis=1) + 1)
+
+    X = np.empty((n_scenarios, len(live_features)), dtype=np.float64)
+    X[:, 0] = num_processes
+    for col, name in enumerate(("cpu_percent", "memory_percent", "disk_percent"), start=1):
+        knots, values = PRESSURE_KNOTS[name]
+        X[:, col] = np.round(np.interp(resource_pressure, knots, values), 1)
+    X[:, 4] = total_allocated
+    X[:, 5] = total_need
+
+    if as_frame:
+        return pd.DataFrame(X, columns=live_features)
+    return X
+
+def utilization_state(value, moderate, high):
+    """Classify a utilisation percentage for the system timeline"""
+    if value > high:
+        return "high_utilization"
+    if value > moderate:
+        return "moderate_utilization"
+    return "normal"
+
+def generate_realtime_timeline(metrics, window_seconds=300):
+    """Record a metrics snapshot and return the recent system timeline"""
     try:
-        # Create simulated timeline based on current system metrics
         cpu_load = metrics.get('cpu_percent', 0)
         memory_load = metrics.get('memory_percent', 0)
-        num_processes = metrics.get('num_processes', 0)
-        
-        timeline_events = []
-        current_time = 0
-        
-        # Simulate system behavior based on current load
-        if cpu_load > 80 or memory_load > 85:
-            # High load scenario
-            timeline_events.append({
-                "component": "CPU",
-                "start_time": 0,
-                "duration": 8,
-                "state": "high_utilization",
-                "value": cpu_load
-            })
-            timeline_events.append({
-                "component": "Memory",
-                "start_time": 2,
-                "duration": 10,
-                "state": "high_utilization", 
-                "value": memory_load
-            })
-            timeline_events.append({
-                "component": "Processes",
-                "start_time": 5,
-                "duration": 6,
-                "state": "spike",
-                "value": num_processes
-            })
-        elif cpu_load > 50 or memory_load > 60:
-            # Medium load scenario
-            timeline_events.append({
-                "component": "CPU",
-                "start_time": 0,
-                "duration": 12,
-                "state": "moderate_utilization",
-                "value": cpu_load
-            })
-            timeline_events.append({
-                "component": "Memory", 
-                "start_time": 3,
-                "duration": 8,
-                "state": "moderate_utilization",
-                "value": memory_load
-            })
-        else:
-            # Normal load scenario
-            timeline_events.append({
-                "component": "CPU",
-                "start_time": 0,
-                "duration": 15,
-                "state": "normal",
-                "value": cpu_load
-            })
-            timeline_events.append({
-                "component": "Memory",
-                "start_time": 2,
-                "duration": 13,
-                "state": "normal",
-                "value": memory_load
-            })
+        now = time.time()
         
-        return timeline_events
+        system_timeline.record_many([
+            ("CPU", utilization_state(cpu_load, 50, 80), cpu_load),
+            ("Memory", utilization_state(memory_load, 60, 85), memory_load),
+            ("Processes", "active", metrics.get('num_processes', 0)),
+        ], timestamp=now)
+        
+        return system_timeline.window(start=now - window_seconds, end=now)['segments']
         
     except Exception as e:
         logger.error(f"Real-time timeline generation error: {e}")
         return []
 
+def generate_manual_timeline(pids, banker_result, offset=0):
+    """Build one page of Gantt segments from the Banker's execution order of a manual state"""
+    pids = pids.tolist() if isinstance(pids, np.ndarray) else list(pids)
+    # One key per process: the default max_keys would evict (and drop) processes of large states
+    timeline = StateTimeline(key_field="pid", max_gap=float("inf"), max_keys=max(len(pids), 1))
+    
+    if banker_result['state'] == "DEADLOCK":
+        on_cycle = set(banker_result.get('cycle', []))
+        for pid in pids:
+            state = "deadlock" if f"P{pid}" in on_cycle else "blocked"
+            timeline.record(pid, state, 0)
+            timeline.record(pid, state, 1)
+    else:
+        # Step k of the safe sequence runs one process; earlier ones have finished.
+        # Processes missing from a partial (or empty, on fallback) sequence stay blocked.
+        position = {name: k for k, name in enumerate(banker_result.get('safe_sequence', []))}
+        steps = len(position)
+        for pid in pids:
+            k = position.get(f"P{pid}")
+            if k is None:
+                timeline.record(pid, "blocked", 0)
+                timeline.record(pid, "blocked", max(steps, 1))
+                continue
+            for state, begin, finish in (("waiting", 0, k), ("running", k, k + 1), ("finished", k + 1, steps)):
+                if finish > begin:
+                    timeline.record(pid, state, begin)
+                    timeline.record(pid, state, finish)
+    
+    return timeline.window(offset=offset, limit=MAX_PAGE_SIZE)
+
+def is_page_offset(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+def timeline_fields(page):
+    """Response fields for one manual timeline page; large states span several pages"""
+    return {
+        "timeline": page['segments'],
+        "timeline_total": page['total'],
+        "timeline_truncated": page['next_offset'] is not None,
+        "timeline_next_offset": page['next_offset'],
+    }
+
 def generate_realtime_events(metrics):
     """Generate events for real-time system monitoring"""
     try:
@@ -692,153 +1376,12 @@ def generate_realtime_events(metrics):
 def generate_rag_visualization(processes, available, cycle):
     """Generate SVG visualization of Resource Allocation Graph"""
     try:
-        # Create SVG content
-        svg_content = f'''
-        <svg width="100%" height="300" viewBox="0 0 600 300">
-            <!-- Legend -->
-            <text x="10" y="20" font-family="Arial" font-size="12" fill="#07393C">Legend: ▢ Process ○ Resource</text>
-            <text x="10" y="35" font-family="Arial" font-size="12" fill="#2C666E">Solid: Allocation | Dashed: Request</text>
-            
-            <!-- Processes -->
-        '''
-        
-        # Add process nodes
-        process_positions = {}
-        for i, proc in enumerate(processes):
-            x = 100 + (i * 150)
-            y = 80
-            pid = proc['pid']
-            process_positions[pid] = (x, y)
-            
-            # Highlight if in cycle
-            fill_color = "#e74c3c" if f"P{pid}" in cycle else "#3b82f6"
-            stroke_color = "#c0392b" if f"P{pid}" in cycle else "#1d4ed8"
-            
-            svg_content += f'''
-            <rect x="{x-25}" y="{y-25}" width="50" height="50" fill="{fill_color}" 
-                  stroke="{stroke_color}" stroke-width="2" rx="8"/>
-            <text x="{x}" y="{y+5}" text-anchor="middle" fill="white" font-family="Arial" font-size="12">P{pid}</text>
-            '''
-        
-        # Add resource nodes
-        resource_positions = {'R1': (150, 200), 'R2': (300, 200), 'R3': (450, 200)}
-        for res, (x, y) in resource_positions.items():
-            svg_content += f'''
-            <circle cx="{x}" cy="{y}" r="25" fill="#10b981" stroke="#047857" stroke-width="2"/>
-            <text x="{x}" y="{y+5}" text-anchor="middle" fill="white" font-family="Arial" font-size="12">{res}</text>
-            '''
-        
-        # Add allocation edges (solid arrows)
-        for proc in processes:
-            pid = proc['pid']
-            px, py = process_positions[pid]
-            for res in ['R1', 'R2', 'R3']:
-                if proc['allocated'][res] > 0:
-                    rx, ry = resource_positions[res]
-                    # Process to Resource
-                    svg_content += f'''
-                    <line x1="{px}" y1="{py+25}" x2="{rx}" y2="{ry-25}" 
-                          stroke="#2C666E" stroke-width="2" marker-end="url(#arrow)"/>
-                    '''
-        
-        # Add request edges (dashed arrows)
-        for proc in processes:
-            pid = proc['pid']
-            px, py = process_positions[pid]
-            for res in ['R1', 'R2', 'R3']:
-                if proc['request'][res] > 0:
-                    rx, ry = resource_positions[res]
-                    # Resource to Process
-                    svg_content += f'''
-                    <line x1="{rx}" y1="{ry-25}" x2="{px}" y2="{py-25}" 
-                          stroke="#f59e0b" stroke-width="2" stroke-dasharray="5,5" marker-end="url(#arrow)"/>
-                    '''
-        
-        # Add arrow marker definition
-        svg_content += '''
-            <defs>
-                <marker id="arrow" markerWidth="10" markerHeight="10" refX="9" refY="3" 
-                        orient="auto" markerUnits="strokeWidth">
-                    <path d="M0,0 L0,6 L9,3 z" fill="#333"/>
-                </marker>
-            </defs>
-        </svg>
-        '''
-        
-        return svg_content.strip()
+        _, pids, allocation, _, request = state_to_arrays(available, processes)
+        return render_rag_svg(pids, allocation, request, cycle)
         
     except Exception as e:
         logger.error(f"RAG visualization error: {e}")
         return "<p>Error generating visualization</p>"
-    """Generate timeline simulation data for Gantt chart"""
-    try:
-        timeline_events = []
-        current_time = 0
-        
-        if system_state == "DEADLOCK":
-            # Deadlock scenario simulation
-            for i, proc in enumerate(processes):
-                # Each process runs for a while then gets stuck
-                start_time = current_time
-                run_duration = 5 + i * 2  # Different durations
-                timeline_events.append({
-                    "pid": proc['pid'],
-                    "start_time": start_time,
-                    "duration": run_duration,
-                    "state": "running",
-                    "end_time": start_time + run_duration
-                })
-                current_time += run_duration
-                
-                # Deadlock occurs
-                timeline_events.append({
-                    "pid": proc['pid'],
-                    "start_time": current_time,
-                    "duration": 0,  # Instant event
-                    "state": "deadlock",
-                    "end_time": current_time,
-                    "description": f"Deadlock detected for P{proc['pid']}"
-                })
-                
-        elif system_state == "UNSAFE":
-            # Unsafe scenario simulation
-            for proc in processes:
-                # Mix of states
-                states = ["waiting", "running", "unsafe", "running"]
-                durations = [2, 6, 3, 4]
-                
-                for state, duration in zip(states, durations):
-                    timeline_events.append({
-                        "pid": proc['pid'],
-                        "start_time": current_time,
-                        "duration": duration,
-                        "state": state,
-                        "end_time": current_time + duration
-                    })
-                    current_time += duration
-                    
-        else:
-            # Safe scenario simulation
-            for proc in processes:
-                # Mostly running with some waiting
-                states = ["waiting", "running", "waiting"]
-                durations = [1, 12, 2]
-                
-                for state, duration in zip(states, durations):
-                    timeline_events.append({
-                        "pid": proc['pid'],
-                        "start_time": current_time,
-                        "duration": duration,
-                        "state": state,
-                        "end_time": current_time + duration
-                    })
-                    current_time += duration
-        
-        return timeline_events
-        
-    except Exception as e:
-        logger.error(f"Timeline simulation error: {e}")
-        return []
 
 def generate_system_events(system_state):
     """Generate system-level events for timeline"""
@@ -869,88 +1412,12 @@ def generate_system_events(system_state):
     except Exception as e:
         logger.error(f"System events generation error: {e}")
         return []
-    """Generate SVG visualization of Resource Allocation Graph"""
-    try:
-        # Create SVG content
-        svg_content = f'''
-        <svg width="100%" height="300" viewBox="0 0 600 300">
-            <!-- Legend -->
-            <text x="10" y="20" font-family="Arial" font-size="12" fill="#07393C">Legend: ▢ Process ○ Resource</text>
-            <text x="10" y="35" font-family="Arial" font-size="12" fill="#2C666E">Solid: Allocation | Dashed: Request</text>
-            
-            <!-- Processes -->
-        '''
-        
-        # Add process nodes
-        process_positions = {}
-        for i, proc in enumerate(processes):
-            x = 100 + (i * 150)
-            y = 80
-            pid = proc['pid']
-            process_positions[pid] = (x, y)
-            
-            # Highlight if in cycle
-            fill_color = "#e74c3c" if f"P{pid}" in cycle else "#3b82f6"
-            stroke_color = "#c0392b" if f"P{pid}" in cycle else "#1d4ed8"
-            
-            svg_content += f'''
-            <rect x="{x-25}" y="{y-25}" width="50" height="50" fill="{fill_color}" 
-                  stroke="{stroke_color}" stroke-width="2" rx="8"/>
-            <text x="{x}" y="{y+5}" text-anchor="middle" fill="white" font-family="Arial" font-size="12">P{pid}</text>
-            '''
-        
-        # Add resource nodes
-        resource_positions = {'R1': (150, 200), 'R2': (300, 200), 'R3': (450, 200)}
-        for res, (x, y) in resource_positions.items():
-            svg_content += f'''
-            <circle cx="{x}" cy="{y}" r="25" fill="#10b981" stroke="#047857" stroke-width="2"/>
-            <text x="{x}" y="{y+5}" text-anchor="middle" fill="white" font-family="Arial" font-size="12">{res}</text>
-            '''
-        
-        # Add allocation edges (solid arrows)
-        for proc in processes:
-            pid = proc['pid']
-            px, py = process_positions[pid]
-            for res in ['R1', 'R2', 'R3']:
-                if proc['allocated'][res] > 0:
-                    rx, ry = resource_positions[res]
-                    # Process to Resource
-                    svg_content += f'''
-                    <line x1="{px}" y1="{py+25}" x2="{rx}" y2="{ry-25}" 
-                          stroke="#2C666E" stroke-width="2" marker-end="url(#arrow)"/>
-                    '''
-        
-        # Add request edges (dashed arrows)
-        for proc in processes:
-            pid = proc['pid']
-            px, py = process_positions[pid]
-            for res in ['R1', 'R2', 'R3']:
-                if proc['request'][res] > 0:
-                    rx, ry = resource_positions[res]
-                    # Resource to Process
-                    svg_content += f'''
-                    <line x1="{rx}" y1="{ry-25}" x2="{px}" y2="{py-25}" 
-                          stroke="#f59e0b" stroke-width="2" stroke-dasharray="5,5" marker-end="url(#arrow)"/>
-                    '''
-        
-        # Add arrow marker definition
-        svg_content += '''
-            <defs>
-                <marker id="arrow" markerWidth="10" markerHeight="10" refX="9" refY="3" 
-                        orient="auto" markerUnits="strokeWidth">
-                    <path d="M0,0 L0,6 L9,3 z" fill="#333"/>
-                </marker>
-            </defs>
-        </svg>
-        '''
-        
-        return svg_content.strip()
-        
-    except Exception as e:
-        logger.error(f"RAG visualization error: {e}")
-        return "<p>Error generating visualization</p>"
+
+@app.route('/api/upload-dataset', methods=['POST'])
+def upload_dataset():
     """Handle dataset upload and processing"""
     try:
+        model_live = models.get("live")
         if 'file' not in request.files:
             return jsonify({"error": "No file provided"}), 400
             
@@ -962,25 +1429,20 @@ def generate_system_events(system_state):
         if not file.filename.endswith('.csv'):
             return jsonify({"error": "Only CSV files are allowed"}), 400
             
-        # Save uploaded file
-        filepath = f"uploaded_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        file.save(filepath)
-        
-        # Process the dataset
-        df = pd.read_csv(filepath)
+        # Process the dataset straight from the upload stream (no temp file to collide on)
+        df = pd.read_csv(file.stream)
         
         # Validate required columns
         required_columns = live_features + ['label']
         missing_columns = [col for col in required_columns if col not in df.columns]
         
         if missing_columns:
-            os.remove(filepath)  # Clean up
             return jsonify({
                 "error": f"Missing required columns: {missing_columns}"
             }), 400
         
         # Encode labels
-        df['label_encoded'] = df['label'].map({v: k for k, v in label_map.items()})
+        df['label_encoded'] = df['label'].map(label_map)
         
         # Make predictions on the dataset
         X = df[live_features]
@@ -1009,9 +1471,6 @@ def generate_system_events(system_state):
             "feature_stats": df[live_features].describe().to_dict()
         }
         
-        # Clean up uploaded file
-        os.remove(filepath)
-        
         result = {
             "summary": summary,
             "timestamp": datetime.now().isoformat()
@@ -0,0 +1,162 @@
+"""Offline batch scoring of telemetry archives
+
+    python batch_score.py archive/ --out scored/ --workers 8 --key source
+
+Every CSV/Parquet file under the input directory is scored by a process
+pool. Each worker reads its file in chunks and writes
+<name>.scored.parquet with the row number, the --key columns copied from
+the input (so results can be joined back), the predicted label and
+per-class probabilities. Progress is reported in rows/s.
+
+Where fork is available the model is loaded once in the parent and the
+workers inherit it copy-on-write, so the tree node arrays are not
+duplicated per worker (the pickled trees cannot be memory-mapped:
+unpickling copies their arrays). Elsewhere each worker loads its own
+copy, so budget about workers x the in-memory model size.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from system_metrics import METRIC_FIELDS
+
+CHUNK_ROWS = 200_000
+INPUT_EXTENSIONS = (".csv", ".parquet")
+
+# Same encoding as the live model in backend.py
+label_names = {0: "DEADLOCK", 1: "SAFE", 2: "UNSAFE"}
+
+_model = None
+_features = None
+
+
+def _init_worker(model_path):
+    """Load the model once per process (the parent, when workers are forked)"""
+    global _model, _features
+    if _model is not None:
+        return  # inherited from the parent through fork
+    _model = joblib.load(model_path)
+    if hasattr(_model, "n_jobs"):
+        _model.n_jobs = 1  # parallelism comes from the pool
+    names = getattr(_model, "feature_names_in_", None)
+    _features = [str(n) for n in names] if names is not None else list(METRIC_FIELDS)
+
+
+def iter_chunks(path, columns, chunk_rows=CHUNK_ROWS, text_columns=()):
+    if path.endswith(".parquet"):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        # Key columns stay text so every chunk has the same output type
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_rows, dtype={k: str for k in text_columns})
+
+
+def key_schema(path, keys):
+    """Arrow fields of the key columns as stored in the input file"""
+    if not keys:
+        return []
+    if path.endswith(".parquet"):
+        schema = pq.ParquetFile(path).schema_arrow
+        missing = [k for k in keys if k not in schema.names]
+        fields = [schema.field(k) for k in keys if k in schema.names]
+    else:
+        header = pd.read_csv(path, nrows=0).columns
+        missing = [k for k in keys if k not in header]
+        fields = [pa.field(k, pa.float64() if k in _features else pa.string()) for k in keys]
+    if missing:
+        raise ValueError(f"{path}: key columns {missing} not found")
+    return fields
+
+
+def score_file(path, out_path, chunk_rows=CHUNK_ROWS, keys=()):
+    """Score one file; returns (path, rows, seconds)"""
+    started = time.perf_counter()
+    classes = [label_names.get(int(c), str(c)) for c in _model.classes_]
+    schema = pa.schema(
+        [("row", pa.int64())] + key_schema(path, keys) + [("prediction", pa.string())]
+        + [(f"proba_{name}", pa.float32()) for name in classes]
+    )
+    rows = 0
+    tmp_path = f"{out_path}.tmp"
+    read_columns = list(dict.fromkeys(_features + keys))
+    with pq.ParquetWriter(tmp_path, schema) as writer:
+        for chunk in iter_chunks(path, read_columns, chunk_rows, [k for k in keys if k not in _features]):
+            X = chunk[_features].to_numpy(dtype=np.float64)
+            proba = _model.predict_proba(pd.DataFrame(X, columns=_features))
+            columns = {"row": np.arange(rows, rows + len(X), dtype=np.int64)}
+            for key in keys:
+                columns[key] = chunk[key].to_numpy()
+            columns["prediction"] = np.asarray(classes, dtype=object)[proba.argmax(axis=1)]
+            for i, name in enumerate(classes):
+                columns[f"proba_{name}"] = proba[:, i].astype(np.float32)
+            writer.write_table(pa.table(columns, schema=schema))
+            rows += len(X)
+    os.replace(tmp_path, out_path)
+    return path, rows, time.perf_counter() - started
+
+
+def find_inputs(input_dir):
+    return sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(input_dir)
+        for name in names if name.endswith(INPUT_EXTENSIONS)
+    )
+
+
+def output_path(path, input_dir, out_dir):
+    relative = os.path.relpath(path, input_dir)
+    return os.path.join(out_dir, os.path.splitext(relative)[0].replace(os.sep, "__") + ".scored.parquet")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score CSV/Parquet telemetry archives with the live model")
+    parser.add_argument("input_dir")
+    parser.add_argument("--out", default="scored", help="output directory for .scored.parquet files")
+    parser.add_argument("--model", default="rf_model_live.joblib")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--key", action="append", default=[],
+                        help="input column to copy to the output for joining back (repeatable)")
+    args = parser.parse_args()
+
+    inputs = find_inputs(args.input_dir)
+    if not inputs:
+        parser.error(f"no {'/'.join(INPUT_EXTENSIONS)} files under {args.input_dir}")
+    os.makedirs(args.out, exist_ok=True)
+
+    print(f"Scoring {len(inputs)} files with {args.workers} workers ({args.model})")
+    started = time.perf_counter()
+    total_rows = 0
+    if "fork" in multiprocessing.get_all_start_methods():
+        # Load once here; forked workers share the model pages copy-on-write
+        _init_worker(args.model)
+        context = multiprocessing.get_context("fork")
+    else:
+        context = None
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=context,
+                             initializer=_init_worker, initargs=(args.model,)) as pool:
+        futures = [
+            pool.submit(score_file, path, output_path(path, args.input_dir, args.out), args.chunk_rows, args.key)
+            for path in inputs
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            path, rows, seconds = future.result()
+            total_rows += rows
+            elapsed = time.perf_counter() - started
+            print(f"[{done}/{len(inputs)}] {path}: {rows} rows in {seconds:.1f}s "
+                  f"| total {total_rows} rows, {total_rows / elapsed:,.0f} rows/s")
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ Scored {total_rows} rows in {elapsed:.1f}s ({total_rows / elapsed:,.0f} rows/s) -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import multiprocessing
+import sys
+import threading
+import time
+import timeit
+
+import lockwatch
+
+# Uncontended acquire/release cost: plain locks vs lockwatch wrappers
+N = 1_000_000
+
+
+def per_op_ns(lock):
+    def cycle():
+        with lock:
+            pass
+    best = min(timeit.repeat(cycle, number=N, repeat=5))
+    return best / N * 1e9
+
+
+results = {
+    "threading.Lock": per_op_ns(threading.Lock()),
+    "lockwatch.InstrumentedLock": per_op_ns(lockwatch.InstrumentedLock()),
+    "threading.RLock": per_op_ns(threading.RLock()),
+    "lockwatch.InstrumentedRLock": per_op_ns(lockwatch.InstrumentedRLock()),
+}
+
+print("\n===== UNCONTENDED with-lock (ns per acquire+release) =====")
+for name, ns in results.items():
+    print(f"{name:30s} {ns:8.1f} ns")
+print(f"\nInstrumentedLock overhead : {results['lockwatch.InstrumentedLock'] - results['threading.Lock']:+.1f} ns")
+print(f"InstrumentedRLock overhead: {results['lockwatch.InstrumentedRLock'] - results['threading.RLock']:+.1f} ns")
+
+# A real lock-order deadlock must show up in the exported graph
+print("\n===== DEADLOCK DETECTION =====")
+a = lockwatch.InstrumentedLock("accounts")
+b = lockwatch.InstrumentedLock("ledger")
+barrier = threading.Barrier(2)
+
+
+def worker(first, second):
+    with first:
+        barrier.wait()
+        if second.acquire(timeout=2):
+            second.release()
+
+
+t1 = threading.Thread(target=worker, args=(a, b), name="transfer-1", daemon=True)
+t2 = threading.Thread(target=worker, args=(b, a), name="transfer-2", daemon=True)
+t1.start()
+t2.start()
+time.sleep(0.3)
+
+graph = lockwatch.graph()
+print("threads:", [t["name"] for t in graph["threads"]])
+print("locks  :", graph["locks"])
+print("holds  :", graph["holds"], "waits:", graph["waits"])
+waiting_on_held = {lock for _, lock in graph["waits"]} <= {lock for _, lock in graph["holds"]}
+print("✅ cycle visible (every waited lock is held)" if len(graph["waits"]) == 2 and waiting_on_held
+      else "❌ cycle not visible")
+t1.join()
+t2.join()
+
+# After install(), threading's own Events/Conditions use instrumented locks; a fork
+# must still reset them (threading._after_fork) so threads keep working in the child
+print("\n===== FORK AFTER install() =====")
+# Errors in fork hooks are "unraisable": collect them (the child inherits the hook)
+fork_errors = []
+sys.unraisablehook = lambda unraisable: fork_errors.append(repr(unraisable.exc_value))
+
+lockwatch.install()
+try:
+    release_holder = threading.Event()
+    holder_thread = threading.Thread(target=release_holder.wait, name="holder", daemon=True)
+    holder_thread.start()
+
+    def child(queue):
+        # Only the forking thread survives; new threads and conditions must work
+        done = threading.Event()
+        worker_thread = threading.Thread(target=done.set)
+        worker_thread.start()
+        worker_thread.join(timeout=5)
+        queue.put((done.is_set(), fork_errors))
+
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    process = ctx.Process(target=child, args=(queue,))
+    process.start()
+    ran, errors = queue.get(timeout=10)
+    process.join()
+    release_holder.set()
+    holder_thread.join()
+    print(f"child thread ran={ran} fork hook errors={errors} exit={process.exitcode}")
+    print("✅ instrumented locks reset in the forked child" if ran and not errors and process.exitcode == 0
+          else "❌ fork reset failed")
+finally:
+    lockwatch.uninstall()
+    sys.unraisablehook = sys.__unraisablehook__
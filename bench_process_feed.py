@@ -0,0 +1,108 @@
+import json
+import random
+import time
+from datetime import datetime
+
+from process_feed import COLUMNS, ProcessFeed
+
+# Bytes and JSON encoding time per poll: full /api/processes body vs the delta feed
+N_PROCESSES = 2000
+TICKS = 200
+BUSY_SHARE = 0.03      # processes whose cpu moves past the deadband each tick
+CHURN = 2              # processes started and exited per tick
+rng = random.Random(7)
+STATUSES = ["running", "sleeping", "sleeping", "sleeping", "idle", "disk-sleep"]
+
+next_pid = 1
+
+
+def spawn():
+    global next_pid
+    next_pid += 1
+    return {
+        "pid": next_pid,
+        "name": f"worker-{next_pid}"[:30],
+        "status": rng.choice(STATUSES),
+        "cpu_percent": rng.uniform(0, 2),
+        "memory_percent": rng.uniform(0, 3),
+        "create_time": time.time() - rng.uniform(0, 86400),
+    }
+
+
+def full_body(table):
+    """The current /api/processes response shape"""
+    return {
+        "total_processes": len(table),
+        "processes": [
+            dict(p, cpu_percent=round(p["cpu_percent"], 2), memory_percent=round(p["memory_percent"], 2),
+                 create_time=datetime.fromtimestamp(p["create_time"]).isoformat())
+            for p in table.values()
+        ],
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+table = {p["pid"]: p for p in (spawn() for _ in range(N_PROCESSES))}
+feed = ProcessFeed(tolerance=0.5)
+feed.publish(table.values())
+client = feed.since()
+client_rows = {row[0]: row for row in client["upserts"]}
+
+full_bytes = delta_bytes = 0
+full_seconds = delta_seconds = publish_seconds = 0.0
+for tick in range(TICKS):
+    for p in table.values():
+        p["cpu_percent"] = max(0.0, p["cpu_percent"] + rng.uniform(-0.2, 0.2))  # jitter inside the deadband
+    for p in rng.sample(list(table.values()), int(BUSY_SHARE * N_PROCESSES)):
+        p["cpu_percent"] = rng.uniform(0, 100)
+        p["status"] = rng.choice(STATUSES)
+    for pid in rng.sample(list(table), CHURN):
+        del table[pid]
+    for _ in range(CHURN):
+        p = spawn()
+        table[p["pid"]] = p
+    start = time.perf_counter()
+    feed.publish(table.values())
+    publish_seconds += time.perf_counter() - start
+
+    start = time.perf_counter()
+    body = json.dumps(full_body(table))
+    full_seconds += time.perf_counter() - start
+    full_bytes += len(body)
+
+    start = time.perf_counter()
+    delta = feed.since(client["seq"], client["feed"])
+    body = json.dumps(delta)
+    delta_seconds += time.perf_counter() - start
+    delta_bytes += len(body)
+
+    # Apply like a dashboard would
+    if delta["full"]:
+        client_rows = {}
+    for pid in delta["removed"]:
+        client_rows.pop(pid, None)
+    for row in delta["upserts"]:
+        client_rows[row[0]] = row
+    client = delta
+
+print(f"\n===== {N_PROCESSES} PROCESSES, {TICKS} POLLS =====")
+print(f"full table : {full_bytes / TICKS / 1024:8.1f} KiB/poll  {full_seconds / TICKS * 1000:7.3f} ms build+encode")
+print(f"delta feed : {delta_bytes / TICKS / 1024:8.1f} KiB/poll  {delta_seconds / TICKS * 1000:7.3f} ms merge+encode")
+print(f"publish    : {publish_seconds / TICKS * 1000:7.3f} ms per sample (once, shared by all clients)")
+print(f"reduction  : {full_bytes / delta_bytes:.1f}x bytes, {full_seconds / delta_seconds:.1f}x time")
+
+# The client copy must match the live table within the deadband
+cpu = COLUMNS.index("cpu_percent")
+assert set(client_rows) == set(table), "client pids diverged"
+worst = max(abs(client_rows[pid][cpu] - p["cpu_percent"]) for pid, p in table.items())
+print(f"max client cpu error: {worst:.3f} (tolerance {feed.tolerance})")
+assert worst <= feed.tolerance
+
+# A client behind the change log gets a full resync
+small = ProcessFeed(max_changes=5)
+for i in range(10):
+    small.publish([{"pid": pid, "name": "a", "status": "running", "cpu_percent": i * 10.0 if pid == 1 else 0.0,
+                    "memory_percent": 0.0} for pid in (1, 2, 3)])
+assert small.since(2, small.feed_id)["full"] and not small.since(8, small.feed_id)["full"]
+assert small.since(8, "restarted")["full"]
+print("✅ resync on lag / unknown feed id")
@@ -0,0 +1,54 @@
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from early_exit import ProgressiveForest
+
+# Accuracy-equivalence check: early-exit inference vs the full live forest
+MODEL_PATH = "rf_model_live.joblib"
+live_features = ["num_processes", "cpu_percent", "memory_percent", "disk_percent", "total_allocated", "total_need"]
+label_map = {"DEADLOCK": 0, "SAFE": 1, "UNSAFE": 2}
+
+df = pd.read_csv("master_dataset.csv")
+X = df[live_features]
+y = df["label"].map(label_map).to_numpy()
+
+forest = joblib.load(MODEL_PATH)
+progressive = ProgressiveForest(forest)
+print(f"Model: {MODEL_PATH} ({forest.n_estimators} trees), {len(X)} rows")
+
+# 1. Running every tree must reproduce predict_proba exactly
+exhaustive = ProgressiveForest(forest, min_trees=forest.n_estimators)
+full_proba = forest.predict_proba(X)
+assert np.allclose(exhaustive.predict_proba(X), full_proba), "full traversal differs from scikit-learn"
+print("✅ full traversal matches predict_proba")
+
+# 2. Early exit must give the same labels
+proba, trees_used = progressive.predict_proba_with_trees(X)
+full_pred = forest.classes_[full_proba.argmax(axis=1)]
+early_pred = forest.classes_[proba.argmax(axis=1)]
+agreement = (early_pred == full_pred).mean()
+print("\n===== LABEL AGREEMENT =====")
+print(f"agreement with full forest: {agreement:.5f} ({(early_pred != full_pred).sum()} differing rows)")
+print(f"accuracy full: {(full_pred == y).mean():.5f}  early-exit: {(early_pred == y).mean():.5f}")
+
+print("\n===== TREES USED PER PREDICTION =====")
+for name, code in label_map.items():
+    mask = full_pred == code
+    if mask.any():
+        print(f"{name:9s} rows={mask.sum():6d} mean={trees_used[mask].mean():6.1f} max={trees_used[mask].max()}")
+print(f"overall   mean={trees_used.mean():.1f} of {forest.n_estimators}")
+
+# 3. Single-sample cost (the /api/predict path)
+print("\n===== SINGLE-SAMPLE LATENCY =====")
+rows = [X.iloc[[i]] for i in np.flatnonzero(full_pred == label_map["SAFE"])[:50]]
+for name, fn in (("full forest", forest.predict_proba), ("early exit", progressive.predict_proba)):
+    start = time.perf_counter()
+    for row in rows:
+        fn(row)
+    print(f"{name:12s} {(time.perf_counter() - start) / len(rows) * 1000:.3f} ms")
+
+assert agreement >= 0.999, "early-exit labels diverge from the full forest"
+print("\n🎯 Early-exit check complete")
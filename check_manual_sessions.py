@@ -0,0 +1,107 @@
+import random
+import time
+
+import backend
+from manual_sessions import ManualSession, RESOURCE_NAMES
+
+# Incremental session rechecks vs the full Banker's pass, then per-edit latency
+rng = random.Random(3)
+N_STATES = 100
+EDITS_PER_STATE = 30
+
+
+def random_process(pid, units=8):
+    max_need = {r: rng.randint(0, units) for r in RESOURCE_NAMES}
+    allocated = {r: rng.randint(0, max_need[r]) for r in RESOURCE_NAMES}
+    return {"pid": pid, "allocated": allocated, "max_need": max_need,
+            "request": {r: rng.randint(0, max_need[r] - allocated[r]) for r in RESOURCE_NAMES},
+            "priority": rng.randint(1, 10)}
+
+
+def random_state(n):
+    return {"available_resources": {r: rng.randint(0, 6) for r in RESOURCE_NAMES},
+            "processes": [random_process(i) for i in range(n)]}
+
+
+def random_edit(session, next_pid):
+    pids = list(session.pids)
+    roll = rng.random()
+    if roll < 0.6 and pids:
+        pid = rng.choice(pids)
+        field = rng.choice(["allocated", "max_need", "request"])
+        return {"op": "update", "pid": pid, field: {rng.choice(RESOURCE_NAMES): rng.randint(0, 8)}}
+    if roll < 0.75:
+        return {"op": "add", "process": random_process(next_pid)}
+    if roll < 0.9 and pids:
+        return {"op": "remove", "pid": rng.choice(pids)}
+    return {"op": "available", "available_resources": {rng.choice(RESOURCE_NAMES): rng.randint(0, 8)}}
+
+
+def is_valid_order(sequence, state):
+    """Every process finishes, each only with what the earlier ones released"""
+    procs = {f"P{p['pid']}": p for p in state["processes"]}
+    work = dict(state["available_resources"])
+    for name in sequence:
+        proc = procs.pop(name)
+        if any(proc["max_need"][r] - proc["allocated"][r] > work[r] for r in RESOURCE_NAMES):
+            return False
+        for r in RESOURCE_NAMES:
+            work[r] += proc["allocated"][r]
+    return not procs
+
+
+print("\n===== EQUIVALENCE WITH THE FULL BANKER'S PASS =====")
+checked = reused = total = 0
+for _ in range(N_STATES):
+    state = random_state(rng.randint(1, 40))
+    session = ManualSession(state["available_resources"], state["processes"])
+    backend.analyze_manual_session(session, render=False)
+    next_pid = 1000
+    for _ in range(EDITS_PER_STATE):
+        session.apply([random_edit(session, next_pid)])
+        next_pid += 1
+        result = backend.analyze_manual_session(session, render=False)
+        full = backend.bankers_algorithm(session.to_json()["available_resources"], session.to_json()["processes"])
+        assert result["state"] == full["state"], (result["state"], full["state"])
+        if result["state"] != "DEADLOCK":
+            assert is_valid_order(result["safe_sequence"], session.to_json())
+        checked += 1
+        reused += result["reused_sequence"]
+        total += result["num_processes"]
+print(f"✅ {checked} edits: same state as a full recheck, every safe sequence valid")
+print(f"order reused from the previous edit: {reused / max(total, 1):.1%} of processes")
+
+print("\n===== PID TYPES =====")
+session = ManualSession(state["available_resources"], [random_process(1), random_process(2)])
+session.apply([{"op": "add", "process": random_process("web")}, {"op": "remove", "pid": 2}])
+session.apply([{"op": "update", "pid": 1, "request": {"R1": 0}}])
+assert [p["pid"] for p in session.to_json()["processes"]] == [1, "web"]
+try:
+    session.apply([{"op": "update", "pid": [1], "request": {"R1": 0}}])
+    raise AssertionError("list pid accepted")
+except ValueError as e:
+    print(f"list pid rejected: {e}")
+print("✅ integer and string pids keep their types across add/remove")
+
+print("\n===== PER-EDIT LATENCY (test client, JSON in/out) =====")
+client = backend.app.test_client()
+for n in (200, 2000):
+    state = random_state(n)
+    state["available_resources"] = {r: 4 * n for r in RESOURCE_NAMES}  # large, mostly SAFE scenario
+
+    start = time.perf_counter()
+    for _ in range(5):
+        client.post("/api/manual_predict", json=state)
+    full_ms = (time.perf_counter() - start) / 5 * 1000
+
+    created = client.post("/api/manual-sessions", json=dict(state, render=False)).get_json()
+    edits = [{"op": "update", "pid": rng.randrange(n), rng.choice(["allocated", "request"]): {"R1": rng.randint(0, 2)}}
+             for _ in range(50)]
+    start = time.perf_counter()
+    for edit in edits:
+        reply = client.patch(f"/api/manual-sessions/{created['session']}", json={"edits": [edit]}).get_json()
+    delta_ms = (time.perf_counter() - start) / len(edits) * 1000
+    print(f"{n:5d} processes: full manual_predict {full_ms:8.2f} ms   session edit {delta_ms:6.2f} ms "
+          f"({full_ms / delta_ms:.0f}x, last edit reused {reply['reused_sequence']}/{n})")
+
+print("\n🎯 Manual session check complete")
@@ -0,0 +1,152 @@
+"""Compact student models distilled from the live random forest
+
+Both classes follow the small part of the scikit-learn API the backend
+uses (classes_, n_features_in_, feature_names_in_, predict, predict_proba)
+so they can be served from the model registry in place of rf_model_live.
+Each also has a predict_proba_one() pure-Python path for single samples,
+which avoids NumPy call overhead on edge agents.
+"""
+from bisect import bisect_right
+
+import numpy as np
+
+
+class CompactTree:
+    """A single decision tree flattened into plain arrays"""
+
+    def __init__(self, tree, classes, feature_names):
+        t = tree.tree_
+        self.classes_ = np.asarray(classes)
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.n_features_in_ = len(feature_names)
+        self.max_depth = int(t.max_depth)
+        self.node_count = int(t.node_count)
+
+        # Classifiers store (nodes, 1, classes); a multi-output regressor fitted
+        # on the teacher's probabilities stores (nodes, classes, 1)
+        values = t.value[:, :, 0] if t.value.shape[2] == 1 else t.value[:, 0, :]
+        values = np.clip(values, 0, None)
+        values = values / np.maximum(values.sum(axis=1, keepdims=True), 1e-12)
+        self.feature = t.feature.astype(np.int16)
+        self.threshold = t.threshold.astype(np.float64)
+        self.left = t.children_left.astype(np.int32)
+        self.right = t.children_right.astype(np.int32)
+        self.proba = np.round(values * 255).astype(np.uint8)
+        self._build_cache()
+
+    def _build_cache(self):
+        # List copies for the allocation-free single-sample path
+        self._nodes = list(zip(self.feature.tolist(), self.threshold.tolist(), self.left.tolist(), self.right.tolist()))
+        self._leaf_proba = (self.proba / 255.0).tolist()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_nodes", None)
+        state.pop("_leaf_proba", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._build_cache()
+
+    def predict_proba_one(self, x):
+        """Probabilities for one sample given as a sequence of floats"""
+        node = 0
+        nodes = self._nodes
+        while True:
+            feature, threshold, left, right = nodes[node]
+            if left == -1:
+                return self._leaf_proba[node]
+            node = left if x[feature] <= threshold else right
+
+    def predict_proba(self, X):
+        # scikit-learn compares float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        node = np.zeros(len(X), dtype=np.int32)
+        active = self.left[node] != -1
+        while active.any():
+            idx = np.nonzero(active)[0]
+            n = node[idx]
+            go_left = X[idx, self.feature[n]] <= self.threshold[n]
+            node[idx] = np.where(go_left, self.left[n], self.right[n])
+            active[idx] = self.left[node[idx]] != -1
+        return self.proba[node] / 255.0
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+class BinnedLookupModel:
+    """Quantized lookup table over per-feature quantile bins
+
+    Only cells that occur in the training data are stored, as a sorted array
+    of cell ids with uint8 class probabilities; unseen cells fall back to the
+    prior.
+    """
+
+    def __init__(self, edges, cell_ids, cell_proba, prior, classes, feature_names):
+        self.edges = [np.asarray(e, dtype=np.float64) for e in edges]
+        self.cell_ids = np.asarray(cell_ids, dtype=np.uint32)
+        self.cell_proba = np.asarray(cell_proba, dtype=np.uint8)
+        self.prior = np.asarray(prior, dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.n_features_in_ = len(feature_names)
+
+        self._radix = np.cumprod([1] + [len(e) + 1 for e in self.edges[:-1]]).astype(np.uint32)
+        self._edges_list = [e.tolist() for e in self.edges]
+        self._radix_list = self._radix.tolist()
+        self._table = dict(zip(self.cell_ids.tolist(), (self.cell_proba / 255.0).tolist()))
+        self._prior_list = self.prior.tolist()
+
+    @classmethod
+    def fit(cls, X, teacher_proba, classes, feature_names, n_bins=6):
+        """Build the table from training rows and the teacher's probabilities"""
+        X = np.asarray(X, dtype=np.float64)
+        edges = []
+        for j in range(X.shape[1]):
+            qs = np.unique(np.quantile(X[:, j], np.linspace(0, 1, n_bins + 1)[1:-1]))
+            edges.append(qs)
+
+        model = cls(edges, [], np.zeros((0, len(classes))), teacher_proba.mean(axis=0), classes, feature_names)
+        ids = model.cell_index(X)
+        unique, inverse = np.unique(ids, return_inverse=True)
+        sums = np.zeros((len(unique), teacher_proba.shape[1]))
+        np.add.at(sums, inverse, teacher_proba)
+        counts = np.bincount(inverse, minlength=len(unique))[:, None]
+        proba = np.round(sums / counts * 255).astype(np.uint8)
+        return cls(edges, unique, proba, teacher_proba.mean(axis=0), classes, feature_names)
+
+    def cell_index(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        ids = np.zeros(len(X), dtype=np.uint32)
+        for j, edges in enumerate(self.edges):
+            ids += np.searchsorted(edges, X[:, j], side='right').astype(np.uint32) * self._radix[j]
+        return ids
+
+    def predict_proba_one(self, x):
+        """Probabilities for one sample given as a sequence of floats"""
+        cell = 0
+        for value, edges, radix in zip(x, self._edges_list, self._radix_list):
+            cell += bisect_right(edges, value) * radix
+        return self._table.get(cell, self._prior_list)
+
+    def predict_proba(self, X):
+        ids = self.cell_index(X)
+        pos = np.minimum(np.searchsorted(self.cell_ids, ids), max(len(self.cell_ids) - 1, 0))
+        hit = self.cell_ids[pos] == ids if len(self.cell_ids) else np.zeros(len(ids), dtype=bool)
+        proba = np.where(hit[:, None], self.cell_proba[pos] / 255.0, self.prior)
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in ("_edges_list", "_radix_list", "_table", "_prior_list"):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__init__(state["edges"], state["cell_ids"], state["cell_proba"], state["prior"],
+                      state["classes_"], state["feature_names_in_"])
@@ -0,0 +1,86 @@
+"""Training-set compaction into unique weighted rows
+
+Most master_dataset.csv rows repeat a handful of host states with small
+jitter. compact() quantizes each feature into bins of
+quantization_steps() width, and it collapses rows that share a label and
+a binned tuple into one row. The new row holds the weighted mean of the
+merged rows and carries their count in `sample_weight`. Rows with a rare
+label (exact_labels) only merge with exact duplicates, so every
+DEADLOCK/UNSAFE state stays as measured. Fit time then grows with the
+number of distinct states, not with the raw row count.
+
+Pass sample_weight to fit(), and use balanced_class_weight() rather than
+class_weight="balanced". scikit-learn balances on row counts, which
+compaction changes.
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_RESOLUTION = 0.02
+WEIGHT_COLUMN = "sample_weight"
+
+
+def quantization_steps(frame, features, resolution=DEFAULT_RESOLUTION):
+    """Bin width per feature: resolution x its 1st-99th percentile spread (0 keeps it exact)"""
+    steps = {}
+    for feature in features:
+        low, high = np.nanpercentile(frame[feature].to_numpy(dtype=np.float64), [1, 99])
+        steps[feature] = float(high - low) * resolution
+    return steps
+
+
+def compact(frame, features, label="label", steps=None, exact_labels=(), weight=None):
+    """Collapse rows sharing label and binned features into weighted rows
+
+    steps maps feature -> bin width (missing or 0 = exact match); weight
+    names an existing weight column to accumulate instead of counting rows.
+    A NaN feature averages over the merged rows that have a value, and
+    stays NaN only if none do.
+    Returns features, label and WEIGHT_COLUMN, in first-seen order.
+    """
+    steps = steps or {}
+    values = frame[features].to_numpy(dtype=np.float64)
+    weights = frame[weight].to_numpy(dtype=np.float64) if weight else np.ones(len(frame))
+    exact = frame[label].isin(list(exact_labels)).to_numpy()
+
+    keys = {}
+    for i, feature in enumerate(features):
+        step = steps.get(feature, 0.0)
+        key = values[:, i].copy()
+        if step > 0:
+            key[~exact] = np.floor(key[~exact] / step)
+        keys[f"_key{i}"] = key
+    keys = pd.DataFrame(keys, index=frame.index)
+    keys["_label"] = frame[label].to_numpy()
+
+    # NaN features average over the rows that have a value; all-NaN groups stay NaN
+    present = ~np.isnan(values)
+    weighted = np.where(present, values, 0.0) * weights[:, None]
+    present_weight = [f"_present{i}" for i in range(len(features))]
+    sums = pd.DataFrame(np.hstack([weighted, present * weights[:, None]]),
+                        columns=features + present_weight, index=frame.index)
+    sums[WEIGHT_COLUMN] = weights
+    grouped = sums.groupby([keys[c] for c in keys.columns], sort=False, dropna=False).sum()
+
+    compacted = grouped[features] / grouped[present_weight].to_numpy()
+    compacted[label] = grouped.index.get_level_values("_label")
+    compacted[WEIGHT_COLUMN] = grouped[WEIGHT_COLUMN]
+    return compacted.reset_index(drop=True)
+
+
+def balanced_class_weight(y, sample_weight):
+    """class_weight dict equal to "balanced" on the uncompacted rows"""
+    totals = pd.Series(np.asarray(sample_weight, dtype=np.float64)).groupby(np.asarray(y)).sum()
+    return {cls: float(totals.sum() / (len(totals) * total)) for cls, total in totals.items()}
+
+
+def compaction_summary(raw_rows, compacted, label="label"):
+    """Rows before/after, overall and per label"""
+    per_label = compacted.groupby(label)[WEIGHT_COLUMN].agg(["size", "sum"])
+    return {
+        "raw_rows": int(raw_rows),
+        "compacted_rows": len(compacted),
+        "ratio": round(raw_rows / max(len(compacted), 1), 2),
+        "per_label": {str(cls): {"raw": int(row["sum"]), "compacted": int(row["size"])}
+                      for cls, row in per_label.iterrows()},
+    }
@@ -0,0 +1,156 @@
+"""Feature-drift monitor over live model inputs
+
+A reference is built once from the training data: per feature, quantile
+bin edges (plus open-ended outer bins) and the share of training rows in
+each bin. Live samples fall into the same bins; counts decay
+exponentially (half-life in samples), so the sketch follows recent
+traffic with fixed memory, features x bins floats, whatever the volume.
+Drift is scored per feature with the population stability index (PSI),
+the largest gap between the binned CDFs and the share of live values
+outside the training range.
+"""
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_VERSION = 1
+DEFAULT_BINS = 20
+# Conventional PSI bands
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+# Share of live values outside the training min/max (catches point-mass features PSI cannot split)
+OUTSIDE_MODERATE = 0.05
+OUTSIDE_SIGNIFICANT = 0.2
+
+
+def build_reference(frame, features, bins=DEFAULT_BINS):
+    """Quantile edges and bin shares per feature from a training DataFrame"""
+    reference = {"reference_version": REFERENCE_VERSION, "rows": len(frame), "features": {}}
+    for feature in features:
+        values = frame[feature].to_numpy(dtype=np.float64)
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+        reference["features"][feature] = {
+            "edges": edges.tolist(),
+            "shares": (counts / counts.sum()).tolist(),
+            "mean": float(values.mean()),
+            "min": float(values.min()),
+            "max": float(values.max()),
+        }
+    return reference
+
+
+def load_or_build_reference(path, dataset_path, features, bins=DEFAULT_BINS):
+    """Reuse the stored reference if it covers features, otherwise build it from dataset_path"""
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+        if cached.get("reference_version") == REFERENCE_VERSION and set(features) <= set(cached["features"]):
+            return cached
+    except (OSError, ValueError, KeyError):
+        pass
+
+    import pandas as pd
+    reference = build_reference(pd.read_csv(dataset_path, usecols=list(features)), features, bins)
+    try:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(reference, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not store drift reference {path}: {e}")
+    return reference
+
+
+class DriftMonitor:
+    """Decaying fixed-bin histograms of live features vs a training reference"""
+
+    def __init__(self, reference, features, half_life=1000):
+        self.features = list(features)
+        self.edges = [np.asarray(reference["features"][f]["edges"]) for f in self.features]
+        self.expected = [np.asarray(reference["features"][f]["shares"]) for f in self.features]
+        self.reference = reference
+        self.decay = 0.5 ** (1.0 / half_life)
+        width = max(len(e) for e in self.edges) + 1
+        self.counts = np.zeros((len(self.features), width))
+        self.low = np.array([reference["features"][f]["min"] for f in self.features])
+        self.high = np.array([reference["features"][f]["max"] for f in self.features])
+        self.outside = np.zeros(len(self.features))  # decayed count outside the training range
+        self.samples = 0
+        self.last_value = np.full(len(self.features), np.nan)
+        self._lock = threading.Lock()
+
+    def update(self, x):
+        """Add one sample (values in self.features order); O(features x bins)"""
+        self.update_many(np.asarray(x, dtype=np.float64)[None, :])
+
+    def update_many(self, X):
+        """Add rows in arrival order; older rows in the batch get their decay applied"""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        m = len(X)
+        if m == 0:
+            return
+        weights = self.decay ** np.arange(m - 1, -1, -1)
+        width = self.counts.shape[1]
+        added = np.vstack([
+            np.bincount(np.searchsorted(edges, X[:, i], side="right"), weights=weights, minlength=width)
+            for i, edges in enumerate(self.edges)
+        ])
+        outside = weights @ ((X < self.low) | (X > self.high))
+        with self._lock:
+            scale = self.decay ** m
+            self.counts = self.counts * scale + added
+            self.outside = self.outside * scale + outside
+            self.samples += m
+            self.last_value = X[-1]
+
+    def scores(self):
+        """Per-feature PSI, max CDF gap and out-of-range share against the reference"""
+        with self._lock:
+            counts = self.counts.copy()
+            outside = self.outside.copy()
+            samples = self.samples
+            last_value = self.last_value.copy()
+
+        features = {}
+        for i, feature in enumerate(self.features):
+            expected = self.expected[i]
+            observed = counts[i, :len(expected)]
+            total = observed.sum()
+            if total == 0:
+                continue
+            actual = observed / total
+            # Floor empty bins so PSI stays finite
+            e, a = np.clip(expected, 1e-4, None), np.clip(actual, 1e-4, None)
+            psi = float(np.sum((a - e) * np.log(a / e)))
+            out_share = float(outside[i] / total)
+            ref = self.reference["features"][feature]
+            if psi >= PSI_SIGNIFICANT or out_share >= OUTSIDE_SIGNIFICANT:
+                status = "significant"
+            elif psi >= PSI_MODERATE or out_share >= OUTSIDE_MODERATE:
+                status = "moderate"
+            else:
+                status = "stable"
+            features[feature] = {
+                "psi": round(psi, 4),
+                "max_cdf_gap": round(float(np.abs(np.cumsum(actual) - np.cumsum(expected)).max()), 4),
+                "status": status,
+                "outside_training_range": round(out_share, 4),
+                "last_value": round(float(last_value[i]), 3),
+                "training_mean": round(ref["mean"], 3),
+            }
+
+        worst = max(features.items(), key=lambda item: item[1]["psi"], default=(None, None))
+        return {
+            "samples": samples,
+            "effective_samples": round(float(counts[0].sum()), 1) if len(counts) else 0.0,
+            "reference_rows": self.reference["rows"],
+            "features": features,
+            "drifted_features": [f for f, s in features.items() if s["status"] == "significant"],
+            "worst_feature": worst[0],
+        }
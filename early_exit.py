@@ -0,0 +1,107 @@
+"""Early-exit (progressive) inference for a fitted random forest
+
+Trees are evaluated in batches. After each batch a sample stops once its
+label is settled, when either of two conditions holds:
+
+* the vote gap between the top two classes exceeds the number of trees
+  still to run, so the full forest cannot disagree; or
+* a Hoeffding bound on the per-tree margin (range [-1, 1]) puts the
+  chance of the remaining trees flipping the label below `delta`.
+
+Clearly SAFE samples stop after min_trees, and only ambiguous ones walk
+the whole forest. The wrapper keeps the scikit-learn surface the backend
+uses, and other attributes (estimators_, feature_importances_, ...) are
+delegated to the wrapped forest, so model-info keeps working.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+
+class ProgressiveForest:
+    """RandomForestClassifier wrapper with per-sample early exit"""
+
+    def __init__(self, forest, batch_size=10, min_trees=20, delta=1e-3):
+        self.forest = forest
+        self.batch_size = batch_size
+        self.min_trees = min_trees
+        self.delta = delta
+        self.classes_ = forest.classes_
+        self.n_features_in_ = forest.n_features_in_
+        if hasattr(forest, "feature_names_in_"):
+            self.feature_names_in_ = forest.feature_names_in_
+        self._flatten([est.tree_ for est in forest.estimators_])
+
+    def __getattr__(self, name):
+        # Only reached for attributes not set above
+        if name == "forest":
+            raise AttributeError(name)
+        return getattr(self.forest, name)
+
+    def _flatten(self, trees):
+        """Concatenate every tree's node arrays; child indices become global"""
+        offsets = np.cumsum([0] + [t.node_count for t in trees])
+        self.roots = offsets[:-1].astype(np.int64)
+        self.n_trees = len(trees)
+        self.feature = np.concatenate([t.feature for t in trees]).astype(np.int64)
+        self.threshold = np.concatenate([t.threshold for t in trees])
+        self.left = np.concatenate([np.where(t.children_left == -1, -1, t.children_left + off)
+                                    for t, off in zip(trees, offsets)]).astype(np.int64)
+        self.right = np.concatenate([np.where(t.children_right == -1, -1, t.children_right + off)
+                                     for t, off in zip(trees, offsets)]).astype(np.int64)
+        values = np.concatenate([t.value[:, 0, :] for t in trees])
+        self.value = values / np.maximum(values.sum(axis=1, keepdims=True), 1e-12)
+        # Leaves point at themselves so finished paths stay put
+        leaf = self.left == -1
+        self.feature[leaf] = 0
+        self.left[leaf] = np.nonzero(leaf)[0]
+        self.right[leaf] = np.nonzero(leaf)[0]
+        self.is_leaf = leaf
+
+    def _as_array(self, X):
+        if isinstance(X, pd.DataFrame) and hasattr(self, "feature_names_in_"):
+            X = X[list(self.feature_names_in_)]
+        # scikit-learn compares float32 inputs against float64 thresholds
+        return np.asarray(X, dtype=np.float32)
+
+    def _leaves(self, X, trees):
+        """Leaf index reached by every row in every tree of the batch"""
+        node = np.broadcast_to(self.roots[trees], (len(X), len(trees))).copy()
+        rows = np.arange(len(X))[:, None]
+        while True:
+            pending = ~self.is_leaf[node]
+            if not pending.any():
+                return node
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+
+    def predict_proba_with_trees(self, X):
+        """(probabilities, trees used per sample); probabilities average the trees used"""
+        X = self._as_array(X)
+        n = len(X)
+        sums = np.zeros((n, len(self.classes_)))
+        used = np.zeros(n, dtype=np.int64)
+        active = np.arange(n)
+        hoeffding = 2 * math.log(1 / self.delta)
+
+        for start in range(0, self.n_trees, self.batch_size):
+            if len(active) == 0:
+                break
+            trees = np.arange(start, min(start + self.batch_size, self.n_trees))
+            sums[active] += self.value[self._leaves(X[active], trees)].sum(axis=1)
+            used[active] += len(trees)
+
+            k = used[active]
+            top_two = np.partition(sums[active], -2, axis=1)[:, -2:] if sums.shape[1] > 1 else np.c_[np.zeros(len(k)), sums[active]]
+            gap = top_two[:, 1] - top_two[:, 0]
+            settled = (gap > self.n_trees - k) | (gap * gap / k >= hoeffding)
+            active = active[~(settled & (k >= self.min_trees))]
+
+        return sums / used[:, None], used
+
+    def predict_proba(self, X):
+        return self.predict_proba_with_trees(X)[0]
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
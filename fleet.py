@@ -0,0 +1,182 @@
+"""Central per-host state for agents pushing metrics to the backend
+
+Agents POST batches of samples; ingest() only stores them. A background
+tick stacks the newest sample of every host that reported since the last
+tick into one matrix and scores the whole fleet with a single
+predict_proba call; listeners receive each tick's probabilities.
+"""
+import logging
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+STATE_NAMES = {0: "DEADLOCK", 1: "SAFE", 2: "UNSAFE"}
+RISK_LEVELS = {0: "HIGH", 1: "LOW", 2: "MEDIUM"}
+
+
+class HostState:
+    """Latest metrics and prediction for one monitored host"""
+
+    __slots__ = ("host", "samples", "last_seen", "received", "dirty", "prediction", "probabilities", "scored_at")
+
+    def __init__(self, host, history):
+        self.host = host
+        self.samples = deque(maxlen=history)  # (timestamp, feature vector)
+        self.last_seen = 0.0
+        self.received = 0
+        self.dirty = False
+        self.prediction = None
+        self.probabilities = None
+        self.scored_at = None
+
+    def to_dict(self, features, now, offline_after):
+        ts, latest = self.samples[-1] if self.samples else (None, None)
+        item = {
+            "host": self.host,
+            "online": now - self.last_seen <= offline_after,
+            "last_seen": round(self.last_seen, 3),
+            "samples_received": self.received,
+            "metrics": dict(zip(features, latest)) if latest is not None else None,
+            "sample_time": ts,
+        }
+        if self.prediction is not None:
+            item.update({
+                "state": STATE_NAMES.get(self.prediction, "UNSAFE"),
+                "risk_level": RISK_LEVELS.get(self.prediction, "MEDIUM"),
+                "probabilities": {
+                    "DEADLOCK": round(self.probabilities[0] * 100, 2),
+                    "SAFE": round(self.probabilities[1] * 100, 2),
+                    "UNSAFE": round(self.probabilities[2] * 100, 2)
+                },
+                "scored_at": round(self.scored_at, 3),
+            })
+        return item
+
+
+class FleetMonitor:
+    """Per-host state store with batched scoring every tick"""
+
+    def __init__(self, features, model_getter, tick=1.0, history=120, offline_after=30.0, max_hosts=10000):
+        self.features = list(features)
+        self.model_getter = model_getter
+        self.tick = tick
+        self.history = history
+        self.offline_after = offline_after
+        self.max_hosts = max_hosts
+        self.hosts = {}
+        self.last_tick_seconds = 0.0
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def add_listener(self, callback):
+        """Call callback(hosts, timestamps, X, probabilities) after every scored tick"""
+        self._listeners.append(callback)
+
+    def ingest(self, host, fields, samples):
+        """Store a batch of [timestamp, *values] rows pushed by one agent"""
+        if list(fields) != self.features:
+            raise ValueError(f"Expected fields {self.features}")
+
+        rows = np.asarray(samples, dtype=np.float64)
+        if rows.ndim != 2 or rows.shape[1] != len(self.features) + 1:
+            raise ValueError("Each sample must be [timestamp, *fields]")
+        if not np.isfinite(rows).all():
+            raise ValueError("Samples contain NaN or infinite values")
+
+        with self._lock:
+            state = self.hosts.get(host)
+            if state is None:
+                if len(self.hosts) >= self.max_hosts:
+                    raise ValueError("Too many hosts")
+                state = self.hosts[host] = HostState(host, self.history)
+            for row in rows[np.argsort(rows[:, 0], kind='stable')]:
+                state.samples.append((float(row[0]), row[1:]))
+            state.last_seen = time.time()
+            state.received += len(rows)
+            state.dirty = True
+
+        self.start()
+        return len(rows)
+
+    def score_pending(self):
+        """Score the newest sample of every host that reported since the last tick"""
+        with self._lock:
+            pending = [state for state in self.hosts.values() if state.dirty and state.samples]
+            if not pending:
+                return 0
+            X = np.vstack([state.samples[-1][1] for state in pending])
+            timestamps = [state.samples[-1][0] for state in pending]
+            for state in pending:
+                state.dirty = False
+
+        model = self.model_getter()
+        if model is None:
+            return 0
+
+        started = time.perf_counter()
+        probabilities = model.predict_proba(pd.DataFrame(X, columns=self.features))
+        predictions = model.classes_[probabilities.argmax(axis=1)]
+        now = time.time()
+
+        with self._lock:
+            for state, prediction, proba in zip(pending, predictions, probabilities):
+                state.prediction = int(prediction)
+                state.probabilities = proba
+                state.scored_at = now
+        self.last_tick_seconds = time.perf_counter() - started
+
+        hosts = [state.host for state in pending]
+        for callback in self._listeners:
+            try:
+                callback(hosts, timestamps, X, probabilities)
+            except Exception as e:
+                logger.error(f"Fleet listener error: {e}")
+        return len(pending)
+
+    def samples_between(self, host, start=None, end=None):
+        """(timestamps, X) of one host's retained samples in [start, end]"""
+        with self._lock:
+            state = self.hosts.get(host)
+            samples = list(state.samples) if state is not None else []
+        rows = [(ts, values) for ts, values in samples
+                if (start is None or ts >= start) and (end is None or ts <= end)]
+        if not rows:
+            return [], np.empty((0, len(self.features)))
+        return [ts for ts, _ in rows], np.vstack([values for _, values in rows])
+
+    def snapshot(self):
+        """Per-host summary for the API"""
+        now = time.time()
+        with self._lock:
+            hosts = [state.to_dict(self.features, now, self.offline_after) for state in self.hosts.values()]
+        return {
+            "hosts": sorted(hosts, key=lambda item: item["host"]),
+            "total_hosts": len(hosts),
+            "online_hosts": sum(item["online"] for item in hosts),
+            "last_tick_seconds": round(self.last_tick_seconds, 6),
+        }
+
+    def _run(self):
+        while not self._stop.wait(self.tick):
+            try:
+                self.score_pending()
+            except Exception as e:
+                logger.error(f"Fleet scoring error: {e}")
+
+    def start(self):
+        """Start the scoring tick (idempotent)"""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="fleet-scorer", daemon=True)
+                    self._thread.start()
+
+    def stop(self):
+        self._stop.set()
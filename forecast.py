@@ -0,0 +1,129 @@
+"""Per-host deadlock-risk trend forecasting
+
+Each host keeps a time-aware Holt (level + trend) model of two series:
+the risk score P(DEADLOCK) + P(UNSAFE), as plotted in the notebook, and
+P(DEADLOCK) on its own. State lives in flat numpy arrays indexed by a host
+slot, so one update is O(1) per host and a whole fleet tick is a single
+vectorized step. Forecasts extrapolate the trend to estimate when the
+UNSAFE and DEADLOCK thresholds will be crossed.
+"""
+import threading
+
+import numpy as np
+
+SERIES = ("risk_score", "deadlock")
+DEFAULT_THRESHOLDS = {"risk_score": 0.5, "deadlock": 0.5}
+# Threshold on each series that the forecast reports as a crossing
+CROSSINGS = {"risk_score": "UNSAFE", "deadlock": "DEADLOCK"}
+
+
+class RiskForecaster:
+    """Incremental Holt smoothing over irregularly spaced samples"""
+
+    def __init__(self, alpha=0.3, beta=0.1, thresholds=None, capacity=1024):
+        self.alpha = alpha
+        self.beta = beta
+        self.thresholds = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+        self.slots = {}
+        self.hosts = []
+        self.level = np.zeros((capacity, len(SERIES)))
+        self.trend = np.zeros((capacity, len(SERIES)))  # change per second
+        self.last_time = np.zeros(capacity)
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def _slot(self, host):
+        slot = self.slots.get(host)
+        if slot is None:
+            slot = self.slots[host] = len(self.hosts)
+            self.hosts.append(host)
+            if slot >= len(self.count):
+                grow = len(self.count)
+                self.level = np.vstack([self.level, np.zeros_like(self.level)])
+                self.trend = np.vstack([self.trend, np.zeros_like(self.trend)])
+                self.last_time = np.concatenate([self.last_time, np.zeros(grow)])
+                self.count = np.concatenate([self.count, np.zeros(grow, dtype=np.int64)])
+        return slot
+
+    @staticmethod
+    def series(probabilities):
+        """(risk_score, P(DEADLOCK)) rows from [DEADLOCK, SAFE, UNSAFE] probabilities"""
+        proba = np.atleast_2d(np.asarray(probabilities, dtype=np.float64))
+        return np.column_stack([proba[:, 0] + proba[:, 2], proba[:, 0]])
+
+    def update_many(self, hosts, timestamps, probabilities):
+        """Fold one new sample per host into the models (hosts must be unique)"""
+        values = self.series(probabilities)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        with self._lock:
+            idx = np.fromiter((self._slot(h) for h in hosts), dtype=np.int64, count=len(hosts))
+
+            first = self.count[idx] == 0
+            dt = timestamps - self.last_time[idx]
+            newer = first | (dt > 0)  # out-of-order samples are ignored
+            idx, values, timestamps, dt, first = idx[newer], values[newer], timestamps[newer], dt[newer], first[newer]
+
+            level, trend = self.level[idx], self.trend[idx]
+            dt = np.where(first, 1.0, dt)[:, None]
+            predicted = level + trend * dt
+            new_level = self.alpha * values + (1 - self.alpha) * predicted
+            new_trend = self.beta * (new_level - level) / dt + (1 - self.beta) * trend
+
+            self.level[idx] = np.where(first[:, None], values, new_level)
+            self.trend[idx] = np.where(first[:, None], 0.0, new_trend)
+            self.last_time[idx] = timestamps
+            self.count[idx] += 1
+        return len(idx)
+
+    def update(self, host, timestamp, probabilities):
+        return self.update_many([host], [timestamp], [probabilities])
+
+    def _forecast(self, slot, horizon):
+        item = {
+            "host": self.hosts[slot],
+            "samples": int(self.count[slot]),
+            "updated_at": round(float(self.last_time[slot]), 3),
+            "horizon_seconds": horizon,
+        }
+        for i, name in enumerate(SERIES):
+            level, trend = float(self.level[slot, i]), float(self.trend[slot, i])
+            threshold = self.thresholds[name]
+            if level >= threshold:
+                eta = 0.0
+            elif trend > 0:
+                eta = (threshold - level) / trend
+            else:
+                eta = None
+            item[name] = {
+                "current": round(level, 4),
+                "trend_per_minute": round(trend * 60, 5),
+                "predicted": round(min(max(level + trend * horizon, 0.0), 1.0), 4),
+                "threshold": threshold,
+                "crosses": CROSSINGS[name],
+                "seconds_to_threshold": round(eta, 1) if eta is not None else None,
+            }
+        return item
+
+    def forecast(self, host, horizon=300):
+        """Forecast for one host, or None if it has no samples"""
+        with self._lock:
+            slot = self.slots.get(host)
+            if slot is None or self.count[slot] == 0:
+                return None
+            return self._forecast(slot, horizon)
+
+    def forecast_all(self, horizon=300, limit=100):
+        """Hosts ordered by soonest UNSAFE crossing (hosts with no crossing last)"""
+        with self._lock:
+            n = len(self.hosts)
+            level, trend = self.level[:n, 0], self.trend[:n, 0]
+            threshold = self.thresholds["risk_score"]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                eta = np.where(level >= threshold, 0.0,
+                               np.where(trend > 0, (threshold - level) / trend, np.inf))
+            order = np.argsort(eta, kind="stable")[:limit]
+            return {
+                "hosts": [self._forecast(int(slot), horizon) for slot in order],
+                "total_hosts": n,
+                "at_risk_within_horizon": int((eta <= horizon).sum()),
+            }
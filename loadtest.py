@@ -0,0 +1,424 @@
+"""Load generator for the backend API
+
+    python loadtest.py --start-server --concurrency 16 --duration 30 --out before.json
+    python loadtest.py --server http://127.0.0.1:5000 --rate 200 --processes 50
+
+Drives /api/predict, /api/manual_predict (synthetic Banker's states of
+--processes x R1..R3), /api/live-predict, /api/processes and
+/api/upload-dataset, mixed by --endpoints weights. Two modes:
+
+* closed loop (--concurrency N): N clients send back to back, which
+  finds the saturation throughput;
+* open loop (--rate R): requests are scheduled at R/s regardless of how
+  the server keeps up, and latency is measured from the scheduled time so
+  queueing delay is not hidden (coordinated omission).
+
+Clients are asyncio coroutines over plain keep-alive HTTP/1.1
+connections, so the generator needs nothing beyond the standard library.
+The report (JSON) has requests, errors, error rate, throughput and
+p50/p95/p99 latency per endpoint, for comparing capacity between versions.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+live_features = ["num_processes", "cpu_percent", "memory_percent", "disk_percent", "total_allocated", "total_need"]
+RESOURCE_NAMES = ["R1", "R2", "R3"]
+LABELS = ["DEADLOCK", "SAFE", "UNSAFE"]
+ENDPOINTS = ["predict", "manual_predict", "live_predict", "processes", "upload"]
+DEFAULT_WEIGHTS = "predict=4,manual_predict=2,live_predict=2,processes=1,upload=1"
+PAYLOAD_VARIANTS = 64
+
+
+# ============================================================================
+# SYNTHETIC PAYLOADS
+# ============================================================================
+
+def predict_payload(rng):
+    """Random live feature vector for /api/predict"""
+    return {
+        "num_processes": rng.randint(50, 600),
+        "cpu_percent": round(rng.uniform(0, 100), 2),
+        "memory_percent": round(rng.uniform(5, 95), 2),
+        "disk_percent": round(rng.uniform(10, 95), 2),
+        "total_allocated": rng.randint(0, 300),
+        "total_need": rng.randint(0, 300),
+    }
+
+
+def manual_state(rng, n_processes, max_units=10):
+    """Banker's state with n_processes over R1..R3 for /api/manual_predict"""
+    processes = []
+    for i in range(n_processes):
+        max_need = {r: rng.randint(1, max_units) for r in RESOURCE_NAMES}
+        allocated = {r: rng.randint(0, max_need[r]) for r in RESOURCE_NAMES}
+        request = {r: rng.randint(0, max_need[r] - allocated[r]) for r in RESOURCE_NAMES}
+        processes.append({
+            "pid": f"P{i}",
+            "allocated": allocated,
+            "max_need": max_need,
+            "request": request,
+            "priority": rng.randint(1, 10),
+        })
+    return {
+        "available_resources": {r: rng.randint(0, max_units) for r in RESOURCE_NAMES},
+        "processes": processes,
+    }
+
+
+def upload_csv(rng, rows):
+    """Labelled CSV in the /api/upload-dataset format"""
+    lines = [",".join(live_features + ["label"])]
+    for _ in range(rows):
+        row = predict_payload(rng)
+        lines.append(",".join(str(row[f]) for f in live_features) + f",{rng.choice(LABELS)}")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def multipart(field, filename, content):
+    """(body, content type) for a single-file multipart/form-data upload"""
+    boundary = f"loadtest{random.getrandbits(64):016x}"
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        f"Content-Type: text/csv\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def build_requests(args, names):
+    """Pre-encoded (method, path, content type, body) variants per endpoint"""
+    rng = random.Random(args.seed)
+    as_json = lambda payload: ("application/json", json.dumps(payload).encode())
+    builders = {
+        "predict": lambda: ("POST", "/api/predict", *as_json(predict_payload(rng))),
+        "manual_predict": lambda: ("POST", "/api/manual_predict", *as_json(manual_state(rng, args.processes))),
+        "live_predict": lambda: ("GET", "/api/live-predict", None, b""),
+        "processes": lambda: ("GET", "/api/processes", None, b""),
+        "upload": lambda: ("POST", "/api/upload-dataset",
+                           *reversed(multipart("file", "loadtest.csv", upload_csv(rng, args.upload_rows)))),
+    }
+    # Encoding happens here, not in the timed loop
+    return {name: [builders[name]() for _ in range(PAYLOAD_VARIANTS)] for name in names}
+
+
+def parse_weights(spec):
+    weights = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    return {name: w for name, w in weights.items() if w > 0}
+
+
+# ============================================================================
+# MINIMAL KEEP-ALIVE HTTP/1.1 CLIENT
+# ============================================================================
+
+class Connection:
+    """One persistent HTTP/1.1 connection; reopened when the server closes it"""
+
+    def __init__(self, host, port, timeout):
+        self.host, self.port, self.timeout = host, port, timeout
+        self.reader = self.writer = None
+
+    async def request(self, method, path, content_type, body):
+        """Send one request and read the full response; returns the status code"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nContent-Length: {len(body)}\r\n"
+        if content_type:
+            head += f"Content-Type: {content_type}\r\n"
+        self.writer.write(head.encode() + b"\r\n" + body)
+        try:
+            return await asyncio.wait_for(self._response(), self.timeout)
+        except BaseException:
+            self.close()
+            raise
+
+    async def _response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("server closed the connection")
+        version, status = status_line.split(None, 2)[:2]
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif "content-length" in headers:
+            await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            await self.reader.read()
+            headers["connection"] = "close"
+
+        if headers.get("connection", "").lower() == "close" or version == b"HTTP/1.0":
+            self.close()
+        return int(status)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+# ============================================================================
+# LOAD LOOPS
+# ============================================================================
+
+class Recorder:
+    """Latencies and outcomes per endpoint, only inside the measured window"""
+
+    def __init__(self, names):
+        self.latencies = {name: [] for name in names}
+        self.errors = {name: 0 for name in names}
+        self.statuses = {name: {} for name in names}
+        self.measuring = False
+
+    def record(self, name, latency, status):
+        if not self.measuring:
+            return
+        self.latencies[name].append(latency)
+        key = str(status)
+        self.statuses[name][key] = self.statuses[name].get(key, 0) + 1
+        if not (isinstance(status, int) and 200 <= status < 400):
+            self.errors[name] += 1
+
+
+async def send(conn, recorder, name, req, started):
+    try:
+        status = await conn.request(*req)
+    except asyncio.TimeoutError:
+        status = "timeout"
+    except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+        status = type(e).__name__
+    recorder.record(name, time.perf_counter() - started, status)
+
+
+async def closed_loop(target, requests, weights, recorder, concurrency, deadline, timeout, seed):
+    """concurrency clients, each sending its next request as soon as the last one returns"""
+    names, shares = list(weights), list(weights.values())
+
+    async def client(i):
+        rng = random.Random(seed + i)
+        conn = Connection(*target, timeout)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights=shares)[0]
+            await send(conn, recorder, name, rng.choice(requests[name]), time.perf_counter())
+        conn.close()
+
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+
+
+async def open_loop(target, requests, weights, recorder, rate, max_in_flight, deadline, timeout, seed):
+    """Poisson arrivals at rate/s; latency counts from the scheduled send time"""
+    rng = random.Random(seed)
+    names, shares = list(weights), list(weights.values())
+    idle = asyncio.Queue()
+    for _ in range(max_in_flight):
+        idle.put_nowait(Connection(*target, timeout))
+    tasks = set()
+
+    async def issue(name, req, scheduled):
+        conn = await idle.get()  # waiting for a free connection counts as latency
+        try:
+            await send(conn, recorder, name, req, scheduled)
+        finally:
+            idle.put_nowait(conn)
+
+    next_send = time.perf_counter()
+    while next_send < deadline:
+        delay = next_send - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        name = rng.choices(names, weights=shares)[0]
+        task = asyncio.ensure_future(issue(name, rng.choice(requests[name]), next_send))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        next_send += rng.expovariate(rate)
+
+    if tasks:
+        await asyncio.wait(tasks, timeout=timeout)
+    while not idle.empty():
+        idle.get_nowait().close()
+
+
+async def run_load(args, target, requests, weights):
+    recorder = Recorder(weights)
+    start = time.perf_counter()
+    deadline = start + args.warmup + args.duration
+
+    async def open_window():
+        await asyncio.sleep(args.warmup)
+        recorder.measuring = True
+        await asyncio.sleep(args.duration)
+        recorder.measuring = False
+
+    window = asyncio.ensure_future(open_window())
+    if args.rate:
+        await open_loop(target, requests, weights, recorder, args.rate, args.concurrency, deadline,
+                        args.timeout, args.seed)
+    else:
+        await closed_loop(target, requests, weights, recorder, args.concurrency, deadline,
+                          args.timeout, args.seed)
+    window.cancel()
+    return recorder
+
+
+# ============================================================================
+# REPORT
+# ============================================================================
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies, errors, statuses, duration):
+    latencies = sorted(latencies)
+    n = len(latencies)
+    ms = lambda value: round(value * 1000, 3) if value is not None else None
+    return {
+        "requests": n,
+        "errors": errors,
+        "error_rate": round(errors / n, 4) if n else 0.0,
+        "throughput_rps": round(n / duration, 2),
+        "latency_ms": {
+            "mean": ms(sum(latencies) / n if n else None),
+            "p50": ms(percentile(latencies, 50)),
+            "p95": ms(percentile(latencies, 95)),
+            "p99": ms(percentile(latencies, 99)),
+            "max": ms(latencies[-1] if n else None),
+        },
+        "status_codes": statuses,
+    }
+
+
+def build_report(args, server, weights, recorder):
+    endpoints = {
+        name: summarize(recorder.latencies[name], recorder.errors[name], recorder.statuses[name], args.duration)
+        for name in weights
+    }
+    total_statuses = {}
+    for statuses in recorder.statuses.values():
+        for code, count in statuses.items():
+            total_statuses[code] = total_statuses.get(code, 0) + count
+    overall = summarize([lat for lats in recorder.latencies.values() for lat in lats],
+                        sum(recorder.errors.values()), total_statuses, args.duration)
+    return {
+        "server": server,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "mode": "open" if args.rate else "closed",
+            "rate": args.rate,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "manual_processes": args.processes,
+            "upload_rows": args.upload_rows,
+            "weights": weights,
+        },
+        "overall": overall,
+        "endpoints": endpoints,
+    }
+
+
+# ============================================================================
+# LOCAL SERVER
+# ============================================================================
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, timeout=120.0):
+    """Run backend.py's app on 127.0.0.1:port in a child process and wait for /api/health"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    code = f"import backend; backend.app.run(host='127.0.0.1', port={port}, threaded=True, use_reloader=False)"
+    proc = subprocess.Popen([sys.executable, "-c", code], cwd=here,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"backend exited with code {proc.returncode} during startup")
+        try:
+            with urllib.request.urlopen(f"{url}/api/health", timeout=2):
+                return proc, url
+        except OSError:
+            time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError(f"backend did not become healthy within {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the deadlock prediction backend")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--server", default="http://127.0.0.1:5000", help="base URL of a running backend")
+    target.add_argument("--start-server", action="store_true", help="start backend.py locally on a free port")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="clients (closed loop) or max in-flight connections (with --rate)")
+    parser.add_argument("--rate", type=float, default=None, help="open loop: target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds of load before measuring")
+    parser.add_argument("--endpoints", default=DEFAULT_WEIGHTS, help="name=weight list; weight 0 disables")
+    parser.add_argument("--processes", type=int, default=20, help="processes per synthetic manual_predict state")
+    parser.add_argument("--upload-rows", type=int, default=1000, help="rows per uploaded CSV")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    weights = parse_weights(args.endpoints)
+    unknown = set(weights) - set(ENDPOINTS)
+    if unknown or not weights:
+        parser.error(f"--endpoints must name some of {ENDPOINTS}, got {sorted(unknown) or 'none'}")
+
+    server_proc = None
+    if args.start_server:
+        server_proc, server = start_server(free_port())
+    else:
+        server = args.server.rstrip("/")
+    url = urlsplit(server)
+    if url.scheme != "http":
+        parser.error("only plain http:// servers are supported")
+
+    try:
+        requests = build_requests(args, weights)
+        recorder = asyncio.run(run_load(args, (url.hostname, url.port or 80), requests, weights))
+    finally:
+        if server_proc is not None:
+            server_proc.terminate()
+            server_proc.wait(timeout=10)
+
+    report = build_report(args, server, weights, recorder)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Server-side manual-analysis sessions edited with small deltas
+
+A session keeps the dense matrices of one manual allocation state
+(available, allocation, max_need, request, plus pids and priorities) and
+the last Banker's completion order as row indices. Clients send edits
+(update part of one process, add or remove a process, change available)
+instead of the whole state; edits are validated and applied to copies, so
+a bad batch leaves the session untouched.
+
+After an edit, valid_prefix() replays the previous order against the new
+matrices in one vectorized pass. The longest prefix whose processes can
+still finish in that order is kept, and only the remaining processes need
+the greedy safety search. Sessions live in this process, so multi-worker
+deployments need sticky routing; an unknown or expired session id is a
+404 and the client starts a new session.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+RESOURCE_NAMES = ["R1", "R2", "R3"]
+PROCESS_FIELDS = ["pid", "allocated", "max_need", "request", "priority"]
+_MATRICES = {"allocated": "allocation", "max_need": "max_need", "request": "request"}
+
+
+def _resource_vector(values, base=None, what="resources"):
+    """R1..R3 dict -> int vector; keys missing from a partial dict keep base"""
+    if not isinstance(values, dict):
+        raise ValueError(f"{what} must be an object keyed by {RESOURCE_NAMES}")
+    unknown = sorted(set(values) - set(RESOURCE_NAMES))
+    if unknown:
+        raise ValueError(f"Unknown resources {unknown} in {what}")
+    if base is None and len(values) < len(RESOURCE_NAMES):
+        raise ValueError(f"Missing resources {sorted(set(RESOURCE_NAMES) - set(values))} in {what}")
+    vector = np.array(base, dtype=np.int64) if base is not None else np.zeros(len(RESOURCE_NAMES), np.int64)
+    for j, res in enumerate(RESOURCE_NAMES):
+        if res in values:
+            value = values[res]
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0 or value != int(value):
+                raise ValueError(f"{what}.{res} must be a non-negative integer")
+            vector[j] = int(value)
+    return vector
+
+
+def _pid(value, what="pid"):
+    """value if it can key the pid index, else ValueError"""
+    try:
+        hash(value)
+    except TypeError:
+        raise ValueError(f"{what} must be a string or number, got {type(value).__name__}")
+    return value
+
+
+class ManualSession:
+    """Matrices of one manual allocation state and its last completion order"""
+
+    def __init__(self, available, processes):
+        for i, proc in enumerate(processes):
+            missing = [field for field in PROCESS_FIELDS if field not in proc]
+            if missing:
+                raise ValueError(f"Process {i} missing fields: {missing}")
+        self.session_id = uuid.uuid4().hex
+        self.version = 1
+        self.available = _resource_vector(available, what="available_resources")
+        # A list keeps each pid's JSON type (np.array would coerce 1 and "web" to strings)
+        self.pids = [_pid(proc["pid"], f"process {i} pid") for i, proc in enumerate(processes)]
+        if len(set(self.pids)) != len(self.pids):
+            raise ValueError("Process pids must be unique")
+        self.priorities = [proc["priority"] for proc in processes]
+        for field, attr in _MATRICES.items():
+            rows = [_resource_vector(proc[field], what=f"process {proc['pid']} {field}") for proc in processes]
+            setattr(self, attr, np.array(rows, dtype=np.int64).reshape(-1, len(RESOURCE_NAMES)))
+        self.index = {pid: i for i, pid in enumerate(self.pids)}
+        self.sequence = np.empty(0, dtype=np.int64)  # last completion order (row indices)
+        self.ml_cache = None  # (features key, ml_state, probabilities) of the last analysis
+        self.last_used = time.time()
+        self.lock = threading.Lock()
+
+    def apply(self, edits):
+        """Apply a batch of edits atomically; returns the pids they touched"""
+        if not isinstance(edits, list) or not edits:
+            raise ValueError("edits must be a non-empty list")
+        available = self.available.copy()
+        matrices = {attr: getattr(self, attr).copy() for attr in _MATRICES.values()}
+        pids, priorities, sequence = list(self.pids), list(self.priorities), self.sequence.copy()
+        index = dict(self.index)
+        touched = []
+
+        for n, edit in enumerate(edits):
+            op = edit.get("op") if isinstance(edit, dict) else None
+            if op == "available":
+                available = _resource_vector(edit.get("available_resources"), available, "available_resources")
+            elif op == "update":
+                row = index.get(_pid(edit.get("pid"), f"edit {n} pid"))
+                if row is None:
+                    raise ValueError(f"Edit {n}: unknown pid {edit.get('pid')!r}")
+                for field, attr in _MATRICES.items():
+                    if field in edit:
+                        matrices[attr][row] = _resource_vector(edit[field], matrices[attr][row], f"edit {n} {field}")
+                if "priority" in edit:
+                    priorities[row] = edit["priority"]
+                touched.append(edit["pid"])
+            elif op == "add":
+                proc = edit.get("process") or {}
+                missing = [field for field in PROCESS_FIELDS if field not in proc]
+                if missing:
+                    raise ValueError(f"Edit {n}: process missing fields: {missing}")
+                if _pid(proc["pid"], f"edit {n} pid") in index:
+                    raise ValueError(f"Edit {n}: pid {proc['pid']!r} already exists")
+                for field, attr in _MATRICES.items():
+                    vector = _resource_vector(proc[field], what=f"edit {n} {field}")
+                    matrices[attr] = np.vstack([matrices[attr], vector])
+                index[proc["pid"]] = len(pids)
+                pids.append(proc["pid"])
+                priorities.append(proc["priority"])
+                touched.append(proc["pid"])
+            elif op == "remove":
+                row = index.get(_pid(edit.get("pid"), f"edit {n} pid"))
+                if row is None:
+                    raise ValueError(f"Edit {n}: unknown pid {edit.get('pid')!r}")
+                for attr in matrices:
+                    matrices[attr] = np.delete(matrices[attr], row, axis=0)
+                del pids[row]
+                del priorities[row]
+                # Later rows shift up by one, in the order too
+                sequence = sequence[sequence != row]
+                sequence[sequence > row] -= 1
+                index = {pid: i for i, pid in enumerate(pids)}
+                touched.append(edit["pid"])
+            else:
+                raise ValueError(f"Edit {n}: op must be one of available, update, add, remove")
+
+        self.available = available
+        for attr, matrix in matrices.items():
+            setattr(self, attr, matrix)
+        self.pids, self.priorities, self.sequence, self.index = pids, priorities, sequence, index
+        self.version += 1
+        return touched
+
+    def valid_prefix(self, need):
+        """(rows of the previous order that still complete in order, work after them)"""
+        sequence = self.sequence
+        if len(sequence) == 0:
+            return sequence, self.available.copy()
+        held = np.cumsum(self.allocation[sequence], axis=0)
+        before = np.vstack([np.zeros((1, held.shape[1]), dtype=held.dtype), held[:-1]]) + self.available
+        ok = (need[sequence] <= before).all(axis=1)
+        k = len(sequence) if ok.all() else int(ok.argmin())
+        return sequence[:k], self.available + (held[k - 1] if k else 0)
+
+    def to_json(self):
+        """State in the /api/manual_predict request format"""
+        return {
+            "available_resources": dict(zip(RESOURCE_NAMES, self.available.tolist())),
+            "processes": [
+                {
+                    "pid": pid,
+                    "allocated": dict(zip(RESOURCE_NAMES, allocated)),
+                    "max_need": dict(zip(RESOURCE_NAMES, max_need)),
+                    "request": dict(zip(RESOURCE_NAMES, request)),
+                    "priority": priority,
+                }
+                for pid, allocated, max_need, request, priority in zip(
+                    self.pids, self.allocation.tolist(), self.max_need.tolist(),
+                    self.request.tolist(), self.priorities
+                )
+            ],
+        }
+
+
+class SessionStore:
+    """Bounded LRU of sessions that expire after ttl seconds idle"""
+
+    def __init__(self, max_sessions=1000, ttl=3600.0):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, session):
+        with self._lock:
+            self._sessions[session.session_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def get(self, session_id):
+        """Session by id (refreshing its LRU slot), or None if unknown/expired"""
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if now - session.last_used > self.ttl:
+                del self._sessions[session_id]
+                return None
+            session.last_used = now
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def remove(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self):
+        return len(self._sessions)
@@ -0,0 +1,116 @@
+"""Model metadata snapshot computed once per model version
+
+The snapshot covers feature importances (named by the model's own
+feature_names_in_), tree counts, depth and node statistics, memory
+footprint, per-class leaf counts and per-feature split thresholds. It is
+written next to the artifact as <artifact>.info.json and reused on later
+loads while the artifact's sha256 still matches.
+"""
+import json
+import logging
+import os
+from datetime import datetime
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+def _trees(model):
+    """Underlying sklearn Tree objects, if the model is tree based"""
+    if hasattr(model, "estimators_"):
+        estimators = np.ravel(model.estimators_)
+        return [est.tree_ for est in estimators if hasattr(est, "tree_")]
+    if hasattr(model, "tree_"):
+        return [model.tree_]
+    return []
+
+
+def _stats(values):
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return None
+    return {
+        "min": float(values.min()),
+        "mean": round(float(values.mean()), 2),
+        "max": float(values.max()),
+        "total": float(values.sum()),
+    }
+
+
+def build_snapshot(model, fallback_features, artifact_bytes=None):
+    """Describe a fitted model; pure function of the model object"""
+    names = getattr(model, "feature_names_in_", None)
+    feature_names = [str(n) for n in names] if names is not None else list(fallback_features)
+
+    feature_importance = {}
+    if hasattr(model, "feature_importances_"):
+        pairs = zip(feature_names, np.asarray(model.feature_importances_, dtype=float).tolist())
+        feature_importance = dict(sorted(pairs, key=lambda x: x[1], reverse=True))
+
+    classes = getattr(model, "classes_", None)
+    classes = classes.tolist() if classes is not None else []
+
+    trees = _trees(model)
+    leaf_counts = np.zeros(len(classes), dtype=np.int64)
+    thresholds = {name: [] for name in feature_names}
+    tree_bytes = 0
+    for tree in trees:
+        is_leaf = tree.children_left == -1
+        if classes and tree.value.shape[2] == len(classes):
+            leaf_counts += np.bincount(tree.value[is_leaf, 0, :].argmax(axis=1), minlength=len(classes))
+        for feature_index, threshold in zip(tree.feature[~is_leaf], tree.threshold[~is_leaf]):
+            thresholds[feature_names[feature_index]].append(threshold)
+        tree_bytes += sum(arr.nbytes for arr in (tree.children_left, tree.children_right,
+                                                   tree.feature, tree.threshold, tree.value))
+
+    return {
+        "snapshot_version": SNAPSHOT_VERSION,
+        "model_type": type(model).__name__,
+        "n_estimators": getattr(model, "n_estimators", len(trees) or "N/A"),
+        "max_depth": getattr(model, "max_depth", "N/A"),
+        "features": feature_names,
+        "feature_importance": feature_importance,
+        "classes": classes,
+        "trees": {
+            "count": len(trees),
+            "depth": _stats([t.max_depth for t in trees]),
+            "nodes": _stats([t.node_count for t in trees]),
+            "leaves": _stats([t.n_leaves for t in trees]),
+        },
+        "leaves_per_class": dict(zip(map(str, classes), leaf_counts.tolist())) if trees else {},
+        "split_thresholds": {
+            name: {"count": len(v), "min": float(np.min(v)), "median": float(np.median(v)), "max": float(np.max(v))}
+            for name, v in thresholds.items() if v
+        },
+        "memory": {
+            "artifact_bytes": artifact_bytes,
+            "tree_array_bytes": tree_bytes,
+        },
+        "computed_at": datetime.now().isoformat(),
+    }
+
+
+def load_or_build_snapshot(model, path, sha256, fallback_features, artifact_bytes=None):
+    """Reuse <path>.info.json when it matches sha256, otherwise build and store it"""
+    snapshot_path = f"{path}.info.json"
+    try:
+        with open(snapshot_path) as f:
+            cached = json.load(f)
+        if cached.get("sha256") == sha256 and cached.get("snapshot_version") == SNAPSHOT_VERSION:
+            return cached
+    except (OSError, ValueError):
+        pass
+
+    snapshot = build_snapshot(model, fallback_features, artifact_bytes)
+    snapshot["sha256"] = sha256
+    try:
+        tmp_path = f"{snapshot_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f, indent=2)
+        os.replace(tmp_path, snapshot_path)
+    except OSError as e:
+        logger.warning(f"Could not store model snapshot {snapshot_path}: {e}")
+    return snapshot
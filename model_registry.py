@@ -0,0 +1,185 @@
+"""Versioned model registry with background hot-reload
+
+Each named model is backed by an artifact path. A watcher thread polls the
+artifacts' (mtime, size); once a change has been stable for one poll the
+file is read, hashed, loaded, optionally wrapped by a prepare() hook and
+warmed up off the request path, and only then published by replacing a
+single dict entry. An optional describe()
+hook computes per-version metadata before the swap as well. Requests call
+get() once and keep using that object, so a swap never blocks or changes a
+model mid-request.
+"""
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ActiveModel = namedtuple("ActiveModel", ["name", "model", "version", "sha256", "path", "fingerprint", "loaded_at", "info"])
+
+
+def _fingerprint(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def warm_up(model):
+    """Run one prediction so lazily initialised state is built before serving"""
+    n_features = getattr(model, "n_features_in_", None)
+    if n_features is None or not hasattr(model, "predict_proba"):
+        return
+    X = np.zeros((1, n_features))
+    names = getattr(model, "feature_names_in_", None)
+    model.predict_proba(pd.DataFrame(X, columns=names) if names is not None else X)
+
+
+class ModelRegistry:
+    """Named, versioned model artifacts with atomic swaps"""
+
+    def __init__(self, paths, poll_interval=5.0, history=10, describe=None, prepare=None):
+        self.paths = dict(paths)
+        self.poll_interval = poll_interval
+        # prepare(name, model) -> object to serve (e.g. an inference wrapper)
+        self.prepare = prepare
+        # describe(model, path, sha256, artifact_bytes) -> metadata computed before the swap
+        self.describe = describe
+        self._active = {}
+        self._pending = {}
+        self._failed = {}  # name -> fingerprint of an artifact that failed to load
+        self._history = {name: deque(maxlen=history) for name in self.paths}
+        self._listeners = []
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def get(self, name):
+        """Return the active model object, or None if it never loaded"""
+        active = self._active.get(name)
+        return active.model if active is not None else None
+
+    def active(self, name):
+        """Return the ActiveModel record for name"""
+        return self._active.get(name)
+
+    def add_listener(self, callback):
+        """Call callback(ActiveModel) after every successful swap"""
+        self._listeners.append(callback)
+
+    def info(self, name):
+        """Version details of the active model and recent swaps"""
+        active = self._active.get(name)
+        return {
+            "name": name,
+            "path": self.paths.get(name),
+            "version": active.version if active else None,
+            "sha256": active.sha256 if active else None,
+            "loaded_at": datetime.fromtimestamp(active.loaded_at).isoformat() if active else None,
+            "history": list(self._history.get(name, [])),
+        }
+
+    def load(self, name, fingerprint=None):
+        """Load, warm up and publish the artifact for name; returns True on swap"""
+        path = self.paths[name]
+        with self._load_lock:
+            if fingerprint is None:
+                fingerprint = _fingerprint(path)
+            with open(path, "rb") as f:
+                payload = f.read()
+            sha256 = hashlib.sha256(payload).hexdigest()
+
+            current = self._active.get(name)
+            if current is not None and current.sha256 == sha256:
+                # Touched but identical: remember the new fingerprint only
+                self._active[name] = current._replace(fingerprint=fingerprint)
+                return False
+
+            started = time.perf_counter()
+            model = joblib.load(io.BytesIO(payload))
+            if self.prepare is not None:
+                model = self.prepare(name, model)
+            warm_up(model)
+            info = None
+            if self.describe is not None:
+                # Metadata is optional: a describe failure must not keep the model from serving
+                try:
+                    info = self.describe(model, path, sha256, len(payload))
+                except Exception as e:
+                    logger.error(f"Error describing model '{name}', loading without metadata: {e}")
+
+            loaded_at = time.time()
+            version = f"{datetime.fromtimestamp(fingerprint[0] / 1e9):%Y%m%d%H%M%S}-{sha256[:12]}"
+            active = ActiveModel(name, model, version, sha256, path, fingerprint, loaded_at, info)
+            self._active[name] = active  # single reference swap
+            self._history[name].append({"version": version, "loaded_at": datetime.fromtimestamp(loaded_at).isoformat()})
+
+        logger.info(f"Model '{name}' version {version} active (loaded in {time.perf_counter() - started:.2f}s)")
+        for callback in self._listeners:
+            try:
+                callback(active)
+            except Exception as e:
+                logger.error(f"Model swap listener error: {e}")
+        return True
+
+    def load_all(self):
+        """Load every registered artifact that exists; failures are logged"""
+        for name, path in self.paths.items():
+            try:
+                self.load(name)
+                self._failed.pop(name, None)
+            except Exception as e:
+                logger.error(f"Error loading model '{name}': {e}")
+                try:
+                    self._failed[name] = _fingerprint(path)
+                except OSError:
+                    pass
+
+    def poll(self):
+        """Reload artifacts whose files changed and stayed unchanged for one poll"""
+        for name, path in self.paths.items():
+            try:
+                fingerprint = _fingerprint(path)
+            except OSError:
+                continue
+
+            active = self._active.get(name)
+            if active is not None and active.fingerprint == fingerprint:
+                self._pending.pop(name, None)
+                continue
+            # A corrupt artifact is retried only once the file changes again
+            if self._failed.get(name) == fingerprint:
+                continue
+
+            # Wait until the writer is done (same fingerprint on two polls)
+            if self._pending.get(name) != fingerprint:
+                self._pending[name] = fingerprint
+                continue
+
+            self._pending.pop(name, None)
+            try:
+                self.load(name, fingerprint)
+                self._failed.pop(name, None)
+            except Exception as e:
+                self._failed[name] = fingerprint
+                logger.error(f"Error reloading model '{name}', keeping current version until the file changes: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self.poll()
+
+    def start(self):
+        """Start the background watcher (idempotent)"""
+        if self._thread is None and self.poll_interval > 0:
+            self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
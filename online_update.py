@@ -0,0 +1,378 @@
+"""Incremental updates of the live forest from newly labelled samples
+
+    python online_update.py --interval 600      # one updater for all workers
+    ONLINE_UPDATE_SECONDS=600 python backend.py  # or in-process (single worker)
+
+Operators confirm incidents through /api/labels; the samples are appended
+to a CSV store. Each update takes only the samples that arrived since the
+model's last update plus a fixed-size replay sample of the training data
+(so every class stays present), and grows a copy of the live forest by
+trees_per_update warm_start trees fitted on them. The oldest online trees
+are retired once the forest exceeds max_trees, so the original trees are
+kept. Update cost therefore depends on the new data, not on
+master_dataset.csv.
+
+A candidate is published only if, on a reference sample of the training
+data, its accuracy and rare-class recall do not drop by more than
+max_regression, and it is at least as accurate as the current model on
+held-out operator labels (every holdout_every-th labelled sample). It is
+written next to the artifact, os.replace()d over it and loaded through
+the ModelRegistry, so the usual prepare/warm-up/atomic swap applies and
+other workers pick the file up by polling. The number of consumed
+samples travels in the artifact (online_samples_), so a restart resumes
+where the last accepted update stopped.
+"""
+import argparse
+import copy
+import csv
+import io
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from compaction import balanced_class_weight, compact, quantization_steps
+
+logger = logging.getLogger(__name__)
+
+LABELS = {"DEADLOCK": 0, "SAFE": 1, "UNSAFE": 2}
+RARE_LABELS = [LABELS["DEADLOCK"], LABELS["UNSAFE"]]
+DEFAULT_STORE = "labeled_samples.csv"
+
+
+class LabeledSampleStore:
+    """Append-only CSV of operator-labelled samples, mirrored in memory
+
+    The mirror is only ever filled from the file, in file order, so row
+    indices (the online_samples_ watermark, the holdout split) agree
+    across every process appending to the same CSV.
+    """
+
+    def __init__(self, path, features):
+        self.path = path
+        self.features = list(features)
+        self._X = []
+        self._y = []
+        self._size = 0  # bytes of the file already mirrored (complete lines only)
+        self._columns = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def __len__(self):
+        return len(self._y)
+
+    def refresh(self):
+        """Pick up rows appended by another process"""
+        with self._lock:
+            self._load_tail()
+
+    def _load_tail(self):
+        """Mirror the lines past _size; reload everything if the file shrank (caller holds _lock)"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size < self._size:
+            logger.warning(f"{self.path} shrank from {self._size} to {size} bytes, reloading it")
+            self._X, self._y, self._size, self._columns = [], [], 0, None
+        if size == self._size:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._size)
+            chunk = f.read(size - self._size)
+        # A concurrent writer may be mid-line; leave the partial line for next time
+        chunk = chunk[:chunk.rfind(b"\n") + 1]
+        if not chunk:
+            return
+        if self._columns is None:
+            frame = pd.read_csv(io.BytesIO(chunk))
+            self._columns = list(frame.columns)
+        else:
+            frame = pd.read_csv(io.BytesIO(chunk), header=None, names=self._columns)
+            # Tolerate a repeated header line (written by an older version racing on file creation)
+            frame = frame[frame[self._columns[0]] != self._columns[0]]
+        self._X.extend(frame[self.features].astype(np.float64).to_numpy())
+        self._y.extend(frame["label"].map(LABELS).astype(int).tolist())
+        self._size += len(chunk)
+
+    def _create_file(self):
+        """Create the CSV with its header atomically; a no-op if any process already did"""
+        if os.path.exists(self.path):
+            return
+        header = io.StringIO()
+        csv.writer(header).writerow(["received_at", "source", *self.features, "label"])
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", newline="") as f:
+            f.write(header.getvalue())
+        try:
+            # link() fails if the path exists, so exactly one header is ever written
+            os.link(tmp_path, self.path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_path)
+
+    def add(self, X, labels, source="api"):
+        """Validate and append rows; labels are names (DEADLOCK/SAFE/UNSAFE)"""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        labels = [str(label).upper() for label in labels]
+        if X.shape[1] != len(self.features):
+            raise ValueError(f"Expected {len(self.features)} features: {self.features}")
+        if len(labels) != len(X):
+            raise ValueError("One label per sample is required")
+        unknown = sorted(set(labels) - set(LABELS))
+        if unknown:
+            raise ValueError(f"Unknown labels {unknown}, expected one of {list(LABELS)}")
+        if not np.isfinite(X).all():
+            raise ValueError("Samples contain NaN or infinite values")
+
+        received_at = datetime.now().isoformat()
+        text = io.StringIO()
+        writer = csv.writer(text)
+        writer.writerows([received_at, source, *row.tolist(), label] for row, label in zip(X, labels))
+        with self._lock:
+            self._create_file()
+            # One write() per batch, so appends from other processes do not interleave with it
+            with open(self.path, "a", newline="") as f:
+                f.write(text.getvalue())
+            self._load_tail()
+        return len(X)
+
+    def rows(self, start=0, end=None):
+        """(X, y, row indices) for rows[start:end]"""
+        with self._lock:
+            end = len(self._y) if end is None else end
+            X = np.array(self._X[start:end]).reshape(-1, len(self.features))
+            y = np.array(self._y[start:end], dtype=int)
+        return X, y, np.arange(start, start + len(y))
+
+
+def _scores(model, X, y):
+    """Accuracy and macro recall over the rare labels present in y"""
+    pred = model.predict(X)
+    rare = [label for label in RARE_LABELS if (y == label).any()]
+    recall = float(np.mean([(pred[y == label] == label).mean() for label in rare])) if rare else None
+    return {"accuracy": round(float((pred == y).mean()), 5),
+            "rare_class_recall": round(recall, 4) if recall is not None else None}
+
+
+class OnlineUpdater:
+    """Grows the registry's live forest with warm_start trees on new labelled samples"""
+
+    def __init__(self, registry, name, store, dataset_path, interval=0.0, min_samples=20,
+                 trees_per_update=20, max_trees=300, replay_size=2000, reference_size=5000,
+                 holdout_every=4, max_regression=0.002, seed=42):
+        self.registry = registry
+        self.name = name
+        self.store = store
+        self.dataset_path = dataset_path
+        self.interval = interval
+        self.min_samples = min_samples
+        self.trees_per_update = trees_per_update
+        self.max_trees = max_trees
+        self.replay_size = replay_size
+        self.reference_size = reference_size
+        self.holdout_every = holdout_every
+        self.max_regression = max_regression
+        self.rng = np.random.default_rng(seed)
+        self.features = store.features
+        self.last_result = None
+        self._replay = None
+        self._reference = None
+        self._rejected_at = None
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _forest(self):
+        """The served forest without inference wrappers, or None if it cannot warm-start"""
+        model = self.registry.get(self.name)
+        forest = getattr(model, "forest", model)
+        return forest if hasattr(forest, "estimators_") and hasattr(forest, "warm_start") else None
+
+    def _load_training_sample(self):
+        """Replay rows (weighted by compaction count) and a stratified reference set, built once"""
+        if self._replay is not None:
+            return
+        frame = pd.read_csv(self.dataset_path, usecols=self.features + ["label"])
+        frame["label"] = frame["label"].map(LABELS)
+
+        rare = frame["label"].isin(RARE_LABELS).to_numpy()
+        common = np.flatnonzero(~rare)
+        picked = self.rng.choice(common, size=min(self.reference_size, len(common)), replace=False)
+        reference = frame.iloc[np.concatenate([np.flatnonzero(rare), picked])]
+        self._reference = (reference[self.features], reference["label"].to_numpy())
+
+        compacted = compact(frame, self.features, steps=quantization_steps(frame, self.features),
+                            exact_labels=RARE_LABELS)
+        rare = compacted["label"].isin(RARE_LABELS).to_numpy()
+        weights = compacted["sample_weight"].to_numpy() * ~rare
+        n_common = min(max(self.replay_size - rare.sum(), 0), (~rare).sum())
+        picked = self.rng.choice(len(compacted), size=n_common, replace=False, p=weights / weights.sum())
+        replay = compacted.iloc[np.concatenate([np.flatnonzero(rare), picked])]
+        self._replay = (replay[self.features].to_numpy(), replay["label"].to_numpy())
+
+    def run_once(self):
+        """Try one update; returns a result dict (status accepted/rejected/skipped)"""
+        with self._run_lock:
+            started = time.perf_counter()
+            result = self._update()
+            result["seconds"] = round(time.perf_counter() - started, 3)
+            result["finished_at"] = datetime.now().isoformat()
+            self.last_result = result
+        log = logger.info if result["status"] != "skipped" else logger.debug
+        log(f"Online update {result['status']}: {result.get('reason', '')}")
+        return result
+
+    def _update(self):
+        self.store.refresh()
+        forest = self._forest()
+        if forest is None:
+            return {"status": "skipped", "reason": f"model '{self.name}' is not a warm-startable forest"}
+
+        seen = getattr(forest, "online_samples_", 0)
+        total = len(self.store)
+        X_new, y_new, index = self.store.rows(seen, total)
+        train = index % self.holdout_every != 0
+        if train.sum() < self.min_samples:
+            return {"status": "skipped", "reason": f"{train.sum()} new training samples (< {self.min_samples})"}
+        if self._rejected_at == total:
+            return {"status": "skipped", "reason": "no new samples since the last rejected candidate"}
+
+        self._load_training_sample()
+        X_replay, y_replay = self._replay
+        X_fit = pd.DataFrame(np.vstack([X_new[train], X_replay]), columns=self.features)
+        y_fit = np.concatenate([y_new[train], y_replay])
+
+        candidate = copy.deepcopy(forest)
+        n_before = len(candidate.estimators_)
+        # "balanced" would be computed on this batch anyway; spelling it out avoids the warm_start warning
+        class_weight = forest.get_params()["class_weight"]
+        candidate.set_params(warm_start=True, n_estimators=n_before + self.trees_per_update,
+                             class_weight=balanced_class_weight(y_fit, np.ones(len(y_fit)))
+                             if class_weight == "balanced" else class_weight)
+        candidate.fit(X_fit, y_fit)
+        if not np.array_equal(candidate.classes_, forest.classes_):
+            return {"status": "rejected", "reason": "candidate classes differ from the live model"}
+
+        online = getattr(forest, "online_trees_", 0) + self.trees_per_update
+        retire = min(max(len(candidate.estimators_) - self.max_trees, 0), online - self.trees_per_update)
+        if retire:
+            first_online = len(candidate.estimators_) - online
+            del candidate.estimators_[first_online:first_online + retire]
+            online -= retire
+        candidate.set_params(warm_start=False, n_estimators=len(candidate.estimators_), class_weight=class_weight)
+        candidate.online_trees_ = online
+        candidate.online_samples_ = total
+
+        # Holdout: the reference sample plus every operator label held out so far
+        X_ref, y_ref = self._reference
+        X_labels, y_labels, labelled = self.store.rows(0, total)
+        held_out = labelled % self.holdout_every == 0
+        X_hold = pd.DataFrame(X_labels[held_out], columns=self.features)
+        validation = {"reference": {"current": _scores(forest, X_ref, y_ref), "candidate": _scores(candidate, X_ref, y_ref)}}
+        if held_out.any():
+            validation["labelled_holdout"] = {"current": _scores(forest, X_hold, y_labels[held_out]),
+                                              "candidate": _scores(candidate, X_hold, y_labels[held_out])}
+
+        result = {
+            "new_samples": int(train.sum()),
+            "holdout_samples": int(held_out.sum()),
+            "replay_samples": len(y_replay),
+            "trees": {"before": n_before, "after": len(candidate.estimators_), "online": online, "retired": retire},
+            "validation": validation,
+        }
+        reason = self._regression(validation)
+        if reason:
+            self._rejected_at = total
+            result.update(status="rejected", reason=reason)
+            return result
+
+        path = self.registry.paths[self.name]
+        tmp_path = f"{path}.online.tmp"
+        joblib.dump(candidate, tmp_path)
+        os.replace(tmp_path, path)
+        self.registry.load(self.name)
+        active = self.registry.active(self.name)
+        result.update(status="accepted", reason=f"version {active.version if active else '?'}")
+        return result
+
+    def _regression(self, validation):
+        """Why the candidate must not ship, or None"""
+        current, candidate = validation["reference"]["current"], validation["reference"]["candidate"]
+        if candidate["accuracy"] < current["accuracy"] - self.max_regression:
+            return f"reference accuracy {current['accuracy']} -> {candidate['accuracy']}"
+        if (current["rare_class_recall"] is not None
+                and candidate["rare_class_recall"] < current["rare_class_recall"] - self.max_regression):
+            return f"reference rare-class recall {current['rare_class_recall']} -> {candidate['rare_class_recall']}"
+        labelled = validation.get("labelled_holdout")
+        if labelled and labelled["candidate"]["accuracy"] < labelled["current"]["accuracy"]:
+            return f"labelled holdout accuracy {labelled['current']['accuracy']} -> {labelled['candidate']['accuracy']}"
+        return None
+
+    def status(self):
+        forest = self._forest()
+        seen = getattr(forest, "online_samples_", 0) if forest is not None else 0
+        return {
+            "interval_seconds": self.interval,
+            "running": self._thread is not None,
+            "labelled_samples": len(self.store),
+            "pending_samples": max(len(self.store) - seen, 0),
+            "trees": len(forest.estimators_) if forest is not None else None,
+            "online_trees": getattr(forest, "online_trees_", 0) if forest is not None else None,
+            "last_result": self.last_result,
+        }
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Online update error, keeping current version: {e}")
+
+    def start(self):
+        """Start the update schedule (no-op when interval is 0)"""
+        if self._thread is None and self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name="online-updater", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    from model_registry import ModelRegistry
+    from system_metrics import METRIC_FIELDS
+
+    parser = argparse.ArgumentParser(description="Grow the live forest from newly labelled samples")
+    parser.add_argument("--model", default="rf_model_live.joblib")
+    parser.add_argument("--store", default=DEFAULT_STORE, help="labelled samples CSV (written by /api/labels)")
+    parser.add_argument("--dataset", default="master_dataset.csv", help="replay and reference data")
+    parser.add_argument("--interval", type=float, default=0, help="seconds between updates; 0 runs once")
+    parser.add_argument("--trees", type=int, default=20, help="trees added per update")
+    parser.add_argument("--max-trees", type=int, default=300)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    registry = ModelRegistry({"live": args.model}, poll_interval=0)
+    registry.load("live")
+    updater = OnlineUpdater(registry, "live", LabeledSampleStore(args.store, METRIC_FIELDS), args.dataset,
+                            trees_per_update=args.trees, max_trees=args.max_trees)
+    if args.interval <= 0:
+        print(updater.run_once())
+        return
+    try:
+        while True:
+            updater.run_once()
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
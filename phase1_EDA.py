@@ -1,103 +1,403 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-# -----------------------------
-# 1. Load dataset
-# -----------------------------
-df = pd.read_csv("master_dataset.csv")
+# Bump when a plot function changes so cached PNGs are redrawn
+PLOT_CODE_VERSION = 2
+CACHE_FILE = ".eda_cache.json"
 
-print("\n===== BASIC DATA INFO =====")
-print(df.info())
+# Large-data mode: streamed in chunks, plots built from bounded aggregates
+LARGE_FILE_BYTES = 200 * 1024 * 1024
+CHUNK_ROWS = 500_000
+HIST_BINS = 512
+DENSITY_BINS = 200
+SAFE_SAMPLE_ROWS = 5000
+RARE_SAMPLE_ROWS = 50_000
+RARE_LABELS = ("DEADLOCK", "UNSAFE")
+
+features = [
+    "cpu_percent",
+    "memory_percent",
+    "disk_percent",
+    "total_allocated",
+    "total_need",
+    "deadlock_risk"
+]
 
-print("\n===== SAMPLE ROWS =====")
-print(df.head())
 
 # -----------------------------
-# 2. Label & source distribution
+# Plot workers (headless, run in separate processes)
 # -----------------------------
-print("\n===== LABEL DISTRIBUTION =====")
-print(df["label"].value_counts())
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    sns.set(style="whitegrid")
+    return plt, sns
 
-print("\n===== SOURCE DISTRIBUTION =====")
-print(df["source"].value_counts())
 
-# -----------------------------
-# 3. Group-wise statistics
-# -----------------------------
-group_stats = df.groupby("label")[
-    ["cpu_percent", "memory_percent", "disk_percent", "deadlock_risk"]
-].mean()
+def plot_box(payload, path):
+    plt, _ = _pyplot()
+    fig, ax = plt.subplots()
+    ax.bxp(payload["stats"], showfliers=True)
+    ax.set_xlabel("label")
+    ax.set_ylabel(payload["column"])
+    ax.set_title(payload["title"])
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def plot_hist(payload, path):
+    plt, _ = _pyplot()
+    fig, ax = plt.subplots()
+    edges = payload["edges"]
+    ax.bar(edges[:-1], payload["counts"], width=np.diff(edges), align="edge", alpha=0.6, edgecolor="white")
+    if payload["kde_x"] is not None:
+        ax.plot(payload["kde_x"], payload["kde_y"])
+    ax.set_xlabel(payload["column"])
+    ax.set_ylabel("Count")
+    ax.set_title(payload["title"])
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def plot_scatter(payload, path):
+    plt, sns = _pyplot()
+    fig, ax = plt.subplots()
+    sns.scatterplot(x="total_allocated", y="total_need", hue="label", data=payload["points"], ax=ax)
+    ax.set_title(payload["title"])
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def plot_heatmap(payload, path):
+    plt, sns = _pyplot()
+    fig, ax = plt.subplots(figsize=(8, 6))
+    sns.heatmap(payload["corr"], annot=True, cmap="coolwarm", fmt=".2f", ax=ax)
+    ax.set_title(payload["title"])
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def plot_density(payload, path):
+    plt, _ = _pyplot()
+    from matplotlib.colors import LogNorm
+    fig, ax = plt.subplots()
+    counts = np.ma.masked_equal(payload["counts"], 0)
+    mesh = ax.pcolormesh(payload["x_edges"], payload["y_edges"], counts.T, norm=LogNorm(), cmap="viridis")
+    fig.colorbar(mesh, ax=ax, label="rows")
+    rare = payload["rare"]
+    for label, marker in zip(RARE_LABELS, ("x", "o")):
+        points = rare[rare["label"] == label]
+        if len(points):
+            ax.scatter(points["total_allocated"], points["total_need"], s=12, marker=marker,
+                       facecolors="none" if marker == "o" else None, edgecolors="red" if marker == "o" else None,
+                       c="red" if marker == "x" else None, label=label)
+    if len(rare):
+        ax.legend()
+    ax.set_xlabel("total_allocated")
+    ax.set_ylabel("total_need")
+    ax.set_title(payload["title"])
+    fig.savefig(path)
+    plt.close(fig)
+
+
+PLOTTERS = {
+    "box": plot_box,
+    "hist": plot_hist,
+    "scatter": plot_scatter,
+    "heatmap": plot_heatmap,
+    "density": plot_density,
+}
+
+
+def render(kind, payload, path):
+    PLOTTERS[kind](payload, path)
+    return path
 
-print("\n===== AVERAGE SYSTEM LOAD BY LABEL =====")
-print(group_stats)
 
 # -----------------------------
-# 4. Correlation analysis
+# Aggregation (one pass over the loaded columns)
 # -----------------------------
-features = [
-    "cpu_percent",
-    "memory_percent",
-    "disk_percent",
-    "total_allocated",
-    "total_need",
-    "deadlock_risk"
-]
+def box_stats(values, label):
+    """matplotlib bxp() statistics for one group"""
+    values = np.sort(values)
+    q1, med, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    lo = values[np.searchsorted(values, q1 - 1.5 * iqr)]
+    hi = values[np.searchsorted(values, q3 + 1.5 * iqr, side="right") - 1]
+    fliers = np.unique(values[(values < lo) | (values > hi)])
+    return {"label": label, "q1": q1, "med": med, "q3": q3, "whislo": lo, "whishi": hi, "fliers": fliers}
+
+
+def kde_curve(values, edges, points=200, max_sample=20000):
+    """Gaussian KDE scaled to histogram counts (None when degenerate)"""
+    from scipy.stats import gaussian_kde
+    if len(values) < 2 or np.ptp(values) == 0:
+        return None, None
+    sample = values if len(values) <= max_sample else np.random.default_rng(0).choice(values, max_sample, replace=False)
+    x = np.linspace(edges[0], edges[-1], points)
+    return x, gaussian_kde(sample)(x) * len(values) * (edges[1] - edges[0])
+
+
+def compute_aggregates(df):
+    groups = {label: idx for label, idx in df.groupby("label", observed=True).indices.items()}
+    cpu = df["cpu_percent"].to_numpy()
+    memory = df["memory_percent"].to_numpy()
+    risk = df["deadlock_risk"].to_numpy()
+
+    counts, edges = np.histogram(risk, bins=20)
+    kde_x, kde_y = kde_curve(risk, edges)
+
+    # Scatter input: identical (allocation, need, label) points drawn once
+    points = df[["total_allocated", "total_need", "label"]].drop_duplicates()
+    points["label"] = points["label"].astype(str)
 
-corr = df[features].corr()
+    return {
+        "label_counts": df["label"].value_counts(),
+        "source_counts": df["source"].value_counts(),
+        "group_stats": df.groupby("label", observed=True)[
+            ["cpu_percent", "memory_percent", "disk_percent", "deadlock_risk"]
+        ].mean(),
+        "corr": df[features].corr(),
+        "cpu_box": [box_stats(cpu[idx], label) for label, idx in groups.items()],
+        "memory_box": [box_stats(memory[idx], label) for label, idx in groups.items()],
+        "risk_hist": {"counts": counts, "edges": edges, "kde_x": kde_x, "kde_y": kde_y},
+        "points": points,
+    }
+
+
+def box_stats_from_hist(counts, edges, label):
+    """Approximate bxp() statistics from a fixed-bin histogram"""
+    cdf = np.cumsum(counts) / max(counts.sum(), 1)
+    centers = (edges[:-1] + edges[1:]) / 2
+    q1, med, q3 = np.interp([0.25, 0.5, 0.75], cdf, centers)
+    iqr = q3 - q1
+    occupied = centers[counts > 0]
+    lo = occupied[occupied >= q1 - 1.5 * iqr].min()
+    hi = occupied[occupied <= q3 + 1.5 * iqr].max()
+    return {"label": label, "q1": q1, "med": med, "q3": q3, "whislo": lo, "whishi": hi, "fliers": []}
+
+
+def bottom_k(frame, keys, kept, kept_keys, k):
+    """Merge a chunk into a uniform sample of size k (smallest random keys win)"""
+    frame = pd.concat([kept, frame]) if kept is not None else frame
+    keys = np.concatenate([kept_keys, keys]) if kept_keys is not None else keys
+    if len(keys) > k:
+        idx = np.argpartition(keys, k)[:k]
+        frame, keys = frame.iloc[idx], keys[idx]
+    return frame, keys
+
+
+def read_chunks(path):
+    return pd.read_csv(path, chunksize=CHUNK_ROWS, dtype={"label": "category", "source": "category"})
+
+
+def compute_aggregates_streaming(path):
+    """Same aggregates as compute_aggregates() in bounded memory (two chunked passes)"""
+    n = 0
+    lows = pd.Series(np.inf, index=features)
+    highs = pd.Series(-np.inf, index=features)
+    sums = np.zeros(len(features))
+    cross = np.zeros((len(features), len(features)))
+    label_counts = pd.Series(dtype="int64")
+    source_counts = pd.Series(dtype="int64")
+    group_sums = None
+    head = None
+
+    # Pass 1: ranges, counts, means and co-moments for the correlation matrix
+    for chunk in read_chunks(path):
+        if head is None:
+            head = chunk.head()
+        values = chunk[features].to_numpy(dtype=np.float64)
+        n += len(values)
+        lows = np.minimum(lows, values.min(axis=0))
+        highs = np.maximum(highs, values.max(axis=0))
+        sums += values.sum(axis=0)
+        cross += values.T @ values
+        label_counts = label_counts.add(chunk["label"].value_counts(), fill_value=0)
+        source_counts = source_counts.add(chunk["source"].value_counts(), fill_value=0)
+        part = chunk.groupby("label", observed=True)[
+            ["cpu_percent", "memory_percent", "disk_percent", "deadlock_risk"]
+        ].agg(["sum", "count"])
+        group_sums = part if group_sums is None else group_sums.add(part, fill_value=0)
+
+    mean = sums / n
+    cov = cross / n - np.outer(mean, mean)
+    std = np.sqrt(np.clip(np.diag(cov), 0, None))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = pd.DataFrame(cov / np.outer(std, std), index=features, columns=features)
+    group_stats = pd.DataFrame({
+        col: group_sums[(col, "sum")] / group_sums[(col, "count")]
+        for col in ["cpu_percent", "memory_percent", "disk_percent", "deadlock_risk"]
+    })
+
+    def bin_edges(col, bins):
+        lo, hi = lows[col], highs[col]
+        return np.linspace(lo, hi if hi > lo else lo + 1, bins + 1)
+
+    cpu_edges = bin_edges("cpu_percent", HIST_BINS)
+    mem_edges = bin_edges("memory_percent", HIST_BINS)
+    risk_edges = bin_edges("deadlock_risk", 20)
+    x_edges = bin_edges("total_allocated", DENSITY_BINS)
+    y_edges = bin_edges("total_need", DENSITY_BINS)
+
+    cpu_hist, mem_hist = {}, {}
+    risk_counts = np.zeros(20, dtype=np.int64)
+    density = np.zeros((DENSITY_BINS, DENSITY_BINS), dtype=np.int64)
+    rng = np.random.default_rng(0)
+    safe, safe_keys, rare, rare_keys = None, None, None, None
+    point_cols = ["total_allocated", "total_need", "label"]
+
+    # Pass 2: streaming histograms and a stratified sample that keeps rare rows
+    for chunk in read_chunks(path):
+        for label, idx in chunk.groupby("label", observed=True).indices.items():
+            rows = chunk.iloc[idx]
+            cpu_hist[label] = cpu_hist.get(label, 0) + np.histogram(rows["cpu_percent"], cpu_edges)[0]
+            mem_hist[label] = mem_hist.get(label, 0) + np.histogram(rows["memory_percent"], mem_edges)[0]
+        risk_counts += np.histogram(chunk["deadlock_risk"], risk_edges)[0]
+        density += np.histogram2d(chunk["total_allocated"], chunk["total_need"], [x_edges, y_edges])[0].astype(np.int64)
+
+        is_rare = chunk["label"].isin(RARE_LABELS).to_numpy()
+        points = chunk[point_cols]
+        safe, safe_keys = bottom_k(points[~is_rare], rng.random((~is_rare).sum()), safe, safe_keys, SAFE_SAMPLE_ROWS)
+        rare, rare_keys = bottom_k(points[is_rare], rng.random(is_rare.sum()), rare, rare_keys, RARE_SAMPLE_ROWS)
+
+    sample = pd.concat([frame for frame in (safe, rare) if frame is not None]).sort_index()
+    sample["label"] = sample["label"].astype(str)
+    rare = rare.copy() if rare is not None else pd.DataFrame(columns=point_cols)
+    rare["label"] = rare["label"].astype(str)
+
+    return {
+        "rows": n,
+        "head": head,
+        "label_counts": label_counts.astype("int64").sort_values(ascending=False),
+        "source_counts": source_counts.astype("int64").sort_values(ascending=False),
+        "group_stats": group_stats,
+        "corr": corr,
+        "cpu_box": [box_stats_from_hist(h, cpu_edges, label) for label, h in cpu_hist.items()],
+        "memory_box": [box_stats_from_hist(h, mem_edges, label) for label, h in mem_hist.items()],
+        "risk_hist": {"counts": risk_counts, "edges": risk_edges, "kde_x": None, "kde_y": None},
+        "points": sample,
+        "density": {"counts": density, "x_edges": x_edges, "y_edges": y_edges, "rare": rare},
+    }
+
+
+def plot_jobs(agg):
+    return [
+        ("cpu_vs_label.png", "box",
+         {"stats": agg["cpu_box"], "column": "cpu_percent", "title": "CPU Usage vs System State"}),
+        ("memory_vs_label.png", "box",
+         {"stats": agg["memory_box"], "column": "memory_percent", "title": "Memory Usage vs System State"}),
+        ("deadlock_risk_distribution.png", "hist",
+         dict(agg["risk_hist"], column="deadlock_risk", title="Deadlock Risk Distribution")),
+        ("allocation_vs_need.png", "scatter",
+         {"points": agg["points"], "title": "Total Allocation vs Total Need"}),
+        ("correlation_heatmap.png", "heatmap",
+         {"corr": agg["corr"], "title": "Feature Correlation Heatmap"}),
+    ] + ([
+        ("allocation_vs_need_density.png", "density",
+         dict(agg["density"], title="Total Allocation vs Total Need (density)")),
+    ] if "density" in agg else [])
+
+
+def content_hash(kind, payload):
+    h = hashlib.sha256()
+    h.update(f"{PLOT_CODE_VERSION}:{kind}".encode())
+    h.update(pickle.dumps(payload, protocol=4))
+    return h.hexdigest()
 
-print("\n===== CORRELATION MATRIX =====")
-print(corr)
 
 # -----------------------------
-# 5. Visualization
+# Report
 # -----------------------------
-sns.set(style="whitegrid")
-
-# CPU vs Label
-plt.figure()
-sns.boxplot(x="label", y="cpu_percent", data=df)
-plt.title("CPU Usage vs System State")
-plt.savefig("cpu_vs_label.png")
-plt.show()
-
-# Memory vs Label
-plt.figure()
-sns.boxplot(x="label", y="memory_percent", data=df)
-plt.title("Memory Usage vs System State")
-plt.savefig("memory_vs_label.png")
-plt.show()
-
-# Deadlock Risk Distribution
-plt.figure()
-sns.histplot(df["deadlock_risk"], bins=20, kde=True)
-plt.title("Deadlock Risk Distribution")
-plt.savefig("deadlock_risk_distribution.png")
-plt.show()
-
-# Total Need vs Total Allocation
-plt.figure()
-sns.scatterplot(
-    x="total_allocated",
-    y="total_need",
-    hue="label",
-    data=df
-)
-plt.title("Total Allocation vs Total Need")
-plt.savefig("allocation_vs_need.png")
-plt.show()
-
-# Heatmap
-plt.figure(figsize=(8, 6))
-sns.heatmap(corr, annot=True, cmap="coolwarm", fmt=".2f")
-plt.title("Feature Correlation Heatmap")
-plt.savefig("correlation_heatmap.png")
-plt.show()
-
-print("\n✅ Phase 1 EDA complete.")
-print("📊 Generated plots:")
-print(" - cpu_vs_label.png")
-print(" - memory_vs_label.png")
-print(" - deadlock_risk_distribution.png")
-print(" - allocation_vs_need.png")
-print(" - correlation_heatmap.png")
+def main():
+    parser = argparse.ArgumentParser(description="Phase 1 EDA report")
+    parser.add_argument("--data", default="master_dataset.csv")
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--workers", type=int, default=min(5, os.cpu_count() or 1))
+    parser.add_argument("--force", action="store_true", help="redraw plots even if inputs are unchanged")
+    parser.add_argument("--mode", choices=["auto", "full", "large"], default="auto",
+                        help="large streams the file in chunks; auto picks it for files over 200 MB")
+    args = parser.parse_args()
+
+    large = args.mode == "large" or (args.mode == "auto" and os.path.getsize(args.data) > LARGE_FILE_BYTES)
+
+    if large:
+        # 1. Stream dataset (bounded memory)
+        agg = compute_aggregates_streaming(args.data)
+
+        print("\n===== BASIC DATA INFO =====")
+        print(f"{agg['rows']} rows (streamed in chunks of {CHUNK_ROWS})")
+
+        print("\n===== SAMPLE ROWS =====")
+        print(agg["head"])
+    else:
+        # 1. Load dataset
+        df = pd.read_csv(args.data, dtype={"label": "category", "source": "category"})
+
+        print("\n===== BASIC DATA INFO =====")
+        df.info()
+
+        print("\n===== SAMPLE ROWS =====")
+        print(df.head())
+
+        # 2-4. Aggregates for both the printed report and the plots
+        agg = compute_aggregates(df)
+
+    print("\n===== LABEL DISTRIBUTION =====")
+    print(agg["label_counts"])
+
+    print("\n===== SOURCE DISTRIBUTION =====")
+    print(agg["source_counts"])
+
+    print("\n===== AVERAGE SYSTEM LOAD BY LABEL =====")
+    print(agg["group_stats"])
+
+    print("\n===== CORRELATION MATRIX =====")
+    print(agg["corr"])
+
+    # 5. Visualization: only plots whose inputs changed, in parallel
+    os.makedirs(args.out_dir, exist_ok=True)
+    cache_path = os.path.join(args.out_dir, CACHE_FILE)
+    try:
+        with open(cache_path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    todo = []
+    for name, kind, payload in plot_jobs(agg):
+        path = os.path.join(args.out_dir, name)
+        digest = content_hash(kind, payload)
+        if not args.force and cache.get(name) == digest and os.path.exists(path):
+            print(f" - {name} unchanged, skipped")
+            continue
+        todo.append((name, kind, payload, path, digest))
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(todo)))) as pool:
+            futures = [(name, digest, pool.submit(render, kind, payload, path))
+                       for name, kind, payload, path, digest in todo]
+            for name, digest, future in futures:
+                future.result()
+                cache[name] = digest
+
+    with open(cache_path, "w") as f:
+        json.dump(cache, f, indent=2)
+
+    print("\n✅ Phase 1 EDA complete.")
+    print("📊 Generated plots:")
+    for name, _, _ in plot_jobs(agg):
+        print(f" - {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import json
+import pickle
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, recall_score
+from sklearn.model_selection import train_test_split
+from sklearn.tree import DecisionTreeRegressor
+
+from compact_model import BinnedLookupModel, CompactTree
+from compaction import balanced_class_weight, compact, quantization_steps
+
+# =========================
+# CONFIGURATION
+# =========================
+TEACHER_PATH = "rf_model_live.joblib"
+COMPACT_PATH = "rf_model_live_compact.joblib"
+REPORT_PATH = "distillation_report.json"
+
+# Largest serialized student we are willing to ship to edge agents
+SIZE_BUDGET_BYTES = 64 * 1024
+
+TREE_DEPTHS = [6, 8, 10]
+LOOKUP_BINS = [4, 6]
+
+live_features = [
+    "num_processes",
+    "cpu_percent",
+    "memory_percent",
+    "disk_percent",
+    "total_allocated",
+    "total_need"
+]
+label_map = {"DEADLOCK": 0, "SAFE": 1, "UNSAFE": 2}
+
+# =========================
+# LOAD DATA & TEACHER
+# =========================
+df = pd.read_csv("master_dataset.csv")
+X = df[live_features]
+y = df["label"].map(label_map)
+
+X_train, X_test, y_train, y_test = train_test_split(
+    X,
+    y,
+    test_size=0.25,
+    random_state=42,
+    stratify=y
+)
+
+try:
+    teacher = joblib.load(TEACHER_PATH)
+    print(f"\n===== TEACHER LOADED FROM {TEACHER_PATH} =====")
+except FileNotFoundError:
+    # Same configuration as the notebook's live model, on the compacted training set
+    train = compact(
+        X_train.assign(label=y_train),
+        live_features,
+        steps=quantization_steps(X_train, live_features),
+        exact_labels=[label_map["DEADLOCK"], label_map["UNSAFE"]]
+    )
+    teacher = RandomForestClassifier(
+        n_estimators=200,
+        max_depth=15,
+        class_weight=balanced_class_weight(train["label"], train["sample_weight"]),
+        random_state=42,
+        n_jobs=-1
+    )
+    teacher.fit(train[live_features], train["label"], sample_weight=train["sample_weight"])
+    print("\n===== TEACHER TRAINED (no artifact found) =====")
+
+classes = teacher.classes_
+teacher_proba_train = teacher.predict_proba(X_train)
+teacher_pred_test = teacher.predict(X_test)
+
+# =========================
+# DISTILL STUDENTS
+# =========================
+# Students learn the teacher's probabilities, not the raw labels, so they
+# inherit its handling of the rare DEADLOCK/UNSAFE classes.
+students = {}
+
+for depth in TREE_DEPTHS:
+    regressor = DecisionTreeRegressor(max_depth=depth, min_samples_leaf=2, random_state=42)
+    regressor.fit(X_train, teacher_proba_train)
+    students[f"tree_depth_{depth}"] = CompactTree(regressor, classes, live_features)
+
+for n_bins in LOOKUP_BINS:
+    students[f"lookup_{n_bins}_bins"] = BinnedLookupModel.fit(
+        X_train.to_numpy(), teacher_proba_train, classes, live_features, n_bins=n_bins
+    )
+
+# =========================
+# ACCURACY vs LATENCY REPORT
+# =========================
+def single_sample_latency_us(predict_one, rows, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for row in rows:
+            predict_one(row)
+        best = min(best, (time.perf_counter() - start) / len(rows))
+    return best * 1e6
+
+
+def batch_rows_per_second(model, X_batch):
+    start = time.perf_counter()
+    model.predict_proba(X_batch)
+    return len(X_batch) / (time.perf_counter() - start)
+
+
+sample_rows = X_test.to_numpy()[:200]
+sample_frames = [X_test.iloc[[i]] for i in range(20)]
+rare_labels = [label_map["DEADLOCK"], label_map["UNSAFE"]]
+
+
+def evaluate(name, model, predict_one, one_rows):
+    y_pred = model.predict(X_test)
+    return {
+        "model": name,
+        "accuracy": round(accuracy_score(y_test, y_pred), 5),
+        "agreement_with_teacher": round(float((y_pred == teacher_pred_test).mean()), 5),
+        "rare_class_recall": round(recall_score(y_test, y_pred, labels=rare_labels, average="macro",
+                                                zero_division=0), 4),
+        "single_sample_us": round(single_sample_latency_us(predict_one, one_rows), 2),
+        "batch_rows_per_s": round(batch_rows_per_second(model, X_test)),
+        "size_bytes": len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)),
+    }
+
+
+report = [evaluate("teacher_random_forest", teacher, teacher.predict_proba, sample_frames)]
+for name, student in students.items():
+    report.append(evaluate(name, student, student.predict_proba_one, sample_rows))
+
+print("\n===== ACCURACY vs LATENCY =====")
+print(pd.DataFrame(report).set_index("model").to_string())
+
+# =========================
+# PICK & SAVE COMPACT MODEL
+# =========================
+# Most faithful student that fits the size budget
+eligible = [r for r in report[1:] if r["size_bytes"] <= SIZE_BUDGET_BYTES] or report[1:]
+best = max(eligible, key=lambda r: (r["agreement_with_teacher"], -r["single_sample_us"]))
+joblib.dump(students[best["model"]], COMPACT_PATH)
+
+with open(REPORT_PATH, "w") as f:
+    json.dump({"selected": best["model"], "size_budget_bytes": SIZE_BUDGET_BYTES, "models": report}, f, indent=2)
+
+print(f"\n✅ Saved {best['model']} to {COMPACT_PATH}")
+print(f"📄 Report written to {REPORT_PATH}")
+print("Serve it with LIVE_MODEL_VARIANT=compact python backend.py")
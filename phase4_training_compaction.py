@@ -0,0 +1,139 @@
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, precision_score, recall_score
+from sklearn.model_selection import train_test_split
+
+from compaction import balanced_class_weight, compact, compaction_summary, quantization_steps
+from temporal_features import TEMPORAL_FEATURES, WINDOW, load_temporal_features, stream_temporal_features
+
+# =========================
+# CONFIGURATION
+# =========================
+REPORT_PATH = "compaction_report.json"
+TEMPORAL_PATH = "temporal_features.parquet"
+
+# Bin width as a share of each feature's 1st-99th percentile spread; 0 = exact duplicates only
+RESOLUTIONS = [0, 0.005, 0.01, 0.02, 0.05]
+
+live_features = [
+    "num_processes",
+    "cpu_percent",
+    "memory_percent",
+    "disk_percent",
+    "total_allocated",
+    "total_need"
+]
+label_map = {"DEADLOCK": 0, "SAFE": 1, "UNSAFE": 2}
+rare_labels = [label_map["DEADLOCK"], label_map["UNSAFE"]]
+
+# =========================
+# LOAD DATA
+# =========================
+df_live = pd.read_csv("master_dataset.csv")
+df_live["label_encoded"] = df_live["label"].map(label_map)
+
+if not os.path.exists(TEMPORAL_PATH):
+    stream_temporal_features("master_dataset.csv", TEMPORAL_PATH, window=WINDOW)
+df_temporal = load_temporal_features(TEMPORAL_PATH)
+df_temporal["label_encoded"] = df_temporal["label"].map(label_map)
+
+temporal_cols = live_features + ["deadlock_risk"]
+temporal_cols += [f"{c}_mean" for c in TEMPORAL_FEATURES]
+temporal_cols += [f"{c}_std" for c in TEMPORAL_FEATURES]
+
+# (name, frame, features, forest parameters) - the notebook's live model and phase 2's model
+SETUPS = [
+    ("live_rf200", df_live, live_features,
+     dict(n_estimators=200, max_depth=15)),
+    ("temporal_rf300", df_temporal, temporal_cols,
+     dict(n_estimators=300, max_depth=14, min_samples_split=5)),
+]
+
+# =========================
+# FULL vs COMPACTED TRAINING
+# =========================
+def fit_and_score(params, X_fit, y_fit, weights, class_weight, X_test, y_test):
+    model = RandomForestClassifier(**params, class_weight=class_weight, random_state=42, n_jobs=-1)
+    start = time.perf_counter()
+    model.fit(X_fit, y_fit, sample_weight=weights)
+    fit_seconds = time.perf_counter() - start
+    return model.predict(X_test), fit_seconds
+
+
+report = []
+for name, frame, features, params in SETUPS:
+    X_train, X_test, y_train, y_test = train_test_split(
+        frame[features],
+        frame["label_encoded"],
+        test_size=0.25,
+        random_state=42,
+        stratify=frame["label_encoded"]
+    )
+    print(f"\n===== {name}: {len(X_train)} training rows, {len(features)} features =====")
+
+    baseline_pred, baseline_seconds = fit_and_score(params, X_train, y_train, None, "balanced", X_test, y_test)
+    rows = [{
+        "setup": name,
+        "resolution": None,
+        "train_rows": len(X_train),
+        "compaction_ratio": 1.0,
+        "compact_seconds": 0.0,
+        "fit_seconds": round(baseline_seconds, 2),
+        "fit_speedup": 1.0,
+        "accuracy": round(accuracy_score(y_test, baseline_pred), 5),
+        "rare_class_recall": round(recall_score(y_test, baseline_pred, labels=rare_labels, average="macro",
+                                                zero_division=0), 4),
+        "unsafe_precision": round(precision_score(y_test, baseline_pred, labels=[label_map["UNSAFE"]],
+                                                  average="macro", zero_division=0), 4),
+        "agreement_with_full": 1.0,
+    }]
+
+    for resolution in RESOLUTIONS:
+        start = time.perf_counter()
+        compacted = compact(
+            X_train.assign(label_encoded=y_train),
+            features,
+            label="label_encoded",
+            steps=quantization_steps(X_train, features, resolution),
+            exact_labels=rare_labels
+        )
+        compact_seconds = time.perf_counter() - start
+        weights = compacted["sample_weight"]
+        y_pred, fit_seconds = fit_and_score(
+            params, compacted[features], compacted["label_encoded"], weights,
+            balanced_class_weight(compacted["label_encoded"], weights), X_test, y_test
+        )
+        summary = compaction_summary(len(X_train), compacted, label="label_encoded")
+        rows.append({
+            "setup": name,
+            "resolution": resolution,
+            "train_rows": summary["compacted_rows"],
+            "compaction_ratio": summary["ratio"],
+            "compact_seconds": round(compact_seconds, 3),
+            "fit_seconds": round(fit_seconds, 2),
+            "fit_speedup": round(baseline_seconds / fit_seconds, 2),
+            "accuracy": round(accuracy_score(y_test, y_pred), 5),
+            "rare_class_recall": round(recall_score(y_test, y_pred, labels=rare_labels, average="macro",
+                                                    zero_division=0), 4),
+            "unsafe_precision": round(precision_score(y_test, y_pred, labels=[label_map["UNSAFE"]],
+                                                      average="macro", zero_division=0), 4),
+            "agreement_with_full": round(float(np.mean(y_pred == baseline_pred)), 5),
+        })
+
+    print(pd.DataFrame(rows).drop(columns="setup").to_string(index=False))
+    report.extend(rows)
+
+# =========================
+# SAVE REPORT
+# =========================
+with open(REPORT_PATH, "w") as f:
+    json.dump({"test_size": 0.25, "rare_labels": ["DEADLOCK", "UNSAFE"], "runs": report}, f, indent=2)
+
+print(f"\n📄 Report written to {REPORT_PATH}")
+print("🎯 Compaction report COMPLETE")
@@ -0,0 +1,130 @@
+"""Versioned process-table feed with delta updates for dashboard clients
+
+Every published sample that changes something gets the next sequence
+number, and its changes go into a bounded log: rows added or changed
+(as compact arrays in COLUMNS order), pids removed, and changed host
+metrics. A client sends the feed id and the last seq it applied, and it
+gets back those changes merged. It gets a full table instead when it is
+new, when the server restarted (the feed id changed), when it fell behind
+the log, or when the delta would be no smaller than the full table.
+
+cpu_percent, memory_percent and the float metrics use a deadband. A row
+only counts as changed once the sampled (unrounded) value moves more than
+`tolerance` from the rounded value clients last received. Jitter is not
+resent, and no client value is ever more than `tolerance` off the sample.
+"""
+import threading
+import time
+import uuid
+from collections import deque
+
+COLUMNS = ["pid", "name", "status", "cpu_percent", "memory_percent", "create_time"]
+_NUMERIC = (COLUMNS.index("cpu_percent"), COLUMNS.index("memory_percent"))
+
+
+def encode_row(process):
+    """Process dict (as sampled) -> list in COLUMNS order"""
+    created = process.get("create_time")
+    return [
+        process["pid"],
+        process["name"],
+        process["status"],
+        round(process["cpu_percent"], 2),
+        round(process["memory_percent"], 2),
+        round(created, 2) if created else None,
+    ]
+
+
+class ProcessFeed:
+    """Latest process table plus a bounded log of per-seq changes"""
+
+    def __init__(self, tolerance=0.5, max_changes=300):
+        self.tolerance = tolerance
+        self.feed_id = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self.timestamp = None
+        self.total_processes = 0
+        self._rows = {}      # pid -> row as last sent to clients
+        self._metrics = {}   # field -> value as last sent to clients
+        self._log = deque(maxlen=max_changes)  # (seq, upserts {pid: row}, removed [pid], metrics {field: value})
+        self._lock = threading.Lock()
+
+    def _row_changed(self, old, new, sampled):
+        if old[1] != new[1] or old[2] != new[2] or old[5] != new[5]:
+            return True
+        # Compare the sample itself, not its rounded form, so rounding cannot add to the error
+        return any(abs(value - old[i]) > self.tolerance for i, value in zip(_NUMERIC, sampled))
+
+    def _metric_changed(self, old, new):
+        if old is None or not isinstance(new, float):
+            return old != new
+        return abs(new - old) > self.tolerance
+
+    def publish(self, processes, metrics=None, total_processes=None, timestamp=None):
+        """Fold one sample into the feed; returns the (possibly unchanged) seq"""
+        rows = {}
+        sampled = {}
+        for process in processes:
+            row = encode_row(process)
+            rows[row[0]] = row
+            sampled[row[0]] = (process["cpu_percent"], process["memory_percent"])
+        metrics = metrics or {}
+
+        with self._lock:
+            upserts = {pid: row for pid, row in rows.items()
+                       if pid not in self._rows or self._row_changed(self._rows[pid], row, sampled[pid])}
+            removed = [pid for pid in self._rows if pid not in rows]
+            changed_metrics = {field: round(value, 2) if isinstance(value, float) else value
+                               for field, value in metrics.items()
+                               if self._metric_changed(self._metrics.get(field), value)}
+
+            self.timestamp = timestamp if timestamp is not None else time.time()
+            self.total_processes = total_processes if total_processes is not None else len(rows)
+            if upserts or removed or changed_metrics:
+                self.seq += 1
+                self._log.append((self.seq, upserts, removed, changed_metrics))
+                self._rows.update(upserts)
+                for pid in removed:
+                    del self._rows[pid]
+                self._metrics.update(changed_metrics)
+            return self.seq
+
+    def age(self):
+        """Seconds since the last publish (inf before the first one)"""
+        return float("inf") if self.timestamp is None else time.time() - self.timestamp
+
+    def since(self, seq=None, feed_id=None):
+        """Changes after seq, or the full table when a delta cannot be served"""
+        with self._lock:
+            oldest = self._log[0][0] if self._log else self.seq + 1
+            full = (
+                feed_id != self.feed_id or seq is None or seq > self.seq
+                or (seq < self.seq and seq < oldest - 1)
+            )
+            upserts, removed, metrics = {}, set(), {}
+            if not full:
+                for entry_seq, entry_upserts, entry_removed, entry_metrics in self._log:
+                    if entry_seq <= seq:
+                        continue
+                    for pid in entry_removed:
+                        upserts.pop(pid, None)
+                        removed.add(pid)
+                    for pid, row in entry_upserts.items():
+                        removed.discard(pid)
+                        upserts[pid] = row
+                    metrics.update(entry_metrics)
+                full = len(upserts) + len(removed) >= len(self._rows) > 0
+            if full:
+                upserts, removed, metrics = dict(self._rows), set(), dict(self._metrics)
+
+            return {
+                "feed": self.feed_id,
+                "seq": self.seq,
+                "full": full,
+                "columns": COLUMNS,
+                "upserts": list(upserts.values()),
+                "removed": sorted(removed),
+                "metrics": metrics,
+                "total_processes": self.total_processes,
+                "timestamp": self.timestamp,
+            }
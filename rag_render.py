@@ -0,0 +1,144 @@
+"""Resource Allocation Graph layout and SVG rendering
+
+Processes are drawn on the top layer and resources on the bottom layer.
+Node order inside each layer comes from barycenter sweeps (sort by the mean
+position of neighbours in the other layer), which costs O(E + n log n) per
+sweep and removes most edge crossings. The SVG is assembled from fragments
+with a single join and cached by a hash of the graph structure, so an
+unchanged graph is never laid out twice.
+"""
+import hashlib
+import html
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+NODE_SPACING = 70
+MARGIN_X = 60
+PROCESS_Y = 80
+RESOURCE_Y = 200
+NODE_HALF = 25
+SWEEPS = 4
+CACHE_SIZE = 128
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def graph_key(pids, allocation, request, cycle):
+    """Hash of everything that affects the rendered graph"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.asarray(allocation.shape, dtype=np.int64).tobytes())
+    h.update(np.packbits(allocation > 0).tobytes())
+    h.update(np.packbits(request > 0).tobytes())
+    # JSON keeps list boundaries: ["a,b", "c"] and ["a", "b,c"] must not collide
+    h.update(json.dumps([pids.tolist(), list(cycle)]).encode())
+    return h.hexdigest()
+
+
+def _barycenter_order(own_count, own_idx, other_idx, other_pos, current):
+    """Rank nodes of one layer by the mean position of their neighbours"""
+    degree = np.bincount(own_idx, minlength=own_count)
+    total = np.bincount(own_idx, weights=other_pos[other_idx], minlength=own_count)
+    # Isolated nodes keep their current position
+    bary = np.where(degree > 0, total / np.maximum(degree, 1), current)
+    ranks = np.empty(own_count, dtype=np.float64)
+    ranks[np.argsort(bary, kind='stable')] = np.arange(own_count)
+    return ranks
+
+
+def layout(allocation, request):
+    """Compute layer positions for processes and resources"""
+    n_procs, n_res = allocation.shape
+    proc_idx, res_idx = np.nonzero((allocation > 0) | (request > 0))
+
+    proc_rank = np.arange(n_procs, dtype=np.float64)
+    res_rank = np.arange(n_res, dtype=np.float64)
+    if proc_idx.size:
+        for _ in range(SWEEPS):
+            res_rank = _barycenter_order(n_res, res_idx, proc_idx, proc_rank, res_rank)
+            proc_rank = _barycenter_order(n_procs, proc_idx, res_idx, res_rank, proc_rank)
+
+    # Centre the shorter layer under the longer one
+    width = max(n_procs, n_res, 1) * NODE_SPACING
+    proc_x = MARGIN_X + proc_rank * NODE_SPACING + (width - n_procs * NODE_SPACING) / 2
+    res_x = MARGIN_X + res_rank * NODE_SPACING + (width - n_res * NODE_SPACING) / 2
+    return proc_x, res_x, width + 2 * MARGIN_X
+
+
+def _render(pids, allocation, request, cycle):
+    proc_x, res_x, width = layout(allocation, request)
+    on_cycle = set(cycle)
+    resources = [f"R{j + 1}" for j in range(allocation.shape[1])]
+
+    parts = [
+        f'<svg width="100%" height="300" viewBox="0 0 {width:.0f} 300">',
+        '<defs><marker id="arrow" markerWidth="10" markerHeight="10" refX="9" refY="3" '
+        'orient="auto" markerUnits="strokeWidth"><path d="M0,0 L0,6 L9,3 z" fill="#333"/></marker></defs>',
+        '<text x="10" y="20" font-family="Arial" font-size="12" fill="#07393C">Legend: ▢ Process ○ Resource</text>',
+        '<text x="10" y="35" font-family="Arial" font-size="12" fill="#2C666E">Solid: Allocation | Dashed: Request</text>',
+    ]
+
+    # Allocation edges (process -> resource, solid)
+    rows, cols = np.nonzero(allocation > 0)
+    parts.extend(
+        f'<line x1="{proc_x[i]:.0f}" y1="{PROCESS_Y + NODE_HALF}" x2="{res_x[j]:.0f}" y2="{RESOURCE_Y - NODE_HALF}" '
+        f'stroke="#2C666E" stroke-width="2" marker-end="url(#arrow)"/>'
+        for i, j in zip(rows.tolist(), cols.tolist())
+    )
+
+    # Request edges (resource -> process, dashed)
+    rows, cols = np.nonzero(request > 0)
+    parts.extend(
+        f'<line x1="{res_x[j]:.0f}" y1="{RESOURCE_Y - NODE_HALF}" x2="{proc_x[i]:.0f}" y2="{PROCESS_Y + NODE_HALF}" '
+        f'stroke="#f59e0b" stroke-width="2" stroke-dasharray="5,5" marker-end="url(#arrow)"/>'
+        for i, j in zip(rows.tolist(), cols.tolist())
+    )
+
+    # Process nodes, highlighted if on the deadlock cycle; pids come from request bodies, so escape them
+    for pid, x in zip(pids.tolist(), proc_x.tolist()):
+        name = f"P{pid}"
+        fill, stroke = ("#e74c3c", "#c0392b") if name in on_cycle else ("#3b82f6", "#1d4ed8")
+        parts.append(
+            f'<rect x="{x - NODE_HALF:.0f}" y="{PROCESS_Y - NODE_HALF}" width="50" height="50" fill="{fill}" '
+            f'stroke="{stroke}" stroke-width="2" rx="8"/>'
+            f'<text x="{x:.0f}" y="{PROCESS_Y + 5}" text-anchor="middle" fill="white" font-family="Arial" '
+            f'font-size="12">{html.escape(name)}</text>'
+        )
+
+    # Resource nodes
+    for name, x in zip(resources, res_x.tolist()):
+        fill, stroke = ("#e74c3c", "#c0392b") if name in on_cycle else ("#10b981", "#047857")
+        parts.append(
+            f'<circle cx="{x:.0f}" cy="{RESOURCE_Y}" r="{NODE_HALF}" fill="{fill}" stroke="{stroke}" stroke-width="2"/>'
+            f'<text x="{x:.0f}" y="{RESOURCE_Y + 5}" text-anchor="middle" fill="white" font-family="Arial" '
+            f'font-size="12">{name}</text>'
+        )
+
+    parts.append('</svg>')
+    return "".join(parts)
+
+
+def render_rag_svg(pids, allocation, request, cycle=()):
+    """Render the Resource Allocation Graph as SVG, reusing cached output"""
+    pids = np.asarray(pids)
+    allocation = np.asarray(allocation)
+    request = np.asarray(request)
+    cycle = [str(node) for node in cycle]
+
+    key = graph_key(pids, allocation, request, cycle)
+    with _cache_lock:
+        svg = _cache.get(key)
+        if svg is not None:
+            _cache.move_to_end(key)
+            return svg
+
+    svg = _render(pids, allocation, request, cycle)
+
+    with _cache_lock:
+        _cache[key] = svg
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return svg
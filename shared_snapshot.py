@@ -0,0 +1,253 @@
+"""Host snapshot shared by pre-forked backend workers through shared memory
+
+    python shared_snapshot.py --name deadlock-snapshot --interval 1
+    SHARED_SNAPSHOT=deadlock-snapshot gunicorn -w 4 backend:app
+
+A single sampler process measures the host (get_system_metrics), the
+process table and the live model's prediction once per interval and
+publishes them into a multiprocessing.shared_memory segment with a fixed
+binary layout:
+
+    header   <4sHHQd   magic "DLKS", layout version, reserved, seq, timestamp
+    body     <6diIII3d metrics (METRIC_FIELDS order), prediction, pad,
+                       process rows, total processes, probabilities
+    rows     PROCESS_DTYPE x max_processes
+
+Writers bump seq to odd before writing and back to even after (a
+seqlock); readers retry if seq was odd or changed while they copied, so
+workers never lock and all serve the same snapshot.
+"""
+import argparse
+import logging
+import signal
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from system_metrics import METRIC_FIELDS
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"DLKS"
+LAYOUT_VERSION = 1
+HEADER = struct.Struct("<4sHHQd")
+BODY = struct.Struct(f"<{len(METRIC_FIELDS)}diIII3d")
+SEQ_OFFSET = 8
+ROWS_OFFSET = -(-(HEADER.size + BODY.size) // 8) * 8
+DEFAULT_NAME = "deadlock-snapshot"
+DEFAULT_MAX_PROCESSES = 256
+
+PROCESS_DTYPE = np.dtype([
+    ("pid", "<i4"),
+    ("status", "u1"),
+    ("cpu_percent", "<f4"),
+    ("memory_percent", "<f4"),
+    ("create_time", "<f8"),
+    ("name", "S30"),
+])
+STATUSES = ["running", "sleeping", "disk-sleep", "stopped", "tracing-stop", "zombie", "dead",
+            "wake-kill", "waking", "idle", "locked", "waiting", "parked", "unknown"]
+_STATUS_CODES = {name: code for code, name in enumerate(STATUSES)}
+
+
+def segment_size(max_processes):
+    return ROWS_OFFSET + PROCESS_DTYPE.itemsize * max_processes
+
+
+class SnapshotWriter:
+    """Owns the segment and publishes snapshots (single writer)"""
+
+    def __init__(self, name=DEFAULT_NAME, max_processes=DEFAULT_MAX_PROCESSES):
+        self.max_processes = max_processes
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=segment_size(max_processes))
+        except FileExistsError:
+            # Left behind by a sampler that did not exit cleanly
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=segment_size(max_processes))
+        self.seq = 0
+        self.rows = np.ndarray((max_processes,), dtype=PROCESS_DTYPE, buffer=self.shm.buf, offset=ROWS_OFFSET)
+        HEADER.pack_into(self.shm.buf, 0, MAGIC, LAYOUT_VERSION, 0, 0, 0.0)
+
+    def publish(self, metrics, prediction=None, probabilities=None, processes=(), total_processes=0):
+        """Write one snapshot; processes are dicts shaped like /api/processes items"""
+        processes = list(processes)[:self.max_processes]
+        probabilities = probabilities if probabilities is not None else (float("nan"),) * 3
+
+        self.seq += 1  # odd: write in progress
+        struct.pack_into("<Q", self.shm.buf, SEQ_OFFSET, self.seq)
+        BODY.pack_into(self.shm.buf, HEADER.size, *(float(metrics[f]) for f in METRIC_FIELDS),
+                       -1 if prediction is None else int(prediction), 0, len(processes), int(total_processes),
+                       *(float(p) for p in probabilities))
+        rows = self.rows[:len(processes)]
+        rows["pid"] = [p["pid"] for p in processes]
+        rows["status"] = [_STATUS_CODES.get(p["status"], _STATUS_CODES["unknown"]) for p in processes]
+        rows["cpu_percent"] = [p["cpu_percent"] for p in processes]
+        rows["memory_percent"] = [p["memory_percent"] for p in processes]
+        rows["create_time"] = [p.get("create_time") or 0.0 for p in processes]
+        rows["name"] = [p["name"].encode("utf-8", "replace")[:30] for p in processes]
+        struct.pack_into("<d", self.shm.buf, SEQ_OFFSET + 8, time.time())
+        self.seq += 1  # even: consistent
+        struct.pack_into("<Q", self.shm.buf, SEQ_OFFSET, self.seq)
+
+    def close(self):
+        del self.rows
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SnapshotReader:
+    """Lock-free reader attached to an existing segment"""
+
+    def __init__(self, name=DEFAULT_NAME):
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=False, track=False)
+        except TypeError:
+            # Python < 3.13: stop the resource tracker unlinking the writer's segment at exit
+            self.shm = shared_memory.SharedMemory(name=name, create=False)
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        self.max_processes = (self.shm.size - ROWS_OFFSET) // PROCESS_DTYPE.itemsize
+
+    @classmethod
+    def attach(cls, name):
+        """Reader for name, or None when unset or no sampler is running"""
+        if not name:
+            return None
+        try:
+            return cls(name)
+        except FileNotFoundError:
+            logger.debug(f"Shared snapshot '{name}' not found, sampling per worker")
+            return None
+
+    def read(self, max_age=None, retries=100):
+        """Latest consistent snapshot as a dict, or None if missing/stale"""
+        buf = self.shm.buf
+        for _ in range(retries):
+            magic, version, _, seq, timestamp = HEADER.unpack_from(buf, 0)
+            if magic != MAGIC or version != LAYOUT_VERSION or seq == 0:
+                return None
+            if seq & 1:
+                continue
+            body = BODY.unpack_from(buf, HEADER.size)
+            n_rows = min(body[len(METRIC_FIELDS) + 2], self.max_processes)
+            rows = np.frombuffer(buf, dtype=PROCESS_DTYPE, count=n_rows, offset=ROWS_OFFSET).copy()
+            if struct.unpack_from("<Q", buf, SEQ_OFFSET)[0] == seq:
+                break
+        else:
+            return None
+
+        if max_age is not None and time.time() - timestamp > max_age:
+            return None
+
+        n = len(METRIC_FIELDS)
+        metrics = dict(zip(METRIC_FIELDS, body[:n]))
+        metrics["num_processes"] = int(metrics["num_processes"])
+        prediction = body[n]
+        probabilities = body[n + 4:n + 7]
+        return {
+            "seq": seq,
+            "timestamp": timestamp,
+            "metrics": metrics,
+            "prediction": prediction if prediction >= 0 else None,
+            "probabilities": np.array(probabilities) if prediction >= 0 else None,
+            "total_processes": body[n + 3],
+            "processes": [
+                {
+                    "pid": pid,
+                    "name": name.decode("utf-8", "replace"),
+                    "status": STATUSES[status] if status < len(STATUSES) else "unknown",
+                    "cpu_percent": round(cpu, 2),
+                    "memory_percent": round(memory, 2),
+                    "create_time": created or None,
+                }
+                for pid, name, status, cpu, memory, created in zip(
+                    rows["pid"].tolist(), rows["name"].tolist(), rows["status"].tolist(),
+                    rows["cpu_percent"].tolist(), rows["memory_percent"].tolist(), rows["create_time"].tolist()
+                )
+            ],
+        }
+
+    def close(self):
+        self.shm.close()
+
+
+def sample_processes(cache, limit):
+    """Process table like /api/processes, using cached psutil handles for cpu_percent"""
+    import psutil
+    pids = psutil.pids()
+    processes = []
+    for pid in pids[:limit]:
+        try:
+            proc = cache.get(pid)
+            if proc is None:
+                proc = cache[pid] = psutil.Process(pid)
+                proc.cpu_percent(None)  # prime; the next tick gives a real reading
+            with proc.oneshot():
+                processes.append({
+                    "pid": pid,
+                    "name": proc.name()[:30],
+                    "status": proc.status(),
+                    "cpu_percent": proc.cpu_percent(None) or 0.0,
+                    "memory_percent": proc.memory_percent() or 0.0,
+                    "create_time": proc.create_time(),
+                })
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            cache.pop(pid, None)
+    for pid in set(cache) - set(pids):
+        del cache[pid]
+    return processes, len(pids)
+
+
+def run_sampler(name, interval, model_path, max_processes):
+    """Sample, predict and publish every interval seconds until interrupted"""
+    import pandas as pd
+    from model_registry import ModelRegistry
+    from system_metrics import get_system_metrics
+
+    models = ModelRegistry({"live": model_path}, poll_interval=5.0)
+    models.load_all()
+    models.start()
+    writer = SnapshotWriter(name, max_processes)
+    cache = {}
+    get_system_metrics(interval=None)  # prime psutil's CPU counters
+    logger.info(f"Publishing snapshots to shared memory '{name}' every {interval}s")
+
+    next_tick = time.monotonic()
+    try:
+        while True:
+            metrics = get_system_metrics(interval=None)
+            if metrics is not None:
+                model = models.get("live")
+                prediction = probabilities = None
+                if model is not None:
+                    probabilities = model.predict_proba(pd.DataFrame([metrics])[list(METRIC_FIELDS)])[0]
+                    prediction = model.classes_[probabilities.argmax()]
+                processes, total = sample_processes(cache, max_processes)
+                writer.publish(metrics, prediction, probabilities, processes, total)
+            next_tick += interval
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        models.stop()
+        writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish one shared host snapshot for all backend workers")
+    parser.add_argument("--name", default=DEFAULT_NAME, help="shared memory segment name")
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--model", default="rf_model_live.joblib")
+    parser.add_argument("--max-processes", type=int, default=30, help="process table rows to publish")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)  # unlink the segment on stop
+    run_sampler(args.name, args.interval, args.model, args.max_processes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Precompressed, ETag-validated static assets for the dashboard
+
+Assets are read and compressed (gzip, plus brotli when the optional
+`brotli` package is installed) once at startup. HTML pages are rewritten so
+local CSS/JS references carry a content hash (script.js?v=<hash>); those
+versioned URLs are served as immutable for a year, while HTML itself is
+always revalidated with its ETag. Files are re-read when their mtime
+changes, checked at most once per CHECK_INTERVAL seconds.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CHECK_INTERVAL = 2.0
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+UNVERSIONED = "public, max-age=300"
+
+_LOCAL_REF = re.compile(r'(?P<attr>src|href)="(?P<path>[^":?#]+\.(?:css|js))"')
+
+
+class Asset:
+    """One file with its encoded variants"""
+
+    __slots__ = ("path", "mimetype", "digest", "variants", "mtime")
+
+    def __init__(self, path, body, mtime):
+        self.path = path
+        self.mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if self.mimetype.startswith("text/") or self.mimetype.endswith("javascript"):
+            self.mimetype += "; charset=utf-8"
+        self.digest = hashlib.sha256(body).hexdigest()[:16]
+        self.mtime = mtime
+        self.variants = {"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(body, quality=11)
+
+
+class StaticAssets:
+    """In-memory static file pipeline"""
+
+    def __init__(self, root, extensions=(".css", ".js", ".html")):
+        self.root = root
+        self.extensions = tuple(extensions)
+        self.assets = {}
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self.load()
+
+    def _files(self):
+        return sorted(name for name in os.listdir(self.root)
+                      if name.endswith(self.extensions) and os.path.isfile(os.path.join(self.root, name)))
+
+    def load(self):
+        """(Re)build every asset; HTML last so it can reference asset hashes"""
+        assets = {}
+        names = self._files()
+        for name in names:
+            if not name.endswith(".html"):
+                assets[name] = self._read(name)
+        for name in names:
+            if name.endswith(".html"):
+                assets[name] = self._read(name, assets)
+        with self._lock:
+            self.assets = assets
+            self._checked = time.monotonic()
+
+    def _read(self, name, assets=None):
+        full_path = os.path.join(self.root, name)
+        mtime = os.path.getmtime(full_path)
+        with open(full_path, "rb") as f:
+            body = f.read()
+        if assets is not None:
+            def versioned(match):
+                asset = assets.get(match.group("path"))
+                if asset is None:
+                    return match.group(0)
+                return f'{match.group("attr")}="{match.group("path")}?v={asset.digest}"'
+            body = _LOCAL_REF.sub(versioned, body.decode("utf-8")).encode("utf-8")
+        return Asset(name, body, mtime)
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked < CHECK_INTERVAL:
+            return
+        self._checked = now
+        try:
+            current = {name: os.path.getmtime(os.path.join(self.root, name)) for name in self._files()}
+        except OSError:
+            return
+        if current != {name: asset.mtime for name, asset in self.assets.items()}:
+            self.load()
+
+    def get(self, path):
+        self._maybe_reload()
+        return self.assets.get(path)
+
+    def response(self, app, request, path):
+        """Build a (possibly 304) response for path, or None if unknown"""
+        asset = self.get(path)
+        if asset is None:
+            return None
+
+        accepted = request.accept_encodings
+        if "br" in asset.variants and accepted["br"]:
+            encoding = "br"
+        elif accepted["gzip"]:
+            encoding = "gzip"
+        else:
+            encoding = "identity"
+
+        response = app.response_class(asset.variants[encoding], mimetype=asset.mimetype)
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        response.set_etag(asset.digest if encoding == "identity" else f"{asset.digest}-{encoding}")
+
+        if path.endswith(".html"):
+            response.headers["Cache-Control"] = REVALIDATE
+        elif request.args.get("v") == asset.digest:
+            response.headers["Cache-Control"] = IMMUTABLE
+        else:
+            response.headers["Cache-Control"] = UNVERSIONED
+        return response.make_conditional(request)
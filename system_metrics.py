@@ -0,0 +1,71 @@
+import psutil
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Order of the live model's input features
+METRIC_FIELDS = [
+    "num_processes",
+    "cpu_percent",
+    "memory_percent",
+    "disk_percent",
+    "total_allocated",
+    "total_need"
+]
+
+
+class CpuMeter:
+    """CPU percent since this meter's previous reading
+
+    psutil.cpu_percent(interval=None) keeps one module-wide baseline, so
+    concurrent samplers reset each other's window; each meter keeps its own.
+    """
+
+    def __init__(self):
+        self._last = self._times()
+
+    @staticmethod
+    def _times():
+        times = psutil.cpu_times()._asdict()
+        # guest time is already counted in user/nice on Linux
+        total = sum(times.values()) - times.get("guest", 0.0) - times.get("guest_nice", 0.0)
+        idle = times["idle"] + times.get("iowait", 0.0)
+        return total, total - idle
+
+    def percent(self):
+        total, busy = self._times()
+        last_total, last_busy = self._last
+        self._last = total, busy
+        if total <= last_total:
+            return 0.0
+        return round(min(max((busy - last_busy) / (total - last_total) * 100, 0.0), 100.0), 1)
+
+
+def get_system_metrics(interval=1, cpu_meter=None):
+    """Collect current system metrics
+
+    interval is passed to psutil.cpu_percent; None measures since the
+    previous call without blocking. A CpuMeter measures since its own
+    previous reading instead (one per simulated agent).
+    """
+    try:
+        cpu = cpu_meter.percent() if cpu_meter is not None else psutil.cpu_percent(interval=interval)
+        memory = psutil.virtual_memory().percent
+        disk = psutil.disk_usage("/").percent if os.name != 'nt' else psutil.disk_usage("C:").percent
+        pids = psutil.pids()
+
+        total_allocated = cpu + memory
+        total_need = max(0, 200 - total_allocated)
+
+        return {
+            "num_processes": len(pids),
+            "cpu_percent": cpu,
+            "memory_percent": memory,
+            "disk_percent": disk,
+            "total_allocated": total_allocated,
+            "total_need": total_need
+        }
+    except Exception as e:
+        logger.error(f"Error collecting system metrics: {e}")
+        return None
@@ -0,0 +1,83 @@
+"""Out-of-core rolling (temporal) features, computed per source
+
+The dataset is streamed in chunks. Rolling mean/std windows never cross
+between `source` groups, and the last WINDOW-1 rows of every source are
+carried into the next chunk, so results match an in-memory
+groupby("source").rolling(WINDOW) exactly while only one chunk (plus the
+carry) is held in memory. Features are appended to a Parquet file row
+group by row group.
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+WINDOW = 5
+CHUNK_ROWS = 250_000
+
+TEMPORAL_FEATURES = [
+    "cpu_percent",
+    "memory_percent",
+    "disk_percent",
+    "total_allocated",
+    "total_need",
+    "deadlock_risk"
+]
+
+OUTPUT_COLUMNS = (
+    ["label", "source", "num_processes"]
+    + TEMPORAL_FEATURES
+    + [f"{c}_mean" for c in TEMPORAL_FEATURES]
+    + [f"{c}_std" for c in TEMPORAL_FEATURES]
+)
+
+
+def rolling_chunk(chunk, carry, window=WINDOW, group="source"):
+    """Rolling features for one chunk; returns (features, next carry)
+
+    Rows whose window is still incomplete (the first window-1 rows of a
+    source) are dropped, as dropna() did on the in-memory frame.
+    """
+    combined = pd.concat([carry, chunk]) if carry is not None else chunk
+    rolling = combined.groupby(group, sort=False, observed=True)[TEMPORAL_FEATURES].rolling(window)
+    means = rolling.mean().reset_index(level=0, drop=True)
+    stds = rolling.std().reset_index(level=0, drop=True)
+
+    out = chunk[["label", group, "num_processes"] + TEMPORAL_FEATURES].copy()
+    out[[f"{c}_mean" for c in TEMPORAL_FEATURES]] = means.loc[chunk.index].to_numpy()
+    out[[f"{c}_std" for c in TEMPORAL_FEATURES]] = stds.loc[chunk.index].to_numpy()
+
+    next_carry = combined.groupby(group, sort=False, observed=True).tail(window - 1)
+    return out.dropna(), next_carry[[group] + TEMPORAL_FEATURES]
+
+
+def stream_temporal_features(src, dst, window=WINDOW, chunksize=CHUNK_ROWS):
+    """Stream src (CSV) into dst (Parquet); returns the number of rows written"""
+    if pq is None:
+        raise RuntimeError("pyarrow is required to write temporal features (pip install pyarrow)")
+
+    schema = pa.schema(
+        [("label", pa.string()), ("source", pa.string()), ("num_processes", pa.int64())]
+        + [(c, pa.float64()) for c in OUTPUT_COLUMNS[3:]]
+    )
+    dtypes = {c: np.float64 for c in TEMPORAL_FEATURES}
+    dtypes.update({"label": str, "source": str, "num_processes": np.int64})
+
+    carry = None
+    written = 0
+    with pq.ParquetWriter(dst, schema) as writer:
+        for chunk in pd.read_csv(src, chunksize=chunksize, dtype=dtypes):
+            features, carry = rolling_chunk(chunk, carry, window)
+            if len(features):
+                writer.write_table(pa.Table.from_pandas(features[OUTPUT_COLUMNS], schema=schema, preserve_index=False))
+                written += len(features)
+    return written
+
+
+def load_temporal_features(path, columns=None):
+    """Read (a subset of) the stored feature columns"""
+    return pd.read_parquet(path, columns=columns)
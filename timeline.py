@@ -0,0 +1,132 @@
+"""Run-length encoded state timelines for Gantt charts
+
+Each tracked key (a process id, a system component, ...) keeps a list of
+segments. A sample whose state matches the key's last segment only extends
+that segment, so a long stable history costs one segment instead of one row
+per sample. Window queries bisect on segment bounds and merge keys in start
+order, then page through the result with offset/limit.
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from itertools import islice
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+
+class StateTimeline:
+    """Bounded, run-length encoded history of (key, state) samples"""
+
+    def __init__(self, key_field="key", max_segments=2000, max_gap=30.0, max_keys=10000):
+        self.key_field = key_field
+        self.max_segments = max_segments
+        self.max_gap = max_gap
+        self.max_keys = max_keys
+        self._segments = {}  # key -> [[start, end, state, samples, value_sum, value_peak], ...]
+        self._starts = {}
+        self._ends = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, state, timestamp=None, value=None):
+        """Record one sample; extends the open segment when the state is unchanged"""
+        if timestamp is None:
+            timestamp = time.time()
+        value_sum = value if value is not None else 0.0
+        peak = value if value is not None else None
+
+        with self._lock:
+            segments = self._segments.get(key)
+            if segments is None:
+                if len(self._segments) >= self.max_keys:
+                    self._evict_oldest_key()
+                segments = self._segments[key] = []
+                self._starts[key] = []
+                self._ends[key] = []
+
+            if segments:
+                last = segments[-1]
+                if last[2] == state and timestamp - last[1] <= self.max_gap and timestamp >= last[1]:
+                    last[1] = timestamp
+                    last[3] += 1
+                    if value is not None:
+                        last[4] += value
+                        last[5] = value if last[5] is None else max(last[5], value)
+                    self._ends[key][-1] = timestamp
+                    return
+
+            segments.append([timestamp, timestamp, state, 1, value_sum, peak])
+            self._starts[key].append(timestamp)
+            self._ends[key].append(timestamp)
+
+            # Trim in chunks so the amortised cost per sample stays O(1)
+            excess = len(segments) - self.max_segments
+            if excess > self.max_segments // 4:
+                del segments[:excess]
+                del self._starts[key][:excess]
+                del self._ends[key][:excess]
+
+    def record_many(self, samples, timestamp=None):
+        """Record an iterable of (key, state, value) samples taken at one instant"""
+        if timestamp is None:
+            timestamp = time.time()
+        for key, state, value in samples:
+            self.record(key, state, timestamp, value)
+
+    def _evict_oldest_key(self):
+        # Drop the key that has been silent the longest
+        stale = min(self._ends, key=lambda k: self._ends[k][-1] if self._ends[k] else 0)
+        del self._segments[stale], self._starts[stale], self._ends[stale]
+
+    def window(self, start=None, end=None, keys=None, offset=0, limit=DEFAULT_PAGE_SIZE):
+        """Return one page of segments overlapping [start, end], clipped to the window"""
+        start = float("-inf") if start is None else start
+        end = float("inf") if end is None else end
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        with self._lock:
+            selected = self._segments.keys() if keys is None else [k for k in keys if k in self._segments]
+            runs = []
+            total = 0
+            for key in selected:
+                lo = bisect_left(self._ends[key], start)
+                hi = bisect_right(self._starts[key], end)
+                if hi > lo:
+                    total += hi - lo
+                    runs.append([(seg[0], key, seg) for seg in self._segments[key][lo:hi]])
+
+            merged = heapq.merge(*runs, key=lambda item: item[0])
+            page = [self._to_dict(key, seg, start, end)
+                    for _, key, seg in islice(merged, offset, offset + limit)]
+
+        next_offset = offset + len(page)
+        return {
+            "segments": page,
+            "total": total,
+            "offset": offset,
+            "next_offset": next_offset if next_offset < total else None,
+        }
+
+    def _to_dict(self, key, seg, start, end):
+        seg_start = max(seg[0], start)
+        seg_end = min(seg[1], end)
+        item = {
+            self.key_field: key,
+            "state": seg[2],
+            "start_time": round(seg_start, 3),
+            "end_time": round(seg_end, 3),
+            "duration": round(seg_end - seg_start, 3),
+            "samples": seg[3],
+        }
+        if seg[5] is not None:
+            item["value"] = round(seg[4] / seg[3], 2)
+            item["peak"] = round(seg[5], 2)
+        return item
+
+    def clear(self):
+        """Forget all recorded history"""
+        with self._lock:
+            self._segments.clear()
+            self._starts.clear()
+            self._ends.clear()
@@ -0,0 +1,232 @@
+"""Kernel file-lock wait-for graph collected from Linux /proc
+
+One scan reads /proc/locks (holders and the "->" waiters blocked behind
+them) and every /proc/<pid>/stat, then visits /proc/<pid>/task/*/stat,
+wchan and fd only for processes that hold or wait on a lock. Locks and
+processes are numbered densely into an allocation matrix (process holds
+lock) and a request matrix (process waits for lock), the same shape the
+manual analysis feeds to detect_deadlock_cycle_arrays(); sparse_edges()
+turns them into [process index, lock index, count] rows for the API.
+Files are read with raw os.open/os.readv into one reused buffer.
+"""
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PROC = "/proc"
+BUFFER_BYTES = 1 << 16
+MAX_CACHED_PATHS = 10000
+
+
+def available():
+    return os.path.exists(os.path.join(PROC, "locks"))
+
+
+def sparse_edges(matrix):
+    """Non-zero cells of a process x lock matrix as [process index, lock index, count] rows"""
+    rows, cols = np.nonzero(matrix)
+    return np.column_stack([rows, cols, matrix[rows, cols]]).tolist()
+
+
+class WaitGraphCollector:
+    """Batched /proc scanner with a reusable read buffer"""
+
+    def __init__(self, detect_cycle, interval=1.0, on_scan=None):
+        # detect_cycle(pids, allocation, request) -> list of cycle nodes ("P<pid>", "R<n>")
+        self.detect_cycle = detect_cycle
+        self.interval = interval
+        self.on_scan = on_scan
+        self.latest = None
+        self._buffer = bytearray(BUFFER_BYTES)
+        self._paths = {}  # (device, inode) -> path, kept across scans
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._scan_lock = threading.Lock()  # scans share the read buffer
+
+    def _read(self, path):
+        """Read a whole /proc file into the shared buffer; None if it vanished"""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return None
+        size = 0
+        view = memoryview(self._buffer)
+        try:
+            while True:
+                with view[size:] as tail:
+                    n = os.readv(fd, [tail])
+                if n == 0:
+                    return bytes(view[:size])
+                size += n
+                if size == len(self._buffer):
+                    # A bytearray cannot grow while a memoryview of it is exported
+                    view.release()
+                    self._buffer.extend(bytes(len(self._buffer)))
+                    view = memoryview(self._buffer)
+        except OSError:
+            return None
+        finally:
+            view.release()
+            os.close(fd)
+
+    @staticmethod
+    def parse_locks(data):
+        """(lock id, kind, access, pid, device, inode, waiting) rows from /proc/locks"""
+        rows = []
+        for line in data.decode("ascii", "replace").splitlines():
+            parts = line.split()
+            if len(parts) < 8:
+                continue
+            waiting = parts[1] == "->"
+            if waiting:
+                parts = parts[:1] + parts[2:]
+            try:
+                lock_id = int(parts[0].rstrip(":"))
+                pid = int(parts[4])
+                major, minor, inode = parts[5].split(":")
+            except ValueError:
+                continue
+            rows.append((lock_id, parts[1], parts[3], pid, f"{major}:{minor}", int(inode), waiting))
+        return rows
+
+    def _stat_state(self, path):
+        data = self._read(path)
+        if data is None:
+            return None, None
+        end = data.rfind(b")")
+        return data[data.find(b"(") + 1:end].decode(errors="replace"), chr(data[end + 2])
+
+    def _blocked_processes(self):
+        """Processes in uninterruptible sleep (D), from one pass over /proc/*/stat"""
+        blocked = []
+        with os.scandir(PROC) as entries:
+            for entry in entries:
+                if entry.name.isdigit():
+                    name, state = self._stat_state(f"{PROC}/{entry.name}/stat")
+                    if state == "D":
+                        blocked.append({"pid": int(entry.name), "name": name})
+        return blocked
+
+    def _tasks(self, pid):
+        tasks = []
+        try:
+            tids = os.listdir(f"{PROC}/{pid}/task")
+        except OSError:
+            return tasks
+        for tid in tids:
+            _, state = self._stat_state(f"{PROC}/{pid}/task/{tid}/stat")
+            if state not in ("D", "S"):
+                continue
+            wchan = self._read(f"{PROC}/{pid}/task/{tid}/wchan")
+            wchan = wchan.decode(errors="replace") if wchan else ""
+            if state == "D" or "lock" in wchan or "flock" in wchan:
+                tasks.append({"tid": int(tid), "state": state, "wchan": wchan})
+        return tasks
+
+    def _resolve_paths(self, pid, wanted):
+        """Name locked inodes from the process's open fds (results are cached)"""
+        fd_dir = f"{PROC}/{pid}/fd"
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            return
+        for fd in fds:
+            try:
+                st = os.stat(f"{fd_dir}/{fd}")
+            except OSError:
+                continue
+            key = (f"{os.major(st.st_dev):02x}:{os.minor(st.st_dev):02x}", st.st_ino)
+            if key in wanted and key not in self._paths:
+                try:
+                    self._paths[key] = os.readlink(f"{fd_dir}/{fd}")
+                except OSError:
+                    pass
+
+    def scan(self):
+        """Build the wait-for graph and run cycle detection on it"""
+        with self._scan_lock:
+            return self._scan()
+
+    def _scan(self):
+        started = time.perf_counter()
+        rows = self.parse_locks(self._read(f"{PROC}/locks") or b"")
+        # OFD locks report pid -1: they belong to an open file, not a process
+        rows = [row for row in rows if row[3] > 0]
+
+        lock_ids = sorted({row[0] for row in rows})
+        pids = sorted({row[3] for row in rows})
+        lock_index = {lock_id: j for j, lock_id in enumerate(lock_ids)}
+        pid_index = {pid: i for i, pid in enumerate(pids)}
+
+        allocation = np.zeros((len(pids), len(lock_ids)), dtype=np.int32)
+        request = np.zeros_like(allocation)
+        locks = [None] * len(lock_ids)
+        for lock_id, kind, access, pid, device, inode, waiting in rows:
+            i, j = pid_index[pid], lock_index[lock_id]
+            (request if waiting else allocation)[i, j] = 1
+            if not waiting:
+                locks[j] = {"id": lock_id, "kind": kind, "access": access, "device": device, "inode": inode}
+        for j, lock_id in enumerate(lock_ids):
+            if locks[j] is None:
+                row = next(r for r in rows if r[0] == lock_id)
+                locks[j] = {"id": lock_id, "kind": row[1], "access": row[2], "device": row[4], "inode": row[5]}
+
+        waiters = sorted({row[3] for row in rows if row[6]})
+        wanted = {(lock["device"], lock["inode"]) for lock in locks} - self._paths.keys()
+        if len(self._paths) > MAX_CACHED_PATHS:
+            self._paths.clear()
+        for pid in pids:
+            if not wanted - self._paths.keys():
+                break
+            self._resolve_paths(pid, wanted)
+        for lock in locks:
+            lock["path"] = self._paths.get((lock["device"], lock["inode"]))
+
+        blocked = self._blocked_processes()
+        cycle = self.detect_cycle(pids, allocation, request) if waiters else []
+
+        # Name the cycle's R<n> nodes after the lock they stand for
+        cycle_locks = [locks[int(node[1:]) - 1] for node in cycle if node.startswith("R")]
+
+        result = {
+            "state": "DEADLOCK" if cycle else "WAITING" if waiters else "CLEAR",
+            "pids": pids,
+            "locks": locks,
+            "allocation": allocation,
+            "request": request,
+            "cycle": cycle,
+            "cycle_locks": cycle_locks,
+            "waiters": [{"pid": pid, "tasks": self._tasks(pid)} for pid in waiters],
+            "blocked_processes": blocked,
+            "scanned_at": time.time(),
+            "scan_seconds": time.perf_counter() - started,
+        }
+        with self._lock:
+            self.latest = result
+        return result
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                result = self.scan()
+                if self.on_scan is not None:
+                    self.on_scan(result)
+            except Exception as e:
+                logger.error(f"Wait-for graph scan error: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start scanning every interval seconds (idempotent)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="waitgraph", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,126 @@
+"""Compact binary wire format for prediction payloads
+
+Every frame is a 16-byte little-endian header followed by a dense body:
+
+    magic    4s   b"DLKW"
+    version  u8   WIRE_VERSION
+    kind     u8   KIND_STATE or KIND_FEATURES
+    reserved u16  0
+    rows     u32  processes (state) / samples (features)
+    cols     u32  resources (state) / features (features)
+
+KIND_STATE body is int32:
+    available[cols], pid[rows], allocated[rows*cols], max_need[rows*cols], request[rows*cols]
+
+KIND_FEATURES body is a float32 rows x cols matrix in live_features order.
+
+Decoding never copies: the returned arrays are read-only np.frombuffer views
+over the request body.
+"""
+import struct
+
+import numpy as np
+
+CONTENT_TYPE = "application/x-deadlock-frame"
+
+MAGIC = b"DLKW"
+WIRE_VERSION = 1
+KIND_STATE = 1
+KIND_FEATURES = 2
+
+HEADER = struct.Struct("<4sBBHII")
+
+# Upper bound for any resource count, keeps sums well inside int64
+MAX_RESOURCE_UNITS = 1_000_000
+MAX_ROWS = 1_000_000
+MAX_COLS = 256
+
+
+class WireFormatError(ValueError):
+    """Raised when a binary frame is malformed or out of bounds"""
+
+
+def _read_header(buf, expected_kind):
+    if len(buf) < HEADER.size:
+        raise WireFormatError("Frame shorter than header")
+
+    magic, version, kind, _, rows, cols = HEADER.unpack_from(buf)
+    if magic != MAGIC:
+        raise WireFormatError("Bad frame magic")
+    if version != WIRE_VERSION:
+        raise WireFormatError(f"Unsupported frame version: {version}")
+    if kind != expected_kind:
+        raise WireFormatError(f"Unexpected frame kind: {kind}")
+    if rows > MAX_ROWS or not 0 < cols <= MAX_COLS:
+        raise WireFormatError(f"Frame dimensions out of range: {rows}x{cols}")
+    return rows, cols
+
+
+def encode_state(available, pids, allocated, max_need, request):
+    """Encode a resource allocation state as a KIND_STATE frame"""
+    available = np.ascontiguousarray(available, dtype="<i4")
+    pids = np.ascontiguousarray(pids, dtype="<i4")
+    allocated = np.ascontiguousarray(allocated, dtype="<i4")
+    max_need = np.ascontiguousarray(max_need, dtype="<i4")
+    request = np.ascontiguousarray(request, dtype="<i4")
+
+    rows, cols = len(pids), len(available)
+    for name, matrix in (("allocated", allocated), ("max_need", max_need), ("request", request)):
+        if matrix.shape != (rows, cols):
+            raise WireFormatError(f"{name} must have shape ({rows}, {cols})")
+
+    header = HEADER.pack(MAGIC, WIRE_VERSION, KIND_STATE, 0, rows, cols)
+    return b"".join([header, available.tobytes(), pids.tobytes(),
+                     allocated.tobytes(), max_need.tobytes(), request.tobytes()])
+
+
+def decode_state(buf):
+    """Decode and validate a KIND_STATE frame into zero-copy NumPy views"""
+    rows, cols = _read_header(buf, KIND_STATE)
+
+    count = cols + rows + 3 * rows * cols
+    if len(buf) != HEADER.size + 4 * count:
+        raise WireFormatError(f"State frame body must hold {count} int32 values")
+
+    body = np.frombuffer(buf, dtype="<i4", count=count, offset=HEADER.size)
+
+    matrices = body[cols + rows:]
+    if matrices.size and (matrices.min() < 0 or matrices.max() > MAX_RESOURCE_UNITS):
+        raise WireFormatError("Resource counts out of range")
+    available = body[:cols]
+    if available.min() < 0 or available.max() > MAX_RESOURCE_UNITS:
+        raise WireFormatError("Available resources out of range")
+
+    matrices = matrices.reshape(3, rows, cols)
+    return {
+        "available": available,
+        "pids": body[cols:cols + rows],
+        "allocated": matrices[0],
+        "max_need": matrices[1],
+        "request": matrices[2],
+    }
+
+
+def encode_features(X):
+    """Encode a feature matrix as a KIND_FEATURES frame"""
+    X = np.ascontiguousarray(X, dtype="<f4")
+    if X.ndim != 2:
+        raise WireFormatError("Feature matrix must be 2-dimensional")
+
+    header = HEADER.pack(MAGIC, WIRE_VERSION, KIND_FEATURES, 0, X.shape[0], X.shape[1])
+    return header + X.tobytes()
+
+
+def decode_features(buf, n_features=None):
+    """Decode and validate a KIND_FEATURES frame into a zero-copy NumPy view"""
+    rows, cols = _read_header(buf, KIND_FEATURES)
+
+    if n_features is not None and cols != n_features:
+        raise WireFormatError(f"Expected {n_features} features per row, got {cols}")
+    if len(buf) != HEADER.size + 4 * rows * cols:
+        raise WireFormatError(f"Feature frame body must hold {rows * cols} float32 values")
+
+    X = np.frombuffer(buf, dtype="<f4", count=rows * cols, offset=HEADER.size).reshape(rows, cols)
+    if not np.isfinite(X).all():
+        raise WireFormatError("Feature matrix contains NaN or infinite values")
+    return X